@@ -1,22 +1,41 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 
-# Set up plotting style
-plt.style.use('default')
-sns.set_palette("husl")
+# Typed Parquet result store written by the runners (results/store/chain=/run=/action=)
+DEFAULT_RESULT_STORE = "results/store"
+# Legacy single-run CSV - adjust the filename to match your actual file (or pass one via `l2bench analyze`)
+DEFAULT_RESULTS_CSV = "results/benchmark_results_full_suite_plus_sustained_v2_extended_20250604_215833.csv"
 
-def load_and_analyze_benchmark_data():
+# Only these columns are read from the Parquet store
+ANALYSIS_COLUMNS = [
+    'chain', 'run', 'action', 'status', 'tx_hash', 'nonce', 'block_number', 'gas_used',
+    'configured_gas_price_gwei', 'effective_gas_price_gwei', 'fee_paid_eth', 'confirmation_time_sec',
+    'l1_fee_wei', 'l1_fee_eth', 'l1_gas_used', 'l1_gas_price_gwei', 'l1_fee_scalar',
+    'build_sec', 'sign_sec', 'submit_rtt_sec', 'inclusion_sec', 'receipt_lag_sec',
+    'inclusion_latency_sec', 'block_arrival_latency_sec'
+]
+
+# Per-tx latency stages, in lifecycle order (derived from the perf_counter_ns stage stamps)
+LATENCY_STAGE_COLUMNS = ['build_sec', 'sign_sec', 'submit_rtt_sec', 'inclusion_sec', 'receipt_lag_sec']
+# Against the chain's block timestamp: submit -> block timestamp, block timestamp -> header first seen locally
+BLOCK_LATENCY_COLUMNS = ['inclusion_latency_sec', 'block_arrival_latency_sec']
+
+def load_and_analyze_benchmark_data(csv_file=DEFAULT_RESULTS_CSV, chains=None, runs=None, actions=None):
     """
-    Load and analyze benchmark results from CSV file
+    Load and analyze benchmark results from a CSV file, an .arrows stream or the
+    Parquet result store (chains/runs/actions select partitions of the store)
     """
-    # Load your results CSV - adjust the filename to match your actual file
-    csv_file = "results/benchmark_results_full_suite_plus_sustained_v2_extended_20250604_215833.csv"
-    
+    typed_source = Path(csv_file).is_dir() or str(csv_file).endswith('.arrows')
     try:
-        df = pd.read_csv(csv_file)
+        if Path(csv_file).is_dir():
+            from lib.result_store import load_store
+            df = load_store(str(csv_file), columns=ANALYSIS_COLUMNS, chains=chains, runs=runs, actions=actions)
+        elif typed_source: # columnar result sink output
+            from lib.result_sink import load_results
+            df = load_results(str(csv_file))
+        else:
+            df = pd.read_csv(csv_file)
         print(f"Successfully loaded {len(df)} records from {csv_file}")
     except FileNotFoundError:
         print(f"Results CSV not found at {csv_file}. Make sure the file exists.")
@@ -46,11 +65,14 @@ def load_and_analyze_benchmark_data():
         print("No successful transactions found. Cannot perform analysis.")
         return None
     
+    if typed_source:
+        return df_successful # already typed, nothing to re-parse
+    
     # Convert relevant columns to numeric
     numeric_cols = ['nonce', 'block_number', 'gas_used', 
                    'configured_gas_price_gwei', 'effective_gas_price_gwei', 
                    'fee_paid_eth', 'confirmation_time_sec', 
-                   'l1_fee_wei', 'l1_fee_eth', 'l1_gas_used', 'l1_gas_price_gwei', 'l1_fee_scalar']
+                   'l1_fee_wei', 'l1_fee_eth', 'l1_gas_used', 'l1_gas_price_gwei', 'l1_fee_scalar'] + LATENCY_STAGE_COLUMNS + BLOCK_LATENCY_COLUMNS
     
     for col in numeric_cols:
         if col in df_successful.columns:
@@ -92,6 +114,70 @@ def analyze_by_action_type(df):
     
     return analysis
 
+def analyze_by_chain(df):
+    """
+    Side-by-side comparison for combined multi-chain results
+    """
+    if 'chain' not in df.columns or df['chain'].nunique() < 2:
+        return
+    print("\n=== ANALYSIS BY CHAIN ===")
+    
+    analysis = df.groupby(['chain', 'action']).agg({
+        'tx_hash': 'count',
+        'confirmation_time_sec': ['mean', 'median', lambda s: s.quantile(0.95), 'max'],
+        'gas_used': ['mean', 'median'],
+        'fee_paid_eth': ['mean', 'median'],
+        'l1_fee_eth': ['mean', 'median']
+    }).round(6)
+    
+    analysis.columns = ['_'.join(col).strip().replace('<lambda_0>', 'p95') for col in analysis.columns.values]
+    analysis = analysis.reset_index()
+    
+    print("\n--- Statistics per Chain and Action Type ---")
+    print(analysis.to_string(index=False))
+    
+    return analysis
+
+def analyze_latency_breakdown(df):
+    """
+    Median and p95 of each latency stage per chain and action
+    """
+    stage_cols = [col for col in LATENCY_STAGE_COLUMNS + BLOCK_LATENCY_COLUMNS if col in df.columns and df[col].notna().any()]
+    if not stage_cols:
+        return
+    print("\n=== LATENCY BREAKDOWN ===")
+    
+    group_cols = [col for col in ['chain', 'action'] if col in df.columns]
+    analysis = df.groupby(group_cols)[stage_cols].agg(['median', lambda s: s.quantile(0.95)]).round(6)
+    
+    analysis.columns = ['_'.join(col).strip().replace('<lambda_0>', 'p95') for col in analysis.columns.values]
+    analysis = analysis.reset_index()
+    
+    print("\n--- Build / Sign / Submit RTT / Inclusion / Receipt Lag, Block Timestamp Latencies (seconds) ---")
+    print(analysis.to_string(index=False))
+    
+    return analysis
+
+def analyze_latency_histograms(source, chains=None, runs=None):
+    """
+    Merges the latency histograms saved with the results (one file per run, or every
+    run in the store) and prints exact-bucket percentiles per chain and action
+    """
+    from lib.latency_histogram import histogram_path, load_histograms, format_histogram_table, HISTOGRAM_FILE_NAME
+    if Path(source).is_dir():
+        paths = [str(p) for p in sorted(Path(source).glob(f"chain=*/run=*/{HISTOGRAM_FILE_NAME}"))
+                 if (not chains or p.parent.parent.name.split('=', 1)[1] in chains)
+                 and (not runs or p.parent.name.split('=', 1)[1] in runs)]
+    else:
+        paths = [histogram_path(str(source))] if Path(histogram_path(str(source))).exists() else []
+    if not paths:
+        return
+    print("\n=== LATENCY HISTOGRAMS ===")
+    histograms = load_histograms(paths)
+    print(f"\n--- Confirmation Time Percentiles (seconds, {len(paths)} histogram file(s) merged) ---")
+    print(format_histogram_table(histograms))
+    return histograms
+
 def analyze_sustained_load(df):
     """
     Specific analysis for sustained load testing
@@ -187,6 +273,13 @@ def create_visualizations(df):
     Create basic visualizations of the data
     """
     print("\n=== CREATING VISUALIZATIONS ===")
+    # Plotting libraries are slow to import, so they are only loaded when plots are requested
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set up plotting style
+    plt.style.use('default')
+    sns.set_palette("husl")
     
     # Create output directory for plots
     Path("analysis_plots").mkdir(exist_ok=True)
@@ -239,29 +332,35 @@ def create_visualizations(df):
     
     print("Visualizations saved to 'analysis_plots/' directory")
 
-def main():
+def main(csv_file=None, make_plots=True, chains=None, runs=None, actions=None):
     """
     Main analysis function
     """
     print("=== BENCHMARK RESULTS ANALYSIS ===")
     print("Loading and analyzing benchmark data...\n")
     
-    # Load data
-    df = load_and_analyze_benchmark_data()
+    # Load data (the result store by default, once a run has written one)
+    if csv_file is None:
+        csv_file = DEFAULT_RESULT_STORE if Path(DEFAULT_RESULT_STORE).is_dir() else DEFAULT_RESULTS_CSV
+    df = load_and_analyze_benchmark_data(csv_file, chains, runs, actions)
     if df is None:
         return
     
     # Perform various analyses
     analyze_by_action_type(df)
+    analyze_by_chain(df)
+    analyze_latency_breakdown(df)
+    analyze_latency_histograms(csv_file, chains, runs)
     analyze_sustained_load(df)
     analyze_transaction_performance(df)
     
     # Create visualizations
-    try:
-        create_visualizations(df)
-    except Exception as e:
-        print(f"Error creating visualizations: {e}")
-        print("Continuing with text-based analysis...")
+    if make_plots:
+        try:
+            create_visualizations(df)
+        except Exception as e:
+            print(f"Error creating visualizations: {e}")
+            print("Continuing with text-based analysis...")
     
     print("\n=== ANALYSIS COMPLETE ===")
     print("Check the 'analysis_plots/' directory for generated visualizations.")
@@ -0,0 +1,213 @@
+# l2bench.py
+"""
+Single entry point for the L2 benchmark suite.
+
+    python l2bench.py probe [chain ...]              RPC reachability/latency check (stdlib only)
+    python l2bench.py run <chain> [--set NAME=VALUE]  full benchmark suite (EVM or ZKsync, per chain_type)
+    python l2bench.py run <chain> <chain> ...         same suite on several chains at once, combined CSV
+    python l2bench.py run <chain> --resume            continue an interrupted run from its last checkpoint
+    python l2bench.py analyze [source] [--chain/--run/--action ...]
+                                                      analysis of the result store, a CSV or .arrows file
+    python l2bench.py analyze --list-runs              chains and runs in the result store
+    python l2bench.py mock-node [chain] [--block-time S ...]
+                                                      local mock L2 node for a config entry (default mock_l2)
+
+Chain SDKs, pandas and plotting libraries are imported only by the
+subcommand that needs them; the import time is reported on every run.
+"""
+import time
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import ast
+import json
+import sys
+import urllib.request
+
+L2_CONFIG_PATH = 'config/l2_nodes.json'
+PROBE_TIMEOUT_SECONDS = 5
+PROBE_METHODS = ["web3_clientVersion", "eth_chainId", "eth_blockNumber", "eth_gasPrice"]
+
+_BASE_IMPORT_SECONDS = time.perf_counter() - _PROCESS_START
+
+
+def _report_import_time(subcommand_import_seconds=0.0):
+    print(f"⏱️ l2bench imports: base {_BASE_IMPORT_SECONDS * 1000:.1f} ms, "
+          f"{subcommand_import_seconds * 1000:.1f} ms for this subcommand "
+          f"(startup total {(time.perf_counter() - _PROCESS_START) * 1000:.1f} ms)")
+
+
+def _load_l2_configs():
+    with open(L2_CONFIG_PATH, 'r') as f:
+        return json.load(f)
+
+
+# --- probe ---
+def _rpc_call(rpc_url, method, params=None):
+    payload = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}).encode()
+    request = urllib.request.Request(rpc_url, data=payload, headers={"Content-Type": "application/json"})
+    start_time = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=PROBE_TIMEOUT_SECONDS) as response:
+        body = json.loads(response.read())
+    elapsed = time.perf_counter() - start_time
+    if 'error' in body:
+        raise RuntimeError(body['error'].get('message', body['error']))
+    return body.get('result'), elapsed
+
+
+def cmd_probe(args):
+    _report_import_time()
+    l2_configs = _load_l2_configs()
+    chains = args.chains or [name for name, chain_config in l2_configs.items() if not chain_config.get('mock')] # mock nodes only when named
+    all_ok = True
+    for chain_name in chains:
+        if chain_name not in l2_configs:
+            print(f"❌ {chain_name}: not found in {L2_CONFIG_PATH}"); all_ok = False; continue
+        chain_config = l2_configs[chain_name]
+        print(f"\n--- {chain_name} ({chain_config['rpc_url']}) ---")
+        try:
+            for method in PROBE_METHODS:
+                result, elapsed = _rpc_call(chain_config['rpc_url'], method)
+                shown = int(result, 16) if method != "web3_clientVersion" and isinstance(result, str) else result
+                print(f"  {method:<20} {str(shown):<40} {elapsed * 1000:8.2f} ms")
+                if method == "eth_chainId" and chain_config.get('chain_id') is not None and shown != chain_config['chain_id']:
+                    print(f"  ⚠️ Chain ID mismatch! Expected {chain_config['chain_id']}, got {shown}."); all_ok = False
+            print(f"✅ {chain_name} reachable")
+        except Exception as e:
+            print(f"❌ {chain_name} unreachable: {e}"); all_ok = False
+    return 0 if all_ok else 1
+
+
+# --- run ---
+def _parse_setting(assignment):
+    name, sep, raw_value = assignment.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got '{assignment}'")
+    try:
+        value = ast.literal_eval(raw_value)
+    except (ValueError, SyntaxError):
+        value = raw_value # Plain strings need no quotes
+    return name.strip(), value
+
+
+def cmd_run(args):
+    overrides = dict(args.settings or [])
+    if args.p2p_txs is not None: overrides['NUMBER_OF_P2P_TRANSACTIONS'] = args.p2p_txs
+    if args.sustained_seconds is not None: overrides['SUSTAINED_LOAD_DURATION_SECONDS'] = args.sustained_seconds
+    if args.sustained_tps is not None: overrides['SUSTAINED_LOAD_TPS_TARGET'] = args.sustained_tps
+    if args.resume: overrides['RESUME_FROM_CHECKPOINT'] = True
+
+    import_start = time.perf_counter()
+    import benchmark_runner as runner # Chain adapter comes from the entry's "chain_type"
+    _report_import_time(time.perf_counter() - import_start)
+    try: runner.apply_overrides(overrides) # checked here so a typo is a usage error, not a traceback from each chain
+    except ValueError as e: print(f"❌ l2bench run: {e} (settings are the UPPER_CASE constants in benchmark_runner.py)"); return 2
+    if len(args.chains) > 1:
+        return 0 if runner.run_concurrent(args.chains, run_name=args.run_name, overrides=overrides) else 1
+    return 0 if runner.run(l2_config_name=args.chains[0], run_name=args.run_name, overrides=overrides) else 1
+
+
+# --- analyze ---
+def cmd_analyze(args):
+    import_start = time.perf_counter()
+    import analyze_results
+    _report_import_time(time.perf_counter() - import_start)
+    if args.list_runs:
+        from lib.result_store import list_runs
+        for chain, run_name in list_runs(args.source or analyze_results.DEFAULT_RESULT_STORE):
+            print(f"{chain:<24} {run_name}")
+        return 0
+    analyze_results.main(args.source, make_plots=not args.no_plots, chains=args.chains, runs=args.runs, actions=args.actions)
+    return 0
+
+
+# --- mock-node ---
+def cmd_mock_node(args):
+    import_start = time.perf_counter()
+    from urllib.parse import urlparse
+    from lib.mock_node import MockL2Node, start_mock_node, stop_mock_node
+    _report_import_time(time.perf_counter() - import_start)
+    l2_configs = _load_l2_configs()
+    if args.chain not in l2_configs:
+        print(f"❌ {args.chain}: not found in {L2_CONFIG_PATH}"); return 1
+    chain_config = l2_configs[args.chain]
+    rpc_url = urlparse(chain_config['rpc_url'])
+    receipt_style = args.receipt_style or chain_config.get("mock_receipt_style") or ("zksync" if chain_config.get("chain_type") == "zksync" else "evm")
+    node = MockL2Node(chain_id=chain_config.get("chain_id") or 1337, block_time=args.block_time, inclusion_delay=args.inclusion_delay,
+                      receipt_style=receipt_style, max_txs_per_block=args.max_txs_per_block,
+                      reject_rate=args.reject_rate, drop_rate=args.drop_rate, revert_rate=args.revert_rate,
+                      rpc_error_rate=args.rpc_error_rate, response_delay=args.response_delay, seed=args.seed,
+                      unsupported_methods=args.unsupported_methods or ())
+    server = start_mock_node(node, rpc_url.port, rpc_url.hostname)
+    print(f"🧪 Mock L2 node '{args.chain}' on {chain_config['rpc_url']} (chain id {node.chain_id}, {receipt_style} receipts, "
+          f"block time {args.block_time}s, inclusion delay {args.inclusion_delay}s); Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(args.stats_interval or 3600)
+            if args.stats_interval: print(f"🧪 {node.summary()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_mock_node(server)
+        print(f"\n🧪 Mock node stopped: {node.summary()}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="l2bench", description="L2 benchmark suite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    probe = subparsers.add_parser("probe", help="Check RPC reachability, chain id and latency")
+    probe.add_argument("chains", nargs="*", help=f"Chain names from {L2_CONFIG_PATH} (default: all except \"mock\" entries)")
+    probe.set_defaults(handler=cmd_probe)
+
+    run = subparsers.add_parser("run", help="Run the full benchmark suite against one or more chains")
+    run.add_argument("chains", nargs="+", metavar="chain",
+                     help=f"Chain name(s) from {L2_CONFIG_PATH}; several run concurrently, one process each")
+    run.add_argument("--run-name", help="Run name used in run identifiers and result file names")
+    run.add_argument("--p2p-txs", type=int, help="NUMBER_OF_P2P_TRANSACTIONS")
+    run.add_argument("--sustained-seconds", type=int, help="SUSTAINED_LOAD_DURATION_SECONDS")
+    run.add_argument("--sustained-tps", type=float, help="SUSTAINED_LOAD_TPS_TARGET")
+    run.add_argument("--resume", action="store_true",
+                     help="Continue an interrupted run (same chain and --run-name) from its last checkpoint")
+    run.add_argument("--set", dest="settings", action="append", type=_parse_setting, metavar="NAME=VALUE",
+                     help="Override any runner setting, e.g. --set DO_NFT_OPERATIONS=False (repeatable)")
+    run.set_defaults(handler=cmd_run)
+
+    analyze = subparsers.add_parser("analyze", help="Analyze the result store or a results file")
+    analyze.add_argument("source", nargs="?",
+                         help="Result store directory, CSV or .arrows file (default: results/store if present, else analyze_results.DEFAULT_RESULTS_CSV)")
+    analyze.add_argument("--chain", dest="chains", action="append", help="Only this chain (store only, repeatable)")
+    analyze.add_argument("--run", dest="runs", action="append", help="Only this run, e.g. my_run_20250604_215833 (store only, repeatable)")
+    analyze.add_argument("--action", dest="actions", action="append", help="Only this action (store only, repeatable)")
+    analyze.add_argument("--list-runs", action="store_true", help="List the chains and runs in the result store and exit")
+    analyze.add_argument("--no-plots", action="store_true", help="Text analysis only (skips matplotlib/seaborn)")
+    analyze.set_defaults(handler=cmd_analyze)
+
+    mock = subparsers.add_parser("mock-node", help="Serve a deterministic mock L2 JSON-RPC node (no real chain needed)")
+    mock.add_argument("chain", nargs="?", default="mock_l2", help=f"Entry in {L2_CONFIG_PATH} whose rpc_url/chain_id/chain_type it serves")
+    mock.add_argument("--block-time", type=float, default=1.0, help="Seconds between blocks; 0 mines every tx on send")
+    mock.add_argument("--inclusion-delay", type=float, default=0.0, help="Minimum seconds from send to inclusion")
+    mock.add_argument("--receipt-style", choices=["evm", "optimism", "arbitrum", "zksync"],
+                      help="L2 receipt fields (default: the entry's mock_receipt_style, or its chain_type)")
+    mock.add_argument("--max-txs-per-block", type=int, help="Block capacity (default: unlimited)")
+    mock.add_argument("--reject-rate", type=float, default=0.0, help="Share of sent txs rejected by eth_sendRawTransaction")
+    mock.add_argument("--drop-rate", type=float, default=0.0, help="Share of sent txs accepted but never mined")
+    mock.add_argument("--revert-rate", type=float, default=0.0, help="Share of mined txs with status 0")
+    mock.add_argument("--rpc-error-rate", type=float, default=0.0, help="Share of other RPC calls answered with an error")
+    mock.add_argument("--response-delay", type=float, default=0.0, help="Seconds added to every HTTP response (simulated RTT)")
+    mock.add_argument("--seed", type=int, default=0, help="Failure injection seed")
+    mock.add_argument("--unsupported-method", dest="unsupported_methods", action="append", metavar="METHOD",
+                      help="Answer this method with \"method not found\", e.g. eth_getBlockReceipts (repeatable)")
+    mock.add_argument("--stats-interval", type=float, default=10.0, help="Print node stats this often (0: only on exit)")
+    mock.set_defaults(handler=cmd_mock_node)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
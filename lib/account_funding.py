@@ -0,0 +1,124 @@
+# lib/account_funding.py
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+
+from .async_engine import DEFAULT_MAX_IN_FLIGHT, build_contract_call_job, run_pipelined_jobs
+from .contract_loader import get_contract
+from .transaction_utils import execute_p2p_transfer
+
+# Gas reserved per transfer when sizing how much each funder must forward (21000 gas P2P)
+P2P_TRANSFER_GAS = 21000
+
+
+def _plan_fan_out(num_targets):
+    """
+    Builds the wave plan for a tree fan-out from one root. In wave w every
+    account funded so far (root included) funds one new account, so the funded
+    set doubles each wave. Returns a list of waves, each a list of
+    (funder_index, target_index) pairs; index -1 is the root.
+    """
+    waves = []
+    funded = [-1]
+    next_target = 0
+    while next_target < num_targets:
+        wave = []
+        for funder in list(funded):
+            if next_target >= num_targets:
+                break
+            wave.append((funder, next_target))
+            funded.append(next_target)
+            next_target += 1
+        waves.append(wave)
+    return waves
+
+
+def _subtree_sizes(waves, num_targets):
+    """Number of accounts each target funds later on (directly or through its own children), itself included."""
+    sizes = [1] * num_targets
+    for wave in reversed(waves):
+        for funder, target in wave:
+            if funder >= 0:
+                sizes[funder] += sizes[target]
+    return sizes
+
+
+def fund_accounts_fan_out(w3, root_pk, target_keys, min_balance_eth, gas_price_wei,
+                          run_identifier_prefix="funding", max_workers=32):
+    """
+    Funds every account in target_keys up to min_balance_eth with a tree fan-out:
+    funded accounts fund further accounts in parallel waves, so N accounts take
+    about log2(N) confirmation rounds instead of N. Accounts that already hold
+    min_balance_eth are skipped. Returns the list of transfer result dicts.
+    """
+    min_balance_wei = Web3.to_wei(min_balance_eth, 'ether')
+    fee_per_transfer_wei = P2P_TRANSFER_GAS * gas_price_wei
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        balances = list(executor.map(lambda pk: w3.eth.get_balance(w3.eth.account.from_key(pk).address), target_keys))
+    target_keys = [pk for pk, balance in zip(target_keys, balances) if balance < min_balance_wei]
+    if not target_keys:
+        print("All accounts already funded; skipping ETH funding stage.")
+        return []
+
+    waves = _plan_fan_out(len(target_keys))
+    subtree_sizes = _subtree_sizes(waves, len(target_keys))
+    print(f"Funding {len(target_keys)} account(s) with {min_balance_eth} ETH each in {len(waves)} fan-out wave(s)...")
+
+    results = []
+    unfunded = set() # Targets whose funding failed; their subtrees are skipped
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for wave_number, wave in enumerate(waves, start=1):
+            futures = []
+            for funder, target in wave:
+                if funder in unfunded:
+                    unfunded.add(target)
+                    continue
+                funder_pk = root_pk if funder < 0 else target_keys[funder]
+                target_address = w3.eth.account.from_key(target_keys[target]).address
+                # The target keeps min_balance for itself and forwards the rest (plus fees) to its subtree.
+                amount_wei = subtree_sizes[target] * min_balance_wei + (subtree_sizes[target] - 1) * fee_per_transfer_wei
+                run_id = f"{run_identifier_prefix}_eth_wave_{wave_number}_to_{target}"
+                futures.append((target, executor.submit(
+                    execute_p2p_transfer, w3, funder_pk, target_address,
+                    Web3.from_wei(amount_wei, 'ether'), gas_price_wei, run_identifier=run_id
+                )))
+            failed_count = 0
+            for target, future in futures:
+                result = future.result()
+                result['action'] = 'fund_account_eth'
+                results.append(result)
+                if result.get('status') != 'Success':
+                    unfunded.add(target); failed_count += 1
+            print(f"Funding wave {wave_number}/{len(waves)}: {len(futures) - failed_count} ok, {failed_count} failed")
+    if unfunded:
+        print(f"⚠️ {len(unfunded)} account(s) left unfunded (failed transfer in their funding chain).")
+    return results
+
+
+def fund_accounts_erc20(w3, rpc_url, token_owner_pk, token_contract_address, token_sol_filename, target_addresses,
+                        min_balance_wei, gas_price_wei, run_identifier_prefix="funding", max_workers=32,
+                        max_in_flight=DEFAULT_MAX_IN_FLIGHT, chain_adapter=None):
+    """
+    Mints min_balance_wei of an ERC20 (TokenA/TokenB) to every address below that
+    balance. mint() is onlyOwner, so all mints come from the token owner; they go
+    through the pipelined engine with the owner as its single sender, which hands
+    the node consecutive nonces in order while keeping several mints in flight.
+    """
+    token_contract = get_contract(w3, token_sol_filename, token_contract_address)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        balances = list(executor.map(lambda a: token_contract.functions.balanceOf(Web3.to_checksum_address(a)).call(), target_addresses))
+    needs_tokens = [a for a, balance in zip(target_addresses, balances) if balance < min_balance_wei]
+    if not needs_tokens:
+        print(f"All accounts already hold {token_sol_filename} tokens; skipping.")
+        return []
+
+    print(f"Minting {token_sol_filename} to {len(needs_tokens)} account(s)...")
+    token_name = token_sol_filename.replace(".sol", "").lower()
+    jobs = [build_contract_call_job(token_sol_filename, token_contract_address, 'mint', [Web3.to_checksum_address(address), min_balance_wei], 150000,
+                                    f'fund_account_{token_name}', f"{run_identifier_prefix}_{token_name}_to_{i}")
+            for i, address in enumerate(needs_tokens)]
+    results = run_pipelined_jobs(rpc_url, w3.eth.chain_id, token_owner_pk, gas_price_wei, jobs,
+                                 max_in_flight=max_in_flight, chain_adapter=chain_adapter)
+    ok = sum(1 for r in results if r.get('status') == 'Success')
+    print(f"{token_sol_filename} funding: {ok} ok, {len(results) - ok} failed")
+    return results
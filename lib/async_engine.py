@@ -0,0 +1,259 @@
+# lib/async_engine.py
+import asyncio
+import time
+from eth_account import Account
+from web3 import AsyncWeb3, Web3
+from web3.middleware import ExtraDataToPOAMiddleware
+
+from .contract_loader import encode_function_call
+from .nonce_manager import next_nonce_async, invalidate_nonce
+from .receipt_tracker import block_receipt_tracking
+from .block_cache import get_block_cache
+from .chain_identity import remember_chain_id
+from .chain_adapters import get_chain_adapter
+from .gas_oracle import gas_price_reader
+from .transports import build_async_provider
+from .metrics_server import instrument_web3, TXS_IN_FLIGHT
+from .tx_record import TxRecord, stamp
+
+# --- Engine Defaults ---
+DEFAULT_MAX_IN_FLIGHT = 16
+RECEIPT_TIMEOUT_SECONDS = 180
+RECEIPT_POLL_LATENCY_SECONDS = 0.05
+# "block": one BlockReceiptTracker per connection resolves receipts per block;
+# "poll": wait_for_transaction_receipt per tx hash (legacy behaviour)
+DEFAULT_RECEIPT_MODE = "block"
+
+
+async def connect_to_l2_async(rpc_url, expected_chain_id=None):
+    """
+    Async counterpart of connect_to_l2; returns an AsyncWeb3 instance. A ws:// or
+    wss:// rpc_url gets a persistent WebSocket connection, anything else the
+    pooled keep-alive HTTP session.
+    """
+    print(f"Attempting async connection to L2 node at {rpc_url}...")
+    async_w3 = AsyncWeb3(await build_async_provider(rpc_url))
+    if async_w3.provider.has_persistent_connection:
+        await async_w3.provider.connect()
+    if not await async_w3.is_connected():
+        raise ConnectionError(f"Failed to connect to L2 node at {rpc_url}")
+
+    async_w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+
+    actual_chain_id = await async_w3.eth.chain_id
+    print(f"✅ Async connection to L2 ready. Actual Chain ID: {actual_chain_id}")
+
+    if expected_chain_id is not None and actual_chain_id != expected_chain_id:
+        raise ValueError(
+            f"Chain ID mismatch! Expected {expected_chain_id}, but connected to {actual_chain_id}."
+        )
+    remember_chain_id(async_w3, actual_chain_id)
+    return instrument_web3(async_w3)
+
+
+# --- Job Builders ---
+# A job is a plain dict describing one transaction: the result metadata
+# ('run_identifier', 'action', optional 'extra_fields') plus a partial 'tx'
+# dict (to/value/data/gas). Nonce, gas price and chain id are filled in by the
+# engine at submit time.
+def build_p2p_transfer_job(recipient_address, amount_eth, run_identifier, action='p2p_eth_transfer'):
+    return {
+        'run_identifier': run_identifier,
+        'action': action,
+        'tx': {
+            'to': Web3.to_checksum_address(recipient_address),
+            'value': Web3.to_wei(amount_eth, 'ether'),
+            'gas': 21000,
+        },
+    }
+
+
+def build_contract_call_job(contract_sol_filename, contract_address, function_name, args, gas, action, run_identifier, extra_fields=None):
+    contract_address = Web3.to_checksum_address(contract_address)
+    call_data = encode_function_call(contract_sol_filename, function_name, args)
+    job = {
+        'run_identifier': run_identifier,
+        'action': action,
+        'tx': {'to': contract_address, 'value': 0, 'data': call_data, 'gas': gas},
+        'extra_fields': {'contract_address': contract_address},
+    }
+    if extra_fields:
+        job['extra_fields'].update(extra_fields)
+    return job
+
+
+def _record_open_loop_timing(record, job, actual_send_time, receipt_time):
+    """Intended/actual send and receipt times for jobs issued by an open-loop scheduler (nothing for plain jobs)."""
+    intended_send_time = job.get('intended_send_time')
+    if intended_send_time is None:
+        return
+    record.intended_send_time = intended_send_time
+    record.actual_send_time = actual_send_time
+    record.receipt_time = receipt_time # send lag and latency from intended time are derived at export
+
+
+def fill_receipt_fields(record, tx_receipt, gas_price_wei, chain_adapter=None):
+    """Status and raw gas/fee/L1 fee fields of a TxRecord, from a mined receipt (confirmation time comes from its stage stamps)."""
+    record.status = 'Success' if tx_receipt['status'] == 1 else 'Failed'
+    return (chain_adapter or get_chain_adapter()).record_receipt(record, tx_receipt, gas_price_wei)
+
+
+async def await_receipt(async_w3, tx_hash, record, receipt_tracker=None, timeout=RECEIPT_TIMEOUT_SECONDS,
+                        poll_latency=RECEIPT_POLL_LATENCY_SECONDS):
+    """
+    Waits for a sent tx's receipt and stamps receipt_fetched_ns plus the including
+    block's timestamp and first-seen times (block_cache) on the record.
+    Returns (receipt, wall-clock time the block was first seen).
+    """
+    TXS_IN_FLIGHT.inc()
+    try:
+        if receipt_tracker is not None:
+            # The tracker noted the block in the cache when it first saw it, before fetching its receipts
+            tx_receipt, _, _ = await receipt_tracker.wait_for(tx_hash, timeout)
+        else:
+            tx_receipt = await async_w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout, poll_latency=poll_latency)
+    finally:
+        TXS_IN_FLIGHT.dec()
+    block_cache = get_block_cache(async_w3); block_cache.observe(tx_receipt['blockNumber'])
+    stamp(record, 'receipt_fetched_ns')
+    block_header = await block_cache.get_async(async_w3, tx_receipt['blockNumber'])
+    block_header.record_into(record)
+    return tx_receipt, block_header.seen_time
+
+
+# --- Pipelined Engine ---
+class PipelinedTxEngine:
+    """
+    Keeps up to max_in_flight transactions outstanding for a single sender and
+    collects receipts as they land, producing the same TxRecord results as the
+    blocking execute_* helpers in transaction_utils. With a receipt_tracker,
+    receipts come from the shared block-driven tracker instead of per-tx polling.
+    chain_adapter (default: EVM) builds and signs the transactions for the chain type.
+    gas_price_wei is a fixed price or a GasPriceOracle (or callable) read once per job.
+    """
+
+    def __init__(self, async_w3, sender_pk, gas_price_wei,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 receipt_timeout=RECEIPT_TIMEOUT_SECONDS,
+                 poll_latency=RECEIPT_POLL_LATENCY_SECONDS,
+                 receipt_tracker=None, chain_adapter=None):
+        self.async_w3 = async_w3
+        self.chain_adapter = chain_adapter or get_chain_adapter()
+        self.sender_pk = sender_pk
+        self.sender_address = Account.from_key(sender_pk).address
+        self._read_gas_price = gas_price_reader(gas_price_wei)
+        self.max_in_flight = max_in_flight
+        self.receipt_timeout = receipt_timeout
+        self.poll_latency = poll_latency
+        self.receipt_tracker = receipt_tracker
+        self.in_flight = 0
+        self._chain_id = None
+        # Held only while a nonce is assigned and the raw tx is handed to the
+        # node, so submissions reach the node in nonce order.
+        self._submit_lock = asyncio.Lock()
+
+    async def submit(self, job):
+        """Signs, sends and awaits one job; returns a TxRecord (never raises)."""
+        nonce_val = 'N/A'; actual_send_time = None
+        result = TxRecord(job['run_identifier'], job['action'], None, self.sender_address, nonce_val)
+        try:
+            async with self._submit_lock:
+                stamp(result, 'build_start_ns')
+                if self._chain_id is None:
+                    self._chain_id = await self.async_w3.eth.chain_id
+                nonce_val = result.nonce = await next_nonce_async(self.async_w3, self.sender_address)
+                gas_price_wei = self._read_gas_price()
+                tx_details = dict(job['tx'])
+                tx_details.update({'from': self.sender_address, 'gasPrice': gas_price_wei, 'nonce': nonce_val, 'chainId': self._chain_id})
+                tx_details = await self.chain_adapter.prepare_transaction_async(self.async_w3, tx_details)
+                stamp(result, 'sign_start_ns')
+                raw_tx, signed_hash = self.chain_adapter.sign_transaction(tx_details, self.sender_pk)
+                if self.receipt_tracker is not None:
+                    self.receipt_tracker.track(signed_hash)
+                try:
+                    actual_send_time = time.time(); stamp(result, 'submit_start_ns')
+                    tx_hash = await self.async_w3.eth.send_raw_transaction(raw_tx)
+                    stamp(result, 'submit_ack_ns')
+                except Exception:
+                    # The node rejected this nonce; refetch so the next job does not leave a gap.
+                    invalidate_nonce(self.async_w3, self.sender_address)
+                    if self.receipt_tracker is not None:
+                        self.receipt_tracker.untrack(signed_hash)
+                    raise
+                if self.receipt_tracker is not None and bytes(tx_hash) != signed_hash:
+                    # Locally computed hash disagreed with the node's; wait on the node's instead,
+                    # tracked before the local one is dropped so no block falls in between
+                    self.receipt_tracker.track(bytes(tx_hash))
+                    self.receipt_tracker.untrack(signed_hash)
+
+            result.tx_hash = tx_hash.hex()
+            self.in_flight += 1
+            try:
+                tx_receipt, end_time = await await_receipt(self.async_w3, tx_hash, result, self.receipt_tracker,
+                                                           self.receipt_timeout, self.poll_latency)
+            finally:
+                self.in_flight -= 1
+
+            fill_receipt_fields(result, tx_receipt, gas_price_wei, self.chain_adapter)
+            if job.get('extra_fields'): result.update(job['extra_fields'])
+            _record_open_loop_timing(result, job, actual_send_time, end_time)
+            return result
+        except Exception as e:
+            if nonce_val != 'N/A':
+                # Receipt timeout or revert-by-drop: the node's pending count is the source of truth again.
+                invalidate_nonce(self.async_w3, self.sender_address)
+            result.status = 'Error'; result['error_message'] = str(e)
+            if job.get('extra_fields'): result.update(job['extra_fields'])
+            _record_open_loop_timing(result, job, actual_send_time, None)
+            return result
+
+    async def run(self, jobs, on_result=None):
+        """Runs all jobs with at most max_in_flight outstanding; results are returned in job order."""
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def _run_one(job):
+            async with semaphore:
+                result = await self.submit(job)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return await asyncio.gather(*(_run_one(job) for job in jobs))
+
+
+async def run_sharded(engines, jobs, on_result=None):
+    """Spreads jobs across engines (one per sender) by index; each engine keeps its own in-flight window."""
+    shards = [jobs[i::len(engines)] for i in range(len(engines))]
+    shard_results = await asyncio.gather(*(engine.run(shard, on_result=on_result) for engine, shard in zip(engines, shards)))
+    results = [None] * len(jobs)
+    for i, shard_result in enumerate(shard_results):
+        results[i::len(engines)] = shard_result
+    return results
+
+
+def run_pipelined_jobs(rpc_url, expected_chain_id, sender_pks, gas_price_wei, jobs,
+                       max_in_flight=DEFAULT_MAX_IN_FLIGHT, on_result=None, receipt_mode=DEFAULT_RECEIPT_MODE, chain_adapter=None):
+    """
+    Blocking entry point for the synchronous runners: connects, runs the jobs and disconnects.
+    sender_pks is one private key or a list of keys (e.g. SenderPool.private_keys); with
+    several keys the jobs are sharded across one engine per sender.
+    """
+    if isinstance(sender_pks, str):
+        sender_pks = [sender_pks]
+
+    async def _main():
+        async_w3 = await connect_to_l2_async(rpc_url, expected_chain_id)
+        try:
+            async with block_receipt_tracking(async_w3, enabled=(receipt_mode == "block")) as tracker:
+                engines = [PipelinedTxEngine(async_w3, pk, gas_price_wei, max_in_flight=max_in_flight, receipt_tracker=tracker, chain_adapter=chain_adapter) for pk in sender_pks]
+                start_time = time.time()
+                results = await run_sharded(engines, jobs, on_result=on_result)
+                elapsed = time.time() - start_time
+            print(f"Pipelined engine: {len(results)} txs in {elapsed:.2f}s "
+                  f"({len(results) / elapsed if elapsed > 0 else 0:.2f} TPS, "
+                  f"{len(engines)} sender(s), max in flight per sender: {max_in_flight}, receipts: {receipt_mode})")
+            return results
+        finally:
+            await async_w3.provider.disconnect()
+
+    return asyncio.run(_main())
@@ -0,0 +1,93 @@
+# lib/block_cache.py
+import asyncio
+import threading
+import time
+
+from .chain_identity import chain_key
+
+
+# --- Block Header Cache ---
+class BlockHeader:
+    """Chain timestamp of one block and the local time (wall clock and perf_counter_ns) it was first observed."""
+    __slots__ = ('number', 'timestamp', 'seen_time', 'seen_ns')
+
+    def __init__(self, number, timestamp, seen_time, seen_ns):
+        self.number = number
+        self.timestamp = timestamp
+        self.seen_time = seen_time
+        self.seen_ns = seen_ns
+
+    def record_into(self, stages):
+        """Copies block timestamp and first-seen times into a TxRecord or stage dict."""
+        stages['block_timestamp'] = self.timestamp
+        stages['block_seen_time'] = self.seen_time
+        stages['block_seen_ns'] = self.seen_ns
+
+
+class BlockHeaderCache:
+    """
+    Headers of one chain by block number. A block's first-seen time is taken the
+    first time anything observes it (the receipt tracker following new heads, or
+    the first receipt that lands in it) and never moved later; its timestamp is
+    fetched at most once per run, however many txs landed in the block.
+    """
+
+    def __init__(self):
+        self._headers = {}
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._fetching = {} # block number -> Future, so concurrent async waiters share one eth_getBlockByNumber
+        self.fetches = 0
+
+    def observe(self, block_number, timestamp=None, seen_time=None, seen_ns=None):
+        """Notes that a block has been seen (now, unless given); returns its cached header."""
+        with self._lock:
+            header = self._headers.get(block_number)
+            if header is None:
+                header = self._headers[block_number] = BlockHeader(
+                    block_number, timestamp,
+                    seen_time if seen_time is not None else time.time(),
+                    seen_ns if seen_ns is not None else time.perf_counter_ns())
+            elif header.timestamp is None and timestamp is not None:
+                header.timestamp = timestamp
+            return header
+
+    def get(self, w3_instance, block_number):
+        """Header for a block seen now at the latest, fetching its timestamp if nothing has supplied it yet."""
+        header = self.observe(block_number)
+        if header.timestamp is None:
+            with self._fetch_lock: # helpers on several threads may wait on the same block
+                if header.timestamp is None:
+                    header.timestamp = w3_instance.eth.get_block(block_number)['timestamp']; self.fetches += 1
+        return header
+
+    async def get_async(self, async_w3, block_number):
+        """AsyncWeb3 counterpart of get."""
+        header = self.observe(block_number)
+        if header.timestamp is None:
+            future = self._fetching.get(block_number)
+            if future is None:
+                future = self._fetching[block_number] = asyncio.ensure_future(async_w3.eth.get_block(block_number))
+                future.add_done_callback(lambda _: self._fetching.pop(block_number, None))
+                self.fetches += 1
+            block = await asyncio.shield(future)
+            if header.timestamp is None: header.timestamp = block['timestamp']
+        return header
+
+    def __len__(self):
+        return len(self._headers)
+
+
+# --- Shared Registry ---
+# One cache per chain, shared by the blocking helpers, the async engines and the
+# receipt tracker of a run, over HTTP and WebSocket connections alike.
+_BLOCK_CACHES = {}
+_REGISTRY_LOCK = threading.Lock()
+
+def get_block_cache(w3_instance):
+    key = chain_key(w3_instance)
+    with _REGISTRY_LOCK:
+        cache = _BLOCK_CACHES.get(key)
+        if cache is None:
+            cache = _BLOCK_CACHES[key] = BlockHeaderCache()
+        return cache
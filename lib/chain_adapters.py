@@ -0,0 +1,275 @@
+# lib/chain_adapters.py
+import abc
+from eth_account import Account
+from eth_utils import keccak
+from web3 import Web3
+
+from .block_cache import get_block_cache
+from .l2_utils import connect_to_l2, connect_to_zksync_l2
+from .metrics_server import TXS_IN_FLIGHT
+from .nonce_manager import next_nonce
+from .tx_record import stamp
+
+# --- Adapter Defaults ---
+DEFAULT_CHAIN_TYPE = "evm" # config/l2_nodes.json entries without a "chain_type"
+ZKSYNC_MAX_PRIORITY_FEE_WEI = 45250000 # Same tip the original zksync_transaction_utils helpers used
+ZKSYNC_GAS_ESTIMATE_MARGIN = 1.2 # Headroom on cached estimates; zkSync gas includes pubdata and varies slightly per call
+
+
+# --- Helper function to extract L1 fee data ---
+def receipt_quantity(tx_receipt, key):
+    """L2-specific receipt fields (l1Fee, l1BatchNumber, ...) are not in web3's receipt formatters and arrive as hex strings."""
+    value = tx_receipt.get(key)
+    return int(value, 16) if isinstance(value, str) and value.startswith('0x') else value
+
+
+def extract_l1_fee_data(w3_instance, tx_receipt):
+    """Extract L1 fee components from transaction receipt"""
+    l1_fee_component_wei = receipt_quantity(tx_receipt, 'l1Fee')
+    l1_gas_used_on_l1 = receipt_quantity(tx_receipt, 'l1GasUsed')
+    l1_gas_price_on_l1 = receipt_quantity(tx_receipt, 'l1GasPrice')
+    l1_fee_scalar = tx_receipt.get('l1FeeScalar')
+
+    return {
+        'l1_fee_wei': l1_fee_component_wei if l1_fee_component_wei is not None else None,
+        'l1_fee_eth': w3_instance.from_wei(l1_fee_component_wei, 'ether') if l1_fee_component_wei is not None else None,
+        'l1_gas_used': l1_gas_used_on_l1 if l1_gas_used_on_l1 is not None else None,
+        'l1_gas_price_gwei': w3_instance.from_wei(l1_gas_price_on_l1, 'gwei') if l1_gas_price_on_l1 is not None else None,
+        'l1_fee_scalar': l1_fee_scalar if l1_fee_scalar is not None else None
+    }
+
+
+# --- Base Adapter ---
+class ChainAdapter(abc.ABC):
+    """
+    Everything that differs between chain types when sending one transaction:
+    connect, build, sign, send, await the receipt and read the fees. Adapters
+    hold no connection (every call takes the web3 instance), so one adapter is
+    shared by the blocking helpers, the async engine and worker processes.
+    Transactions are web3-style dicts (from/to/value/data/gas/gasPrice/nonce/chainId);
+    a transaction without 'to' is a contract deployment.
+    """
+    chain_type = None
+
+    @abc.abstractmethod
+    def connect(self, rpc_url, expected_chain_id=None, **connect_kwargs):
+        """Connected web3 instance for this chain type."""
+
+    def fetch_gas_price(self, w3_instance):
+        return w3_instance.eth.gas_price
+
+    def build_transaction(self, w3_instance, sender_address, tx_fields, gas_price_wei, nonce=None):
+        """Completes tx_fields with sender, gas price, chain id and a nonce from the shared nonce manager."""
+        tx = dict(tx_fields)
+        tx.update({'from': sender_address, 'gasPrice': gas_price_wei, 'chainId': w3_instance.eth.chain_id,
+                   'nonce': nonce if nonce is not None else next_nonce(w3_instance, sender_address)})
+        return tx
+
+    def build_deploy_transaction(self, contract, constructor_args, tx_params):
+        """Deployment tx for a contract class (from contract_loader.get_contract) and its constructor args."""
+        return contract.constructor(*constructor_args).build_transaction(tx_params)
+
+    def prepare_transaction(self, w3_instance, tx):
+        """Last chance to adjust a complete tx with the node's help (e.g. gas) before it is signed."""
+        return tx
+
+    async def prepare_transaction_async(self, async_w3, tx):
+        return tx
+
+    @abc.abstractmethod
+    def sign_transaction(self, tx, sender_pk):
+        """Signs locally; returns (raw_tx_bytes, tx_hash_bytes). No network I/O."""
+
+    def send_raw_transaction(self, w3_instance, raw_tx):
+        return w3_instance.eth.send_raw_transaction(raw_tx)
+
+    def sign_and_send(self, w3_instance, tx, sender_pk, stages=None):
+        """Prepares, signs and sends tx; stamps the sign/submit stages into `stages` (a dict or TxRecord) if given."""
+        tx = self.prepare_transaction(w3_instance, tx)
+        stamp(stages, 'sign_start_ns')
+        raw_tx, _ = self.sign_transaction(tx, sender_pk)
+        stamp(stages, 'submit_start_ns')
+        tx_hash = self.send_raw_transaction(w3_instance, raw_tx)
+        stamp(stages, 'submit_ack_ns')
+        return tx_hash
+
+    def poll_receipt(self, w3_instance, tx_hash, timeout=180):
+        return w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+
+    def wait_for_receipt(self, w3_instance, tx_hash, timeout=180, stages=None):
+        """Polls for the receipt; stamps receipt fetched and the including block's timestamp and first-seen time."""
+        TXS_IN_FLIGHT.inc()
+        try:
+            tx_receipt = self.poll_receipt(w3_instance, tx_hash, timeout)
+        finally:
+            TXS_IN_FLIGHT.dec()
+        if stages is not None:
+            # First seen by this receipt unless another tx's receipt (or a tracker) saw the block earlier
+            block_cache = get_block_cache(w3_instance); block_cache.observe(tx_receipt['blockNumber'])
+            stamp(stages, 'receipt_fetched_ns')
+            block_cache.get(w3_instance, tx_receipt['blockNumber']).record_into(stages)
+        return tx_receipt
+
+    def record_receipt(self, record, tx_receipt, gas_price_wei):
+        """Copies the raw gas, fee and L1 fee fields of a mined receipt into a TxRecord (no unit conversion)."""
+        record.block_number = tx_receipt['blockNumber']
+        record.gas_used = tx_receipt['gasUsed']
+        record.gas_price_wei = gas_price_wei
+        record.effective_gas_price_wei = tx_receipt.get('effectiveGasPrice', gas_price_wei)
+        record.l1_fee_wei = receipt_quantity(tx_receipt, 'l1Fee')
+        record.l1_gas_used = receipt_quantity(tx_receipt, 'l1GasUsed')
+        record.l1_gas_price_wei = receipt_quantity(tx_receipt, 'l1GasPrice')
+        record.l1_fee_scalar = tx_receipt.get('l1FeeScalar')
+        return record
+
+    def l1_fee_data(self, w3_instance, tx_receipt):
+        return extract_l1_fee_data(w3_instance, tx_receipt)
+
+
+# --- EVM (OP Stack, Arbitrum, ...) ---
+class EvmChainAdapter(ChainAdapter):
+    """Legacy-gas-price transactions signed with eth_account, as the benchmark has always sent them."""
+    chain_type = "evm"
+
+    def connect(self, rpc_url, expected_chain_id=None, **connect_kwargs):
+        return connect_to_l2(rpc_url, expected_chain_id, **connect_kwargs)
+
+    def sign_transaction(self, tx, sender_pk):
+        signed_tx = Account.sign_transaction(tx, sender_pk)
+        return bytes(signed_tx.raw_transaction), bytes(signed_tx.hash)
+
+
+# --- zkSync Era ---
+class ZkSyncChainAdapter(ChainAdapter):
+    """
+    EIP-712 (type 0x71) transactions signed with the zksync2 SDK. Deployments go
+    through the ContractDeployer system contract with the bytecode as factory
+    dependency, so contracts must be compiled with zksolc. Gas is estimated
+    once per call shape (target + selector) and reused, keeping estimation off
+    the hot path of the concurrent engines.
+    """
+    chain_type = "zksync"
+
+    def __init__(self):
+        self._gas_estimates = {}
+
+    def connect(self, rpc_url, expected_chain_id=None, **connect_kwargs):
+        # zksync2 builds its own provider; RPC batching options do not apply
+        zk_web3 = connect_to_zksync_l2(rpc_url, expected_chain_id)
+        actual_chain_id = zk_web3.eth.chain_id
+        if expected_chain_id is not None and actual_chain_id != expected_chain_id:
+            raise ValueError(f"Chain ID mismatch! Expected {expected_chain_id}, but connected to {actual_chain_id}.")
+        return zk_web3
+
+    def fetch_gas_price(self, w3_instance):
+        return w3_instance.zksync.gas_price
+
+    def build_deploy_transaction(self, contract, constructor_args, tx_params):
+        from zksync2.manage_contracts.deploy_addresses import ZkSyncAddresses
+        from zksync2.manage_contracts.precompute_contract_deployer import PrecomputeContractDeployer
+
+        bytecode = bytes(contract.bytecode)
+        constructor_data = bytes(Web3.to_bytes(hexstr=contract.constructor(*constructor_args).data_in_transaction))[len(bytecode):]
+        tx = dict(tx_params)
+        tx.update({
+            'to': Web3.to_checksum_address(ZkSyncAddresses.CONTRACT_DEPLOYER_ADDRESS.value),
+            'data': PrecomputeContractDeployer(contract.w3).encode_create(bytecode, constructor_data or None),
+            'value': 0, 'factoryDeps': [bytecode],
+        })
+        return tx
+
+    def _gas_key(self, tx):
+        data = tx.get('data') or '0x'
+        selector = (data if isinstance(data, str) else Web3.to_hex(data))[:10]
+        # Plain transfers cost the same whatever the recipient; calls are keyed by contract and function
+        target = tx.get('to') if selector != '0x' else None
+        return (target, selector, bool(tx.get('value')), tuple(keccak(dep) for dep in tx.get('factoryDeps') or ()))
+
+    def _apply_gas_estimate(self, tx, estimate):
+        tx = dict(tx)
+        tx['gas'] = max(tx.get('gas') or 0, int(estimate * ZKSYNC_GAS_ESTIMATE_MARGIN))
+        return tx
+
+    def _estimate_request(self, tx):
+        request = {k: v for k, v in tx.items() if k in ('from', 'to', 'value', 'data')}
+        if tx.get('factoryDeps'):
+            request['eip712Meta'] = {'gasPerPubdata': 50000, 'factoryDeps': [Web3.to_hex(dep) for dep in tx['factoryDeps']]}
+        return request
+
+    def prepare_transaction(self, w3_instance, tx):
+        key = self._gas_key(tx)
+        if key not in self._gas_estimates:
+            self._gas_estimates[key] = w3_instance.zksync.eth_estimate_gas(self._estimate_request(tx))
+        return self._apply_gas_estimate(tx, self._gas_estimates[key])
+
+    async def prepare_transaction_async(self, async_w3, tx):
+        key = self._gas_key(tx)
+        if key not in self._gas_estimates:
+            self._gas_estimates[key] = await async_w3.eth.estimate_gas(self._estimate_request(tx))
+        return self._apply_gas_estimate(tx, self._gas_estimates[key])
+
+    def sign_transaction(self, tx, sender_pk):
+        from zksync2.module.request_types import EIP712Meta
+        from zksync2.signer.eth_signer import PrivateKeyEthSigner
+        from zksync2.transaction.transaction712 import Transaction712
+
+        account = Account.from_key(sender_pk)
+        signer = PrivateKeyEthSigner(account, tx['chainId'])
+        tx_712 = Transaction712(
+            chain_id=tx['chainId'], nonce=tx['nonce'], gas_limit=tx['gas'],
+            to=tx['to'], value=tx.get('value', 0), data=tx.get('data') or '0x',
+            maxPriorityFeePerGas=min(ZKSYNC_MAX_PRIORITY_FEE_WEI, tx['gasPrice']), maxFeePerGas=tx['gasPrice'],
+            from_=account.address,
+            meta=EIP712Meta(gas_per_pub_data=EIP712Meta.GAS_PER_PUB_DATA_DEFAULT, custom_signature=None,
+                            factory_deps=tx.get('factoryDeps'), paymaster_params=None),
+        )
+        typed_data = tx_712.to_eip712_struct()
+        signed_message = signer.sign_typed_data(typed_data)
+        raw_tx = bytes(tx_712.encode(signed_message))
+        # zkSync's hash of a 0x71 tx: keccak(signed EIP-712 digest ++ keccak(signature))
+        signed_digest = keccak(signer.typed_data_to_signed_bytes(typed_data).body)
+        return raw_tx, keccak(signed_digest + keccak(bytes(signed_message.signature)))
+
+    def send_raw_transaction(self, w3_instance, raw_tx):
+        return w3_instance.zksync.send_raw_transaction(raw_tx)
+
+    def poll_receipt(self, w3_instance, tx_hash, timeout=180):
+        return w3_instance.zksync.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+
+    def record_receipt(self, record, tx_receipt, gas_price_wei):
+        # L1 costs are folded into gasUsed (pubdata) on zkSync; the batch is what settles on L1
+        super().record_receipt(record, tx_receipt, gas_price_wei)
+        record.l1_batch_number = receipt_quantity(tx_receipt, 'l1BatchNumber')
+        return record
+
+    def l1_fee_data(self, w3_instance, tx_receipt):
+        fields = super().l1_fee_data(w3_instance, tx_receipt)
+        fields['l1_batch_number'] = receipt_quantity(tx_receipt, 'l1BatchNumber')
+        return fields
+
+
+# --- Registry ---
+CHAIN_ADAPTERS = {
+    EvmChainAdapter.chain_type: EvmChainAdapter,
+    ZkSyncChainAdapter.chain_type: ZkSyncChainAdapter,
+}
+
+
+def get_chain_adapter(chain_type=None):
+    """Adapter for a chain type (or an l2_nodes.json entry, via its "chain_type" key)."""
+    if isinstance(chain_type, dict):
+        chain_type = chain_type.get("chain_type")
+    chain_type = chain_type or DEFAULT_CHAIN_TYPE
+    if chain_type not in CHAIN_ADAPTERS:
+        raise ValueError(f"Unknown chain type: {chain_type} (expected one of {', '.join(CHAIN_ADAPTERS)})")
+    return CHAIN_ADAPTERS[chain_type]()
+
+
+_ADAPTERS_BY_TYPE = {}
+
+def chain_adapter_for(w3_instance):
+    """Shared adapter matching a connected instance: zkSync for zksync2's ZkWeb3, EVM otherwise."""
+    chain_type = "zksync" if hasattr(w3_instance, 'zksync') else "evm"
+    if chain_type not in _ADAPTERS_BY_TYPE:
+        _ADAPTERS_BY_TYPE[chain_type] = get_chain_adapter(chain_type)
+    return _ADAPTERS_BY_TYPE[chain_type]
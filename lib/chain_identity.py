@@ -0,0 +1,30 @@
+# lib/chain_identity.py
+import threading
+import weakref
+from web3 import AsyncWeb3
+
+# --- Chain Keys ---
+# The shared per-chain registries (nonce managers, block header caches, gas price
+# oracles) are keyed by chain id rather than by endpoint URL, so a run's HTTP and
+# WebSocket connections to the same chain draw from the same nonce streams and caches.
+_CHAIN_IDS = weakref.WeakKeyDictionary() # provider -> chain id
+_REGISTRY_LOCK = threading.Lock()
+
+def remember_chain_id(w3_instance, chain_id):
+    """Records the chain id a connect_* helper already fetched, so chain_key needs no RPC call."""
+    with _REGISTRY_LOCK:
+        _CHAIN_IDS[w3_instance.provider] = chain_id
+
+def chain_key(w3_instance):
+    """
+    Registry key for w3_instance's chain. A sync instance not made by a connect_*
+    helper has its chain id fetched once; an AsyncWeb3 instance whose chain id
+    was never recorded falls back to its endpoint URL.
+    """
+    chain_id = _CHAIN_IDS.get(w3_instance.provider)
+    if chain_id is None and not isinstance(w3_instance, AsyncWeb3):
+        chain_id = w3_instance.eth.chain_id
+        remember_chain_id(w3_instance, chain_id)
+    if chain_id is None:
+        return ('endpoint', str(getattr(w3_instance.provider, 'endpoint_uri', None) or id(w3_instance.provider)))
+    return ('chain', chain_id)
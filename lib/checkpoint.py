@@ -0,0 +1,143 @@
+# lib/checkpoint.py
+import json
+import os
+import re
+import time
+
+# --- Checkpoint Defaults ---
+CHECKPOINT_VERSION = 1
+DEFAULT_CHECKPOINT_DIR = os.path.join("results", "checkpoints")
+
+
+def _file_part(value):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(value)) or '_'
+
+
+def checkpoint_path(run_name, chain, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+    """One checkpoint per (chain, run name), so a resumed run finds it without knowing the results timestamp."""
+    return os.path.join(checkpoint_dir, f"{_file_part(chain)}__{_file_part(run_name)}.json")
+
+
+# --- Run Checkpoint ---
+class RunCheckpoint:
+    """
+    Progress of one benchmark run: completed phases, deployed contract addresses,
+    minted NFT ids, the run's transaction counter, each sender's pending nonce and
+    the number of result rows on disk when the checkpoint was taken. Saved after
+    every phase (results flushed first, file replaced atomically), so a run that
+    dies mid-phase resumes from the start of that phase, unless the phase also
+    saved its progress (save_progress) and knows how to continue from it.
+    path=None keeps the state in memory only.
+    """
+
+    def __init__(self, path, run_name, chain, state=None):
+        self.path = path
+        self.state = state or {
+            'version': CHECKPOINT_VERSION, 'run_name': run_name, 'chain': chain,
+            'completed_phases': [], 'transaction_counter': 0, 'deployed': {}, 'minted_token_ids': [],
+            'nonces': {}, 'results_path': None, 'results_format': None, 'results_columns': None, 'results_rows': 0,
+            'results_extra_outputs': [], 'phase_progress': None,
+        }
+
+    @classmethod
+    def load(cls, path):
+        """Checkpoint saved at path, or None if there is none (or it is unreadable)."""
+        try:
+            with open(path) as f: state = json.load(f)
+        except (OSError, ValueError): return None
+        if state.get('version') != CHECKPOINT_VERSION: return None
+        return cls(path, state['run_name'], state['chain'], state)
+
+    @property
+    def completed_phases(self):
+        return self.state['completed_phases']
+
+    def phase_done(self, phase):
+        return phase in self.state['completed_phases']
+
+    def resumed(self, phase, label):
+        """True (and says so) if the phase completed before the checkpoint this run resumed from."""
+        if not self.phase_done(phase): return False
+        print(f"⏭️ Skipping {label}: completed before the checkpoint.")
+        return True
+
+    def progress(self, phase):
+        """Progress saved by an interrupted phase (see save_progress), or None."""
+        progress = self.state.get('phase_progress')
+        return progress if progress and progress.get('phase') == phase else None
+
+    def save_progress(self, phase, results=None, fields=None, **progress):
+        """Mid-phase checkpoint: phase stays incomplete, and progress (elapsed window, counts) lets a resume continue it."""
+        self.save(None, results, phase_progress={'phase': phase, **progress}, **(fields or {}))
+
+    def save(self, phase=None, results=None, **fields):
+        """Marks phase completed, records fields and the results offset (flushing results first) and writes the file."""
+        if phase and phase not in self.state['completed_phases']:
+            self.state['completed_phases'].append(phase)
+            self.state['phase_progress'] = None
+        if results is not None:
+            results.flush() # rows counted in the checkpoint must be on disk before it is
+            self.state.update(results_path=results.path, results_format=results.sink_format,
+                              results_columns=results.columns, results_rows=len(results),
+                              results_extra_outputs=[list(output) for output in results.extra_outputs])
+        self.state.update(fields)
+        self.state['updated_at'] = time.time()
+        if self.path is None: return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp_path, self.path) # a crash mid-write leaves the previous checkpoint intact
+
+    def remove(self):
+        """Deletes the checkpoint once the run has completed."""
+        if self.path and os.path.exists(self.path): os.remove(self.path)
+
+
+# --- Mid-Phase Checkpoints ---
+class CheckpointTimer:
+    """
+    Calls save() from a long phase's result callback at most every interval_seconds,
+    so a soak's checkpoint follows its results instead of waiting for the phase to
+    end. Runs on the callback's thread, so the results sink is never written from
+    two threads. interval_seconds of 0 or None never saves.
+    """
+
+    def __init__(self, interval_seconds, save):
+        self.interval_seconds = interval_seconds
+        self._save = save
+        self.started_at = self._last_saved = time.time()
+
+    @property
+    def elapsed(self):
+        return time.time() - self.started_at
+
+    def tick(self):
+        if not self.interval_seconds or self.interval_seconds <= 0: return
+        now = time.time()
+        if now - self._last_saved < self.interval_seconds: return
+        self._last_saved = now
+        self._save()
+
+
+# --- Chain State ---
+def pending_nonces(w3_instance, addresses):
+    return {address: w3_instance.eth.get_transaction_count(address, 'pending') for address in addresses}
+
+
+def resume_problems(w3_instance, checkpoint):
+    """
+    Reasons the chain no longer matches a checkpoint (e.g. a restarted dev node):
+    deployed contracts without code, or senders whose pending nonce went backwards.
+    Nonces ahead of the checkpoint are expected (txs of the interrupted phase).
+    """
+    problems = []
+    for name, address in checkpoint.state.get('deployed', {}).items():
+        if address and not w3_instance.eth.get_code(address):
+            problems.append(f"no contract code at {name} address {address}")
+    for address, nonce in checkpoint.state.get('nonces', {}).items():
+        current = w3_instance.eth.get_transaction_count(address, 'pending')
+        if current < nonce:
+            problems.append(f"pending nonce of {address} is {current}, below the checkpointed {nonce}")
+    return problems
@@ -1,14 +1,123 @@
 # lib/contract_loader.py
 import json
 import os
+import threading
+import weakref
+from eth_abi import encode as abi_encode
+from eth_utils import abi_to_signature, event_abi_to_log_topic, function_abi_to_4byte_selector
+from eth_utils.abi import get_abi_input_types
+from web3 import Web3
 
 HARDHAT_PROJECT_RELATIVE_PATH = "../hardhat"
 
+# --- Registry Caches ---
+# Artifacts are parsed once per process; contract objects are cached per web3
+# connection (the "chain") and address, so per-tx cost does not grow with ABI size.
+_ARTIFACTS = {} # contract_sol_filename -> artifact dict
+_CONTRACTS = weakref.WeakKeyDictionary() # w3 -> {(contract_sol_filename, address): contract}
+_ABI_CODECS = {} # id(abi) -> (abi, unbound contract), for encoding calls from a bare ABI
+_REGISTRY_LOCK = threading.Lock()
+
 def load_contract_artifact(contract_sol_filename):
     """
-    Loads ABI and bytecode from a Hardhat JSON artifact file.
+    Loads ABI and bytecode from a Hardhat JSON artifact file (memoized).
     contract_sol_filename should be like "TokenA.sol", "BasicPool.sol"
     """
+    artifact = get_contract_artifact(contract_sol_filename)
+    return artifact['abi'], artifact['bytecode']
+
+def get_contract_artifact(contract_sol_filename):
+    """
+    Returns the cached artifact dict for a contract: 'abi', 'bytecode', plus
+    precomputed 'function_selectors' and 'event_topics' keyed by signature
+    (e.g. "transfer(address,uint256)", so overloads stay distinct) and
+    'function_inputs' (name -> (signature, input types)) for names that are not
+    overloaded. The JSON file is only read the first time.
+    """
+    artifact = _ARTIFACTS.get(contract_sol_filename)
+    if artifact is None:
+        with _REGISTRY_LOCK:
+            artifact = _ARTIFACTS.get(contract_sol_filename)
+            if artifact is None:
+                abi, bytecode = _read_contract_artifact(contract_sol_filename)
+                functions = [entry for entry in abi if entry.get('type') == 'function']
+                function_names = [entry['name'] for entry in functions]
+                artifact = {
+                    'abi': abi,
+                    'bytecode': bytecode,
+                    'function_selectors': {
+                        abi_to_signature(entry): Web3.to_hex(function_abi_to_4byte_selector(entry))
+                        for entry in functions
+                    },
+                    'function_inputs': {
+                        entry['name']: (abi_to_signature(entry), get_abi_input_types(entry))
+                        for entry in functions if function_names.count(entry['name']) == 1
+                    },
+                    'event_topics': {
+                        abi_to_signature(entry): Web3.to_hex(event_abi_to_log_topic(entry))
+                        for entry in abi if entry.get('type') == 'event'
+                    },
+                }
+                _ARTIFACTS[contract_sol_filename] = artifact
+    return artifact
+
+def get_contract(w3, contract_sol_filename, address=None):
+    """
+    Reusable contract object for (w3 connection, address); with no address,
+    the deployable contract class (ABI + bytecode).
+    """
+    address = Web3.to_checksum_address(address) if address else None
+    key = (contract_sol_filename, address)
+    with _REGISTRY_LOCK:
+        chain_contracts = _CONTRACTS.setdefault(w3, {})
+        contract = chain_contracts.get(key)
+    if contract is None:
+        artifact = get_contract_artifact(contract_sol_filename)
+        if address:
+            contract = w3.eth.contract(address=address, abi=artifact['abi'])
+        else:
+            contract = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+        with _REGISTRY_LOCK:
+            contract = chain_contracts.setdefault(key, contract)
+    return contract
+
+def encode_function_call(contract_sol_filename, function_name, args):
+    """
+    Calldata for function_name(*args): the artifact's precomputed selector followed by
+    the ABI-encoded arguments, with no contract object or ABI scan per call.
+    Overloaded names fall back to web3's encoder, which picks the overload from args.
+    """
+    artifact = get_contract_artifact(contract_sol_filename)
+    function_inputs = artifact['function_inputs'].get(function_name)
+    if function_inputs is None:
+        return get_abi_codec(artifact['abi']).encode_abi(function_name, args=args)
+    signature, input_types = function_inputs
+    return artifact['function_selectors'][signature] + abi_encode(input_types, args).hex()
+
+def get_abi_codec(abi):
+    """Unbound contract for ABI-encoding calls from an ABI list, built once per ABI object."""
+    cached = _ABI_CODECS.get(id(abi))
+    if cached is None or cached[0] is not abi:
+        # Keeping the ABI referenced in the cache means its id cannot be reused by another object.
+        cached = (abi, Web3().eth.contract(abi=abi))
+        _ABI_CODECS[id(abi)] = cached
+    return cached[1]
+
+# Module-level ABI/bytecode constants (e.g. transaction_utils.BASIC_POOL_ABI) resolved on first access,
+# so importing a helper module does not read any artifact until a contract is actually used.
+LAZY_ARTIFACT_CONSTANTS = {
+    'BASIC_POOL_ABI': ("BasicPool.sol", 'abi'), 'BASIC_POOL_BYTECODE': ("BasicPool.sol", 'bytecode'),
+    'MY_NFT_ABI': ("MyNFT.sol", 'abi'), 'MY_NFT_BYTECODE': ("MyNFT.sol", 'bytecode'),
+}
+
+def resolve_lazy_artifact_constant(module_name, name):
+    """Backs a module's __getattr__ for the names in LAZY_ARTIFACT_CONSTANTS."""
+    if name not in LAZY_ARTIFACT_CONSTANTS:
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+    contract_sol_filename, field = LAZY_ARTIFACT_CONSTANTS[name]
+    return get_contract_artifact(contract_sol_filename)[field]
+
+def _read_contract_artifact(contract_sol_filename):
     contract_name = contract_sol_filename.replace(".sol", "")
     
     # Determine the base path of this script (lib directory)
@@ -0,0 +1,125 @@
+# lib/gas_oracle.py
+import threading
+from web3 import Web3
+
+from .chain_identity import chain_key
+from .l2_utils import apply_gas_price_floor
+from .metrics_server import GAS_PRICE_WEI
+
+# --- Oracle Defaults ---
+DEFAULT_REFRESH_SECONDS = 1.0
+# Oracles are shared per chain, like nonce managers
+_GAS_PRICE_ORACLES = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+class GasPriceOracle:
+    """
+    Serves a cached gas price refreshed in the background, so sending a
+    transaction needs no eth_gasPrice round trip. Applies the same fetch/fixed
+    strategy and low-price floor as get_dynamic_gas_price. refresh_on="timer"
+    refetches every refresh_interval seconds; refresh_on="block" polls
+    eth_blockNumber at that interval and refetches only when a new block appears.
+    fetch_gas_price overrides the RPC used (e.g. zk_web3.zksync.gas_price).
+    """
+
+    def __init__(self, w3, strategy="fetch", fixed_gwei=0.1, refresh_interval=DEFAULT_REFRESH_SECONDS,
+                 refresh_on="timer", fetch_gas_price=None):
+        if strategy not in ("fetch", "fixed"):
+            raise ValueError(f"Unknown gas price strategy: {strategy}")
+        if refresh_on not in ("timer", "block"):
+            raise ValueError(f"Unknown gas price refresh mode: {refresh_on}")
+        self.w3 = w3
+        self.strategy = strategy
+        self.fixed_gwei = fixed_gwei
+        self.refresh_interval = refresh_interval
+        self.refresh_on = refresh_on
+        self._fetch_gas_price = fetch_gas_price or (lambda: w3.eth.gas_price)
+        self._gas_price_wei = None
+        self._using_fallback = False
+        self._last_block = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.refresh_count = 0
+
+    def start(self):
+        """Fetches the first value synchronously, then keeps it fresh from a daemon thread."""
+        self.refresh()
+        if self.strategy == "fetch" and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="gas-price-oracle", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval + 1)
+            self._thread = None
+
+    def settings(self):
+        """Picklable strategy/refresh settings plus the node's rpc_url, to run an equivalent oracle in a worker process."""
+        return {'rpc_url': str(self.w3.provider.endpoint_uri), 'strategy': self.strategy, 'fixed_gwei': self.fixed_gwei,
+                'refresh_interval': self.refresh_interval, 'refresh_on': self.refresh_on}
+
+    def get(self):
+        """Current gas price in wei; no network I/O once started."""
+        if self._gas_price_wei is None:
+            self.refresh()
+        return self._gas_price_wei
+
+    def refresh(self):
+        if self.strategy == "fixed":
+            self._gas_price_wei = Web3.to_wei(self.fixed_gwei, 'gwei')
+            GAS_PRICE_WEI.set(self._gas_price_wei)
+            return
+        fetched_gas_price_wei = self._fetch_gas_price()
+        gas_price_wei, used_fallback = apply_gas_price_floor(fetched_gas_price_wei, self.fixed_gwei)
+        if used_fallback and not self._using_fallback:
+            # Only reported on transitions; the refresh loop would otherwise print every interval.
+            print(f"Fetched gas price ({Web3.from_wei(fetched_gas_price_wei, 'gwei')} Gwei) is very low, using fallback fixed price.")
+        self._using_fallback = used_fallback
+        self._gas_price_wei = gas_price_wei
+        self.refresh_count += 1
+        GAS_PRICE_WEI.set(gas_price_wei)
+
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                if self.refresh_on == "block":
+                    block_number = self.w3.eth.block_number
+                    if block_number == self._last_block:
+                        continue
+                    self._last_block = block_number
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Gas price oracle refresh failed, keeping last value: {e}")
+
+
+def get_gas_price_oracle(w3, strategy="fetch", fixed_gwei=0.1, refresh_interval=DEFAULT_REFRESH_SECONDS,
+                         refresh_on="timer", fetch_gas_price=None):
+    """Returns the started oracle shared by every caller on w3's chain, creating it on first use."""
+    key = chain_key(w3)
+    with _REGISTRY_LOCK:
+        oracle = _GAS_PRICE_ORACLES.get(key)
+        if oracle is None:
+            oracle = GasPriceOracle(w3, strategy, fixed_gwei, refresh_interval, refresh_on, fetch_gas_price).start()
+            _GAS_PRICE_ORACLES[key] = oracle
+    return oracle
+
+
+def stop_gas_price_oracles():
+    """Stops every shared oracle's refresh thread and empties the registry (end of a run)."""
+    with _REGISTRY_LOCK:
+        oracles = list(_GAS_PRICE_ORACLES.values())
+        _GAS_PRICE_ORACLES.clear()
+    for oracle in oracles:
+        oracle.stop()
+
+
+def gas_price_reader(gas_price):
+    """Zero-argument callable returning the gas price in wei, for a fixed value, a GasPriceOracle or a callable."""
+    if isinstance(gas_price, GasPriceOracle):
+        return gas_price.get
+    if callable(gas_price):
+        return gas_price
+    return lambda: gas_price
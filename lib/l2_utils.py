@@ -1,15 +1,25 @@
 # lib/l2_utils.py
-from zksync2.module.module_builder import ZkSyncBuilder
-from zksync2.signer.eth_signer import PrivateKeyEthSigner
-from zksync2.transaction.transaction_builders import TxFunctionCall
-from eth_account import Account
-from eth_typing import HexStr
 from web3 import Web3
+from web3.middleware import ExtraDataToPOAMiddleware
 
-def connect_to_l2(rpc_url, expected_chain_id=None):
-    """Connects to an L2 node and returns the web3 instance."""
+from .chain_identity import remember_chain_id
+from .rpc_batching import BatchingHTTPProvider, DEFAULT_BATCH_WINDOW_SECONDS, DEFAULT_MAX_BATCH_SIZE
+from .transports import http_provider_kwargs
+from .metrics_server import instrument_web3
+
+def connect_to_l2(rpc_url, expected_chain_id=None, batch_requests=False,
+                  batch_window_seconds=DEFAULT_BATCH_WINDOW_SECONDS, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+    """
+    Connects to an L2 node and returns the web3 instance. All threads share one
+    pooled keep-alive session (see lib/transports.py). With batch_requests,
+    concurrent calls on the instance are coalesced into JSON-RPC batches.
+    """
     print(f"Attempting to connect to L2 node at {rpc_url}...")
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    if batch_requests:
+        provider = BatchingHTTPProvider(rpc_url, batch_window_seconds=batch_window_seconds, max_batch_size=max_batch_size, **http_provider_kwargs(rpc_url))
+    else:
+        provider = Web3.HTTPProvider(rpc_url, **http_provider_kwargs(rpc_url))
+    w3 = Web3(provider)
     if not w3.is_connected():
         raise ConnectionError(f"Failed to connect to L2 node at {rpc_url}")
 
@@ -24,28 +34,39 @@ def connect_to_l2(rpc_url, expected_chain_id=None):
         raise ValueError(
             f"Chain ID mismatch! Expected {expected_chain_id}, but connected to {actual_chain_id}."
         )
-    return w3
+    remember_chain_id(w3, actual_chain_id)
+    return instrument_web3(w3)
 
 def connect_to_zksync_l2(rpc_url, chain_id=None):
-    """Connect to ZKsync L2 using ZKsync2 SDK"""
+    """Connect to ZKsync L2 using ZKsync2 SDK (ZkSyncBuilder.build, but on the pooled session)"""
+    # Imported here so EVM-only runs never load the zksync2 SDK
+    from zksync2.module.module_builder import ZkWeb3
+    from .transports import build_zksync_provider
     try:
-        zk_web3 = ZkSyncBuilder.build(rpc_url)
+        zk_web3 = ZkWeb3(build_zksync_provider(rpc_url))
         print(f"✅ Connected to ZKsync L2: {rpc_url}")
-        return zk_web3
+        return instrument_web3(zk_web3)
     except Exception as e:
         print(f"❌ Failed to connect to ZKsync L2: {e}")
         raise
 
+def apply_gas_price_floor(fetched_gas_price_wei, fixed_gwei=0.1):
+    """
+    For some devnets, eth_gasPrice might return 0 or a very low value.
+    Returns (gas_price_wei, used_fallback): the fixed price if the fetched one is below the floor.
+    """
+    if fetched_gas_price_wei < Web3.to_wei('0.01', 'gwei'): # Adjust floor as needed
+        return Web3.to_wei(fixed_gwei, 'gwei'), True
+    return fetched_gas_price_wei, False
+
 def get_dynamic_gas_price(w3, strategy="fetch", fixed_gwei=0.1):
     """Gets gas price based on strategy."""
     if strategy == "fetch":
         gas_price_wei = w3.eth.gas_price
-        # For some devnets, eth_gasPrice might return 0 or a very low value.
-        # Add a floor if it's too low, e.g., 0.01 Gwei, or use the fixed as fallback.
-        if gas_price_wei < w3.to_wei('0.01', 'gwei'): # Adjust floor as needed
+        floored_gas_price_wei, used_fallback = apply_gas_price_floor(gas_price_wei, fixed_gwei)
+        if used_fallback:
             print(f"Fetched gas price ({w3.from_wei(gas_price_wei, 'gwei')} Gwei) is very low, using fallback fixed price.")
-            return w3.to_wei(fixed_gwei, 'gwei')
-        return gas_price_wei
+        return floored_gas_price_wei
     elif strategy == "fixed":
         return w3.to_wei(fixed_gwei, 'gwei')
     else:
@@ -0,0 +1,212 @@
+# lib/latency_histogram.py
+import json
+import os
+import threading
+import time
+
+# --- Histogram Defaults ---
+# Values are recorded in microseconds with 3 significant digits (relative error
+# <= 0.1%) up to an hour; larger values land in the top bucket.
+SIGNIFICANT_DIGITS = 3
+MAX_TRACKABLE_US = 3600 * 1_000_000
+REPORT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+DEFAULT_REPORT_INTERVAL_SECONDS = 10.0
+HISTOGRAM_FILE_SUFFIX = ".latency.json" # next to a CSV/.arrows results file
+HISTOGRAM_FILE_NAME = "_latency_histograms.json" # inside a Parquet run directory ('_' keeps it out of the dataset)
+
+
+# --- HDR-Style Histogram ---
+class LatencyHistogram:
+    """
+    Log-linear bucketed histogram in the style of HdrHistogram: buckets are exact
+    below 2 * 10^digits units and then double in width with every power of two,
+    so memory is bounded by the value range (not the sample count) and any
+    percentile is within 10^-digits of the true value. Histograms with the same
+    configuration merge losslessly by adding bucket counts.
+    """
+
+    def __init__(self, significant_digits=SIGNIFICANT_DIGITS, max_value=MAX_TRACKABLE_US):
+        self.significant_digits = significant_digits
+        self.max_value = max_value
+        self._sub_bucket_bits = (2 * 10 ** significant_digits - 1).bit_length()
+        self._sub_bucket_half = 1 << (self._sub_bucket_bits - 1)
+        self.counts = {} # bucket index -> count (sparse)
+        self.total_count = 0
+        self.min_value = None
+        self.max_recorded = None
+        self.total_sum = 0
+
+    def _index(self, value):
+        exponent = max(0, value.bit_length() - self._sub_bucket_bits)
+        return exponent * self._sub_bucket_half + (value >> exponent)
+
+    def _highest_equivalent(self, index):
+        exponent = max(0, (index >> (self._sub_bucket_bits - 1)) - 1)
+        return ((index - exponent * self._sub_bucket_half + 1) << exponent) - 1
+
+    def record(self, value, count=1):
+        value = min(max(0, int(value)), self.max_value)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.total_sum += value * count
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_recorded = value if self.max_recorded is None else max(self.max_recorded, value)
+
+    def value_at_percentile(self, percentile):
+        """Upper bound of the bucket holding the given percentile (0 for an empty histogram)."""
+        if not self.total_count: return 0
+        target = max(1, int(self.total_count * percentile / 100.0 + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_recorded)
+        return self.max_recorded
+
+    def mean(self):
+        return self.total_sum / self.total_count if self.total_count else 0.0
+
+    def merge(self, other):
+        """Adds another histogram's counts (same significant digits) into this one."""
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Cannot merge histograms with different significant digits.")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        for attr, pick in (('min_value', min), ('max_recorded', max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        return self
+
+    def to_dict(self):
+        return {'significant_digits': self.significant_digits, 'max_value': self.max_value,
+                'total_count': self.total_count, 'total_sum': self.total_sum,
+                'min_value': self.min_value, 'max_value_recorded': self.max_recorded,
+                'counts': [[index, self.counts[index]] for index in sorted(self.counts)]}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['significant_digits'], data['max_value'])
+        histogram.counts = {index: count for index, count in data['counts']}
+        histogram.total_count = data['total_count']; histogram.total_sum = data['total_sum']
+        histogram.min_value = data['min_value']; histogram.max_recorded = data['max_value_recorded']
+        return histogram
+
+
+# --- Live Recorder ---
+class LiveLatencyRecorder:
+    """
+    Records the confirmation time of every successful result per (chain, action)
+    into a run-long histogram and an interval histogram. Used as a ResultSink
+    observer; a daemon thread prints p50/p90/p99/p99.9 and achieved TPS of the
+    last interval every report_interval seconds (0: no live lines).
+    """
+
+    def __init__(self, default_chain=None, report_interval=DEFAULT_REPORT_INTERVAL_SECONDS,
+                 latency_column='confirmation_time_sec'):
+        self.default_chain = default_chain
+        self.report_interval = report_interval
+        self.latency_column = latency_column
+        self.histograms = {} # (chain, action) -> LatencyHistogram for the whole run
+        self._interval = {} # (chain, action) -> LatencyHistogram since the last report
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._interval_start = time.monotonic()
+
+    def __call__(self, result):
+        self._record(result, (self.histograms, self._interval))
+
+    def record_history(self, results):
+        """Adds earlier results (e.g. rows kept from before a resume) to the run-long histograms only."""
+        for result in results:
+            self._record(result, (self.histograms,))
+
+    def _record(self, result, targets):
+        if result.get('status') != 'Success': return
+        latency_sec = result.get(self.latency_column)
+        if latency_sec is None or latency_sec != latency_sec: return # None, or NaN from a reloaded results file
+        key = (result.get('chain') or self.default_chain, result.get('action'))
+        value_us = float(latency_sec) * 1_000_000
+        with self._lock:
+            for histograms in targets:
+                if key not in histograms: histograms[key] = LatencyHistogram()
+                histograms[key].record(value_us)
+
+    def start(self):
+        if self.report_interval and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="latency-reporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.report_interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.report_interval):
+            self.print_interval()
+
+    def print_interval(self):
+        """Prints and resets the interval histograms (nothing if no tx completed in the interval)."""
+        with self._lock:
+            interval, self._interval = self._interval, {}
+            elapsed = time.monotonic() - self._interval_start; self._interval_start = time.monotonic()
+        if not interval: return
+        print(f"⏱️ Latency, last {elapsed:.1f}s ({format_percentile_header()}, achieved TPS):")
+        for (chain, action), histogram in sorted(interval.items(), key=lambda item: tuple(map(str, item[0]))):
+            print(f"   {chain}/{action}: {format_percentiles(histogram)} | n={histogram.total_count} | {histogram.total_count / elapsed if elapsed > 0 else 0:.2f} TPS")
+
+    def snapshot(self):
+        """Copy of the run-long histograms, safe to serialize while results keep arriving."""
+        with self._lock:
+            return {key: LatencyHistogram().merge(histogram) for key, histogram in self.histograms.items()}
+
+
+def format_percentile_header():
+    return '/'.join(f"p{p:g}" for p in REPORT_PERCENTILES)
+
+
+def format_percentiles(histogram):
+    return ' / '.join(f"{histogram.value_at_percentile(p) / 1_000_000:.4f}s" for p in REPORT_PERCENTILES)
+
+
+# --- Serialization ---
+def histogram_path(results_path):
+    """Histogram file belonging to a results file or Parquet run directory."""
+    if os.path.isdir(results_path) or not os.path.splitext(results_path)[1]:
+        return os.path.join(results_path, HISTOGRAM_FILE_NAME)
+    return os.path.splitext(results_path)[0] + HISTOGRAM_FILE_SUFFIX
+
+
+def write_histograms(path, histograms, run_name=None, latency_column='confirmation_time_sec'):
+    entries = [{'chain': chain, 'action': action, 'histogram': histogram.to_dict()}
+               for (chain, action), histogram in sorted(histograms.items(), key=lambda item: tuple(map(str, item[0])))]
+    with open(path, 'w') as f:
+        json.dump({'run': run_name, 'latency_column': latency_column, 'unit': 'us', 'histograms': entries}, f)
+    return path
+
+
+def load_histograms(paths):
+    """Reads and merges histogram files (several workers, chains or runs) into {(chain, action): LatencyHistogram}."""
+    merged = {}
+    for path in ([paths] if isinstance(paths, str) else paths):
+        with open(path) as f: data = json.load(f)
+        for entry in data['histograms']:
+            key = (entry['chain'], entry['action'])
+            histogram = LatencyHistogram.from_dict(entry['histogram'])
+            merged[key] = merged[key].merge(histogram) if key in merged else histogram
+    return merged
+
+
+def format_histogram_table(histograms):
+    """One line per (chain, action): count, mean and the report percentiles, in seconds."""
+    lines = [f"{'chain':<20} {'action':<32} {'count':>8} {'mean':>10} " + ' '.join(f"{'p' + format(p, 'g'):>10}" for p in REPORT_PERCENTILES)]
+    for (chain, action), histogram in sorted(histograms.items(), key=lambda item: tuple(map(str, item[0]))):
+        lines.append(f"{str(chain):<20} {str(action):<32} {histogram.total_count:>8} {histogram.mean() / 1_000_000:>10.4f} "
+                     + ' '.join(f"{histogram.value_at_percentile(p) / 1_000_000:>10.4f}" for p in REPORT_PERCENTILES))
+    return '\n'.join(lines)
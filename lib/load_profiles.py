@@ -0,0 +1,121 @@
+# lib/load_profiles.py
+import asyncio
+
+from .async_engine import PipelinedTxEngine, connect_to_l2_async, DEFAULT_RECEIPT_MODE
+from .chain_adapters import get_chain_adapter
+from .transports import async_rpc_endpoint
+from .receipt_tracker import block_receipt_tracking
+from .load_scheduler import run_open_loop
+
+# Columns of the per-step saturation table
+STEP_TABLE_COLUMNS = [
+    'chain', 'step', 'target_tps', 'offered_tps', 'achieved_tps', 'offered_txs', 'confirmed_txs',
+    'error_rate', 'p50_latency_sec', 'p99_latency_sec', 'max_send_lag_sec', 'stop_reason'
+]
+
+
+# --- Profile Builders ---
+def build_step_profile(start_tps, max_tps, step_factor=2.0):
+    """Geometric steps, e.g. 5 -> 10 -> 20 -> ... up to max_tps."""
+    if start_tps <= 0 or step_factor <= 1:
+        raise ValueError("Step profile needs start_tps > 0 and step_factor > 1.")
+    profile = []
+    tps = start_tps
+    while tps <= max_tps:
+        profile.append(tps)
+        tps = tps * step_factor
+    return profile
+
+
+def build_ramp_profile(start_tps, max_tps, num_steps):
+    """Linear ramp from start_tps to max_tps in num_steps equal increments."""
+    if start_tps <= 0 or max_tps <= 0:
+        raise ValueError("Ramp profile needs start_tps > 0 and max_tps > 0.")
+    if num_steps < 2:
+        return [start_tps]
+    increment = (max_tps - start_tps) / (num_steps - 1)
+    return [start_tps + i * increment for i in range(num_steps)]
+
+
+def build_load_profile(shape, start_tps, max_tps, step_factor=2.0, num_steps=10):
+    if shape == "step":
+        return build_step_profile(start_tps, max_tps, step_factor)
+    elif shape == "ramp":
+        return build_ramp_profile(start_tps, max_tps, num_steps)
+    else:
+        raise ValueError(f"Unknown load profile shape: {shape}")
+
+
+# --- Profile Runner ---
+async def run_load_profile(engines, job_factory, profile, step_duration_seconds,
+                           max_p99_latency_sec=None, max_error_rate=None, chain_name="N/A", on_result=None,
+                           start_step=1, on_step=None):
+    """
+    Holds each offered rate in `profile` for step_duration_seconds using the
+    open-loop scheduler, and stops once p99 latency (from intended send time) or
+    the error rate crosses its threshold. job_factory(step, index) builds one job.
+    Results, tagged with their step, go to on_result as they complete, and each
+    finished step's row to on_step. start_step skips the steps before it (a
+    resumed profile). Returns the per-step rows of the steps run.
+    """
+    step_rows = []
+    for step, target_tps in enumerate(profile[start_step - 1:], start=start_step):
+        print(f"[{chain_name}] Load step {step}/{len(profile)}: {target_tps:.2f} TPS for {step_duration_seconds}s...")
+        def _tag_step(result, step=step, target_tps=target_tps):
+            result['load_step'] = step
+            result['load_step_target_tps'] = target_tps
+            if on_result is not None:
+                on_result(result)
+        row = await run_open_loop(
+            engines, lambda index: job_factory(step, index), target_tps, step_duration_seconds, on_result=_tag_step
+        )
+        row.update({'chain': chain_name, 'step': step, 'stop_reason': None})
+        p99 = row['p99_latency_sec']
+        p99_text = f"{p99:.3f}s" if p99 is not None else "n/a"
+        if max_p99_latency_sec is not None and (p99 is None or p99 > max_p99_latency_sec):
+            row['stop_reason'] = f"p99 {p99_text} > {max_p99_latency_sec}s"
+        elif max_error_rate is not None and row['error_rate'] > max_error_rate:
+            row['stop_reason'] = f"error rate {row['error_rate']:.2%} > {max_error_rate:.2%}"
+        step_rows.append(row)
+        if on_step is not None:
+            on_step(row)
+        print(f"[{chain_name}] Step {step}: achieved {row['achieved_tps']:.2f} TPS, p99 {p99_text}, errors {row['error_rate']:.2%}")
+        if row['stop_reason']:
+            print(f"[{chain_name}] Saturation reached at step {step} ({row['stop_reason']}); stopping profile.")
+            break
+    return step_rows
+
+
+def run_load_profile_for_chain(chain_name, l2_config, sender_pks, gas_price_wei, job_factory, profile,
+                               step_duration_seconds, max_p99_latency_sec=None, max_error_rate=None, on_result=None,
+                               receipt_mode=DEFAULT_RECEIPT_MODE, chain_adapter=None, start_step=1, on_step=None):
+    """Blocking wrapper: connects to one entry of config/l2_nodes.json and runs the whole profile against it; returns the step rows."""
+    if isinstance(sender_pks, str):
+        sender_pks = [sender_pks]
+    chain_adapter = chain_adapter or get_chain_adapter(l2_config)
+
+    async def _main():
+        async_w3 = await connect_to_l2_async(async_rpc_endpoint(l2_config), l2_config.get("chain_id"))
+        try:
+            async with block_receipt_tracking(async_w3, enabled=(receipt_mode == "block")) as tracker:
+                engines = [PipelinedTxEngine(async_w3, pk, gas_price_wei, receipt_tracker=tracker, chain_adapter=chain_adapter) for pk in sender_pks]
+                return await run_load_profile(engines, job_factory, profile, step_duration_seconds,
+                                              max_p99_latency_sec, max_error_rate, chain_name, on_result, start_step, on_step)
+        finally:
+            await async_w3.provider.disconnect()
+
+    return asyncio.run(_main())
+
+
+def format_step_table(step_rows):
+    """Plain-text per-step throughput/latency table (one row per chain and step)."""
+    header = f"{'chain':<24}{'step':>5}{'target':>9}{'offered':>9}{'achieved':>10}{'err%':>8}{'p50 s':>9}{'p99 s':>9}  stop"
+    lines = [header, '-' * len(header)]
+    for row in step_rows:
+        p50 = f"{row['p50_latency_sec']:.3f}" if row['p50_latency_sec'] is not None else "-"
+        p99 = f"{row['p99_latency_sec']:.3f}" if row['p99_latency_sec'] is not None else "-"
+        lines.append(
+            f"{row['chain']:<24}{row['step']:>5}{row['target_tps']:>9.1f}{row['offered_tps']:>9.1f}"
+            f"{row['achieved_tps']:>10.1f}{row['error_rate'] * 100:>8.2f}{p50:>9}{p99:>9}  {row['stop_reason'] or ''}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,124 @@
+# lib/load_scheduler.py
+import asyncio
+import time
+
+from .async_engine import PipelinedTxEngine, connect_to_l2_async, DEFAULT_RECEIPT_MODE
+from .latency_histogram import LatencyHistogram
+from .receipt_tracker import block_receipt_tracking
+
+
+# --- Open-Loop Summary ---
+class OpenLoopStats:
+    """
+    Running counters for one open-loop window, fed one result at a time, so a
+    long soak keeps no result list: offered/confirmed counts, the largest send
+    lag and a latency-from-intended histogram for the percentiles.
+    """
+
+    def __init__(self, target_tps, duration_seconds):
+        self.target_tps = target_tps
+        self.duration_seconds = duration_seconds
+        self.offered_txs = 0
+        self.confirmed_txs = 0
+        self.max_send_lag_sec = None
+        self.latency_histogram = LatencyHistogram()
+
+    def record(self, result):
+        self.offered_txs += 1
+        send_lag = result.get('send_lag_sec')
+        if send_lag is not None:
+            self.max_send_lag_sec = send_lag if self.max_send_lag_sec is None else max(self.max_send_lag_sec, send_lag)
+        if result.get('status') != 'Success':
+            return
+        self.confirmed_txs += 1
+        latency = result.get('latency_from_intended_sec')
+        if latency is not None:
+            self.latency_histogram.record(latency * 1_000_000)
+
+    def _latency_percentile(self, percentile):
+        if not self.latency_histogram.total_count:
+            return None
+        return self.latency_histogram.value_at_percentile(percentile) / 1_000_000
+
+    def summary(self):
+        """Offered vs achieved rates and latency-from-intended percentiles for the window."""
+        duration_seconds = self.duration_seconds
+        return {
+            'target_tps': self.target_tps,
+            'duration_sec': duration_seconds,
+            'offered_txs': self.offered_txs,
+            'confirmed_txs': self.confirmed_txs,
+            'error_rate': (self.offered_txs - self.confirmed_txs) / self.offered_txs if self.offered_txs else 0.0,
+            'offered_tps': self.offered_txs / duration_seconds if duration_seconds > 0 else 0.0,
+            'achieved_tps': self.confirmed_txs / duration_seconds if duration_seconds > 0 else 0.0,
+            'p50_latency_sec': self._latency_percentile(50.0),
+            'p99_latency_sec': self._latency_percentile(99.0),
+            'max_send_lag_sec': self.max_send_lag_sec,
+        }
+
+
+# --- Open-Loop Constant-Arrival-Rate Scheduler ---
+def validate_open_loop(target_tps, duration_seconds):
+    """Raises ValueError unless the rate and duration describe a non-empty schedule."""
+    if not target_tps or target_tps <= 0:
+        raise ValueError(f"Open-loop target TPS must be greater than 0 (got {target_tps}).")
+    if not duration_seconds or duration_seconds <= 0:
+        raise ValueError(f"Open-loop duration must be greater than 0 seconds (got {duration_seconds}).")
+
+
+async def run_open_loop(engines, job_factory, target_tps, duration_seconds, on_result=None):
+    """
+    Issues job_factory(i) at a fixed arrival rate of target_tps for duration_seconds,
+    without waiting for outstanding receipts (no coordinated omission). Each job is
+    stamped with its intended send time; the engine records the actual send time
+    and latency measured from the intended time. Jobs are spread over engines
+    round-robin. Every result goes to on_result as it completes and only the txs
+    still in flight are held, so memory does not grow with the soak length.
+    Returns the window's summary (see OpenLoopStats.summary).
+    """
+    validate_open_loop(target_tps, duration_seconds)
+    interval = 1.0 / target_tps
+    start_monotonic = time.perf_counter()
+    start_wall = time.time()
+    stats = OpenLoopStats(target_tps, duration_seconds)
+    in_flight = set()
+    index = 0
+
+    async def _submit(engine, job):
+        result = await engine.submit(job)
+        stats.record(result)
+        if on_result is not None:
+            on_result(result)
+
+    while index * interval < duration_seconds:
+        intended_offset = index * interval
+        delay = start_monotonic + intended_offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        job = job_factory(index)
+        job['intended_send_time'] = start_wall + intended_offset
+        task = asyncio.create_task(_submit(engines[index % len(engines)], job))
+        in_flight.add(task); task.add_done_callback(in_flight.discard)
+        index += 1
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return stats.summary()
+
+
+def run_open_loop_test(rpc_url, expected_chain_id, sender_pks, gas_price_wei, job_factory,
+                       target_tps, duration_seconds, on_result=None, receipt_mode=DEFAULT_RECEIPT_MODE, chain_adapter=None):
+    """Blocking wrapper for the runners: one engine per sender key; results go to on_result, returns the summary."""
+    if isinstance(sender_pks, str):
+        sender_pks = [sender_pks]
+
+    async def _main():
+        async_w3 = await connect_to_l2_async(rpc_url, expected_chain_id)
+        try:
+            async with block_receipt_tracking(async_w3, enabled=(receipt_mode == "block")) as tracker:
+                engines = [PipelinedTxEngine(async_w3, pk, gas_price_wei, receipt_tracker=tracker, chain_adapter=chain_adapter) for pk in sender_pks]
+                return await run_open_loop(engines, job_factory, target_tps, duration_seconds, on_result=on_result)
+        finally:
+            await async_w3.provider.disconnect()
+
+    return asyncio.run(_main())
@@ -0,0 +1,151 @@
+# lib/load_workers.py
+import multiprocessing
+import queue as queue_module
+import threading
+
+from .async_engine import build_p2p_transfer_job, DEFAULT_RECEIPT_MODE
+from .chain_adapters import get_chain_adapter
+from .gas_oracle import GasPriceOracle, get_gas_price_oracle
+from .load_scheduler import OpenLoopStats, run_open_loop_test, validate_open_loop
+from .metrics_server import enable_recording, merge_metric_deltas, recording_labels, take_metric_deltas
+from .sender_pool import SenderPool
+from .transports import configure_transports, current_transport_settings
+
+# Queue message kinds sent from workers to the coordinator
+_MSG_RESULT = 'result'
+_MSG_METRICS = 'metrics'
+_MSG_DONE = 'done'
+METRICS_SHIP_INTERVAL_SECONDS = 1.0 # how often a worker ships its metric deltas while metrics are served
+
+
+# --- Picklable Job Factories ---
+class P2PJobFactory:
+    """
+    Builds P2P transfer jobs inside a worker process. Worker processes are
+    spawned, so job factories must be picklable (no closures); run identifiers
+    include the worker index to stay unique across workers.
+    """
+
+    def __init__(self, recipient, amount_eth, run_identifier_prefix, action='p2p_eth_transfer'):
+        self.recipient = recipient
+        self.amount_eth = amount_eth
+        self.run_identifier_prefix = run_identifier_prefix
+        self.action = action
+
+    def __call__(self, worker_index, index):
+        run_id = f"{self.run_identifier_prefix}_w{worker_index}_tx_{index + 1}"
+        return build_p2p_transfer_job(self.recipient, self.amount_eth, run_id, action=self.action)
+
+
+# --- Worker Process ---
+def _ship_metrics(worker_index, result_queue, stop_event):
+    """Worker thread: ships in-flight, RPC latency, nonce and gas price metric deltas until stop_event is set."""
+    while not stop_event.wait(METRICS_SHIP_INTERVAL_SECONDS):
+        deltas = take_metric_deltas()
+        if deltas: result_queue.put((_MSG_METRICS, worker_index, deltas))
+
+
+def _worker_main(worker_index, result_queue, rpc_url, expected_chain_id, private_keys, gas_price_wei,
+                 job_factory, target_tps, duration_seconds, receipt_mode, transport_settings, chain_adapter,
+                 metrics_labels=None):
+    """
+    Runs one open-loop share in its own process and streams every result back over
+    result_queue. gas_price_wei is a fixed price, or the settings of the coordinator's
+    GasPriceOracle, in which case the worker keeps its own oracle refreshed in-process.
+    With metrics_labels (the coordinator is serving metrics) the worker records its
+    own metrics and ships the deltas for the coordinator to merge.
+    """
+    configure_transports(**transport_settings) # spawned interpreters start from the module defaults
+    def _stream(result):
+        result['worker_index'] = worker_index
+        result_queue.put((_MSG_RESULT, worker_index, result))
+    metrics_stop = threading.Event()
+    if metrics_labels is not None:
+        enable_recording(metrics_labels) # before connecting, so RPCs are timed
+        threading.Thread(target=_ship_metrics, args=(worker_index, result_queue, metrics_stop), name="metrics-shipper", daemon=True).start()
+    gas_oracle = None
+    try:
+        if isinstance(gas_price_wei, dict):
+            chain_adapter = chain_adapter or get_chain_adapter()
+            oracle_settings = dict(gas_price_wei)
+            oracle_w3 = chain_adapter.connect(oracle_settings.pop('rpc_url'), expected_chain_id)
+            gas_price_wei = gas_oracle = get_gas_price_oracle(oracle_w3, **oracle_settings, fetch_gas_price=lambda: chain_adapter.fetch_gas_price(oracle_w3))
+        run_open_loop_test(rpc_url, expected_chain_id, private_keys, gas_price_wei,
+                           lambda index: job_factory(worker_index, index), target_tps, duration_seconds,
+                           on_result=_stream, receipt_mode=receipt_mode, chain_adapter=chain_adapter)
+    except Exception as e:
+        result_queue.put((_MSG_RESULT, worker_index, {
+            'run_identifier': f"worker_{worker_index}", 'action': 'load_worker', 'status': 'CriticalError',
+            'error_message': str(e), 'worker_index': worker_index
+        }))
+    finally:
+        if gas_oracle is not None: gas_oracle.stop()
+        if metrics_labels is not None:
+            metrics_stop.set()
+            deltas = take_metric_deltas()
+            if deltas: result_queue.put((_MSG_METRICS, worker_index, deltas))
+        result_queue.put((_MSG_DONE, worker_index, None))
+
+
+# --- Coordinator ---
+def run_multiprocess_open_loop(rpc_url, expected_chain_id, sender_pool, gas_price_wei, job_factory,
+                               target_tps, duration_seconds, num_workers, on_result=None, receipt_mode=DEFAULT_RECEIPT_MODE,
+                               chain_adapter=None):
+    """
+    Splits sender_pool into disjoint shards and spawns one worker process per
+    shard, each offering target_tps / num_workers. Results are streamed back and
+    handed to on_result in the coordinator as they arrive (nothing is kept), and
+    while metrics are served the workers' metric deltas are merged into them;
+    returns the merged summary like run_open_loop_test.
+    gas_price_wei is a fixed price or a GasPriceOracle; an oracle is recreated in
+    each worker from its settings, so every job still reads a current price.
+    """
+    validate_open_loop(target_tps, duration_seconds) # before any worker is spawned
+    if not isinstance(sender_pool, SenderPool):
+        sender_pool = SenderPool(sender_pool if isinstance(sender_pool, list) else [sender_pool])
+    shards = sender_pool.shard(num_workers)
+    if len(shards) < num_workers:
+        print(f"⚠️ Only {len(shards)} sender account(s) available; using {len(shards)} worker process(es) instead of {num_workers}.")
+    rate_share = target_tps / len(shards)
+    worker_gas_price = gas_price_wei.settings() if isinstance(gas_price_wei, GasPriceOracle) else gas_price_wei # oracles hold threads and sockets
+    metrics_labels = recording_labels()
+
+    context = multiprocessing.get_context("spawn") # fresh interpreters: no inherited locks, sockets or event loops
+    result_queue = context.Queue()
+    workers = []
+    for worker_index, shard in enumerate(shards):
+        process = context.Process(
+            target=_worker_main,
+            args=(worker_index, result_queue, rpc_url, expected_chain_id, shard.private_keys, worker_gas_price,
+                  job_factory, rate_share, duration_seconds, receipt_mode, current_transport_settings(), chain_adapter, metrics_labels),
+            daemon=True,
+        )
+        process.start()
+        workers.append(process)
+    print(f"Started {len(workers)} load worker process(es) at {rate_share:.2f} TPS each ({target_tps} TPS total).")
+
+    stats = OpenLoopStats(target_tps, duration_seconds)
+    pending_workers = set(range(len(workers)))
+    while pending_workers:
+        try:
+            kind, worker_index, payload = result_queue.get(timeout=1.0)
+        except queue_module.Empty:
+            # A worker killed without reaching its finally block never reports done;
+            # the queue is drained by now, so a dead worker has nothing left to send.
+            for worker_index in list(pending_workers):
+                if not workers[worker_index].is_alive():
+                    print(f"⚠️ Load worker {worker_index} exited without reporting completion.")
+                    pending_workers.discard(worker_index)
+            continue
+        if kind == _MSG_DONE:
+            pending_workers.discard(worker_index)
+        elif kind == _MSG_METRICS:
+            merge_metric_deltas(payload)
+        else:
+            stats.record(payload)
+            if on_result is not None:
+                on_result(payload)
+
+    for process in workers:
+        process.join()
+    return stats.summary()
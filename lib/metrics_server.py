@@ -0,0 +1,299 @@
+# lib/metrics_server.py
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from web3.middleware import Web3Middleware
+
+# --- Server Defaults ---
+DEFAULT_METRICS_HOST = "127.0.0.1" # local scrape only
+DEFAULT_METRICS_PORT = 9464
+PORT_SEARCH_RANGE = 16 # concurrent chain processes take the next free port
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Recording is a no-op until the server is started, so runs without it pay nothing
+_ENABLED = False
+_DEFAULT_LABELS = {} # e.g. {'chain': 'anvil'}: one chain per process, set by the runner
+_REGISTRY = []
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# --- Metric Types (Prometheus text exposition format 0.0.4) ---
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, help_text, label_names=('chain',)):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {} # label values tuple -> value
+        self._lock = threading.Lock()
+        with _REGISTRY_LOCK:
+            _REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, _DEFAULT_LABELS.get(name, ''))) for name in self.label_names)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.label_names, key)) + list(extra)
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}' if pairs else ''
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(self._sample_lines(key, value) for key, value in items)
+        return '\n'.join(lines)
+
+    def _sample_lines(self, key, value):
+        return f"{self.name}{self._label_text(key)} {value}"
+
+    def _take_delta(self):
+        """Values recorded since the last call, which are then reset (shipped from a worker process)."""
+        with self._lock:
+            delta, self._values = self._values, {}
+        return delta
+
+    def _merge_delta(self, delta):
+        with self._lock:
+            for key, value in delta.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not _ENABLED: return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    A gauge moved with inc/dec (e.g. in-flight txs) sums across worker processes;
+    one set to a reading (additive=False, e.g. the gas price) takes the latest.
+    """
+    metric_type = "gauge"
+
+    def __init__(self, name, help_text, label_names=('chain',), additive=True):
+        super().__init__(name, help_text, label_names)
+        self.additive = additive
+        self._shipped = {} # label values tuple -> value already shipped by _take_delta
+
+    def _take_delta(self):
+        with self._lock:
+            if not self.additive:
+                return dict(self._values)
+            delta = {key: value - self._shipped.get(key, 0) for key, value in self._values.items() if value != self._shipped.get(key, 0)}
+            self._shipped = dict(self._values)
+        return delta
+
+    def _merge_delta(self, delta):
+        if self.additive:
+            return super()._merge_delta(delta)
+        with self._lock:
+            self._values.update(delta)
+
+    def set(self, value, **labels):
+        if not _ENABLED: return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        if not _ENABLED: return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; value per label set is [bucket counts..., sum, count]."""
+    metric_type = "histogram"
+
+    def __init__(self, name, help_text, label_names=('chain',), buckets=LATENCY_BUCKETS_SECONDS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not _ENABLED: return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound: state[i] += 1
+            state[-2] += value; state[-1] += 1
+
+    def _sample_lines(self, key, state):
+        lines = [f"{self.name}_bucket{self._label_text(key, [('le', bound)])} {state[i]}" for i, bound in enumerate(self.buckets)]
+        lines.append(f"{self.name}_bucket{self._label_text(key, [('le', '+Inf')])} {state[-1]}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {state[-2]}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {state[-1]}")
+        return '\n'.join(lines)
+
+    def _merge_delta(self, delta):
+        with self._lock:
+            for key, state in delta.items():
+                current = self._values.get(key)
+                self._values[key] = state if current is None else [a + b for a, b in zip(current, state)]
+
+
+# --- Benchmark Metrics ---
+TXS_SENT = Counter("l2bench_txs_sent_total", "Transactions accepted by the node (have a tx hash), counted when their result is final", ('chain', 'action'))
+TXS_CONFIRMED = Counter("l2bench_txs_confirmed_total", "Transactions mined with status 1", ('chain', 'action'))
+TXS_FAILED = Counter("l2bench_txs_failed_total", "Transactions reverted, rejected, timed out or not sent", ('chain', 'action', 'status'))
+TXS_IN_FLIGHT = Gauge("l2bench_txs_in_flight", "Sent transactions currently awaiting their receipt")
+CONFIRMATION_SECONDS = Histogram("l2bench_confirmation_seconds", "Submit acknowledged to including block seen", ('chain', 'action'))
+RPC_REQUEST_SECONDS = Histogram("l2bench_rpc_request_seconds", "JSON-RPC request latency by method", ('chain', 'method'))
+RPC_ERRORS = Counter("l2bench_rpc_errors_total", "JSON-RPC requests that raised or returned an error", ('chain', 'method'))
+GAS_PRICE_WEI = Gauge("l2bench_gas_price_wei", "Gas price currently served by the gas price oracle", additive=False)
+NONCE_RESYNCS = Counter("l2bench_nonce_resyncs_total", "Local nonce streams resynced from the node's pending count")
+NONCE_GAP = Counter("l2bench_nonce_gap_total", "Nonces handed out that the node never counted (local next nonce minus pending count at resync)")
+
+
+def observe_result(result):
+    """ResultSink observer: sent/confirmed/failed counters and confirmation time per chain and action."""
+    if not _ENABLED: return
+    labels = {'action': result.get('action') or 'unknown'}
+    if result.get('chain'): labels['chain'] = result.get('chain')
+    status = result.get('status')
+    if result.get('tx_hash'): TXS_SENT.inc(**labels)
+    if status == 'Success':
+        TXS_CONFIRMED.inc(**labels)
+        confirmation_time = result.get('confirmation_time_sec')
+        if confirmation_time is not None: CONFIRMATION_SECONDS.observe(float(confirmation_time), **labels)
+    else:
+        TXS_FAILED.inc(status=status or 'unknown', **labels)
+
+
+# --- RPC Latency Middleware ---
+def _is_error(response):
+    return isinstance(response, dict) and response.get('error') is not None
+
+
+class RpcMetricsMiddleware(Web3Middleware):
+    """Times every JSON-RPC request of a (sync or async) web3 instance by method."""
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            start = time.perf_counter()
+            try:
+                response = make_request(method, params)
+            except Exception:
+                RPC_ERRORS.inc(method=method); raise
+            finally:
+                RPC_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method)
+            if _is_error(response): RPC_ERRORS.inc(method=method)
+            return response
+        return middleware
+
+    async def async_wrap_make_request(self, make_request):
+        async def middleware(method, params):
+            start = time.perf_counter()
+            try:
+                response = await make_request(method, params)
+            except Exception:
+                RPC_ERRORS.inc(method=method); raise
+            finally:
+                RPC_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method)
+            if _is_error(response): RPC_ERRORS.inc(method=method)
+            return response
+        return middleware
+
+
+def instrument_web3(w3_instance):
+    """Adds RPC latency metrics to a web3 instance (only while the metrics server is running)."""
+    if _ENABLED and 'rpc_metrics' not in w3_instance.middleware_onion:
+        w3_instance.middleware_onion.add(RpcMetricsMiddleware, name='rpc_metrics')
+    return w3_instance
+
+
+# --- Worker Processes ---
+# Spawned load workers cannot serve their own registry on the run's port, so they
+# record locally and ship what changed to the serving process, which merges it.
+def recording_labels():
+    """Default labels to hand to spawned workers while recording is on; None when it is off."""
+    return dict(_DEFAULT_LABELS) if _ENABLED else None
+
+
+def enable_recording(default_labels=None):
+    """Turns recording on without serving (worker processes); see take_metric_deltas."""
+    global _ENABLED
+    _DEFAULT_LABELS.update(default_labels or {})
+    _ENABLED = True
+
+
+def take_metric_deltas():
+    """Picklable {metric name: {label values: delta}} of everything recorded since the last call."""
+    with _REGISTRY_LOCK:
+        metrics = list(_REGISTRY)
+    deltas = {metric.name: metric._take_delta() for metric in metrics}
+    return {name: delta for name, delta in deltas.items() if delta}
+
+
+def merge_metric_deltas(deltas):
+    """Adds a worker's take_metric_deltas() into this process's metrics (no-op unless recording)."""
+    if not _ENABLED or not deltas: return
+    with _REGISTRY_LOCK:
+        metrics = {metric.name: metric for metric in _REGISTRY}
+    for name, delta in deltas.items():
+        if name in metrics: metrics[name]._merge_delta(delta)
+
+
+# --- HTTP Endpoint ---
+def render_metrics():
+    with _REGISTRY_LOCK:
+        metrics = list(_REGISTRY)
+    return '\n'.join(metric.expose() for metric in metrics) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404); return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # scrapes every few seconds would flood the run's output
+
+
+def start_metrics_server(port=DEFAULT_METRICS_PORT, host=DEFAULT_METRICS_HOST, default_labels=None):
+    """
+    Serves /metrics from a daemon thread and enables recording. If the port is
+    taken (e.g. by another chain's process) the next free one is used.
+    Returns the server (server.server_port is the bound port).
+    """
+    last_error = None
+    for candidate in range(port, port + PORT_SEARCH_RANGE):
+        try:
+            server = ThreadingHTTPServer((host, candidate), _MetricsHandler)
+            break
+        except OSError as e:
+            last_error = e
+    else:
+        raise OSError(f"No free metrics port in {port}-{port + PORT_SEARCH_RANGE - 1}: {last_error}")
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    enable_recording(default_labels)
+    return server
+
+
+def stop_metrics_server(server):
+    global _ENABLED
+    _ENABLED = False
+    server.shutdown()
+    server.server_close()
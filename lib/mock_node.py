@@ -0,0 +1,456 @@
+# lib/mock_node.py
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import rlp
+from eth_account import Account
+from eth_utils import big_endian_to_int, keccak, to_checksum_address
+
+# --- Mock Node Defaults ---
+DEFAULT_MOCK_HOST = "127.0.0.1"
+DEFAULT_MOCK_PORT = 8549
+DEFAULT_CHAIN_ID = 1337
+DEFAULT_BLOCK_TIME_SECONDS = 1.0 # 0: automine, one block per tx as soon as it is sent
+DEFAULT_GAS_PRICE_WEI = 100_000_000 # 0.1 gwei, above the runner's low-price floor
+DEFAULT_BALANCE_WEI = 10**24 # every account is funded
+DEFAULT_L1_GAS_PRICE_WEI = 20_000_000_000
+BLOCKS_PER_L1_BATCH = 10 # zkSync-style receipts
+MOCK_L1_CHAIN_ID = 9 # what anvil-zksync reports
+RECEIPT_STYLES = ("evm", "optimism", "arbitrum", "zksync")
+CLIENT_VERSION = "l2bench-mock/1.0"
+
+ZKSYNC_CONTRACT_DEPLOYER = "0x0000000000000000000000000000000000008006"
+_ZKSYNC_CREATE_PREFIX = keccak(text="zksyncCreate")
+_TRANSFER_TOPIC = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+_SAFE_MINT_SELECTOR = keccak(text="safeMint(address)")[:4]
+_ERC20_MINT_SELECTOR = keccak(text="mint(address,uint256)")[:4]
+_ZERO_WORD = "0x" + "00" * 32
+
+
+def _hex(value):
+    return hex(value)
+
+
+def _word(value):
+    return "0x" + (value if isinstance(value, bytes) else value.to_bytes(32, 'big')).rjust(32, b'\0').hex()
+
+
+class RpcError(Exception):
+    def __init__(self, message, code=-32000):
+        super().__init__(message)
+        self.code = code
+
+
+# --- Raw Transaction Decoding ---
+def _decode_zksync_tx(raw):
+    """Type 0x71: sender is in the payload; the hash is zkSync's (keccak(signed EIP-712 digest ++ keccak(signature)))."""
+    from zksync2.module.request_types import EIP712Meta # optional dependency, only needed for zkSync-style txs
+    from zksync2.signer.eth_signer import PrivateKeyEthSigner
+    from zksync2.transaction.transaction712 import Transaction712
+
+    nonce, tip, max_fee, gas, to, value, data, chain_id, _, _, _, sender, gas_per_pubdata, factory_deps, signature, _ = rlp.decode(raw[1:])
+    tx_712 = Transaction712(
+        chain_id=big_endian_to_int(chain_id), nonce=big_endian_to_int(nonce), gas_limit=big_endian_to_int(gas),
+        to="0x" + to.hex(), value=big_endian_to_int(value), data=data,
+        maxPriorityFeePerGas=big_endian_to_int(tip), maxFeePerGas=big_endian_to_int(max_fee), from_="0x" + sender.hex(),
+        meta=EIP712Meta(gas_per_pub_data=big_endian_to_int(gas_per_pubdata), custom_signature=None,
+                        factory_deps=list(factory_deps) or None, paymaster_params=None),
+    )
+    signed_bytes = PrivateKeyEthSigner(None, tx_712.chain_id).typed_data_to_signed_bytes(tx_712.to_eip712_struct())
+    return {
+        'type': 0x71, 'chain_id': tx_712.chain_id, 'nonce': tx_712.nonce, 'gas': tx_712.gas_limit,
+        'gas_price': tx_712.maxFeePerGas, 'tip': tx_712.maxPriorityFeePerGas, 'to': to_checksum_address(to),
+        'value': tx_712.value, 'data': bytes(data), 'from': to_checksum_address(sender), 'factory_deps': list(factory_deps),
+        'hash': keccak(keccak(signed_bytes.body) + keccak(bytes(signature))),
+    }
+
+
+def decode_raw_transaction(raw):
+    """
+    Fields, sender and hash of a signed legacy, 0x01, 0x02 or zkSync 0x71 transaction.
+    The EVM sender is recovered from the signature (eth_keys: ~10 ms per tx in pure
+    Python, well under 1 ms with coincurve installed); 0x71 signatures are not checked.
+    """
+    if raw[0] == 0x71:
+        return _decode_zksync_tx(raw)
+    if raw[0] >= 0xc0:
+        nonce, gas_price, gas, to, value, data, v, _, _ = rlp.decode(raw)
+        v = big_endian_to_int(v)
+        tx = {'type': 0, 'chain_id': (v - 35) // 2 if v >= 35 else None, 'gas_price': big_endian_to_int(gas_price), 'tip': None}
+    elif raw[0] == 0x01:
+        chain_id, nonce, gas_price, gas, to, value, data, _, _, _, _ = rlp.decode(raw[1:])
+        tx = {'type': 1, 'chain_id': big_endian_to_int(chain_id), 'gas_price': big_endian_to_int(gas_price), 'tip': None}
+    elif raw[0] == 0x02:
+        chain_id, nonce, tip, max_fee, gas, to, value, data, _, _, _, _ = rlp.decode(raw[1:])
+        tx = {'type': 2, 'chain_id': big_endian_to_int(chain_id), 'gas_price': big_endian_to_int(max_fee), 'tip': big_endian_to_int(tip)}
+    else:
+        raise RpcError(f"unsupported transaction type {raw[0]:#x}")
+    tx.update({'nonce': big_endian_to_int(nonce), 'gas': big_endian_to_int(gas), 'to': to_checksum_address(to) if to else None,
+               'value': big_endian_to_int(value), 'data': bytes(data), 'factory_deps': [],
+               'from': Account.recover_transaction(raw), 'hash': keccak(raw)})
+    return tx
+
+
+def intrinsic_gas(data, create=False):
+    return 21000 + sum(16 if b else 4 for b in data) + (32000 if create else 0)
+
+
+# --- Mock Chain ---
+class MockL2Node:
+    """
+    In-process stand-in for an L2 node with deterministic behaviour: accepts signed
+    txs, keeps per-sender nonces (gapped nonces wait in a queue, as in a real
+    mempool) and seals a block every block_time seconds with the txs sent at least
+    inclusion_delay seconds earlier. Gas is a fixed model (intrinsic gas plus a flat
+    charge per contract call), not EVM execution; deployments get code, NFT
+    safeMint and ERC20 mint calls emit Transfer logs, so every runner phase works.
+    Receipts carry the L2 fields of receipt_style ("optimism": l1Fee/l1GasUsed/
+    l1GasPrice/l1FeeScalar, "arbitrum": gasUsedForL1/l1BlockNumber, "zksync":
+    l1BatchNumber/l1BatchTxIndex/l2ToL1Logs).
+
+    Failure injection: reject_rate (eth_sendRawTransaction returns an error),
+    drop_rate (accepted but never mined; later nonces of that sender stall until
+    it resyncs), revert_rate (mined with status 0) and rpc_error_rate (any other
+    call fails). Tx outcomes are derived from seed and the tx hash, so the same
+    signed txs fail the same way on every run. unsupported_methods answer "method
+    not found" (e.g. eth_getBlockReceipts, to exercise clients' fallbacks).
+    """
+
+    def __init__(self, chain_id=DEFAULT_CHAIN_ID, block_time=DEFAULT_BLOCK_TIME_SECONDS, inclusion_delay=0.0,
+                 receipt_style="evm", gas_price_wei=DEFAULT_GAS_PRICE_WEI, max_txs_per_block=None,
+                 reject_rate=0.0, drop_rate=0.0, revert_rate=0.0, rpc_error_rate=0.0, response_delay=0.0,
+                 seed=0, balance_wei=DEFAULT_BALANCE_WEI, l1_gas_price_wei=DEFAULT_L1_GAS_PRICE_WEI, call_gas=30000,
+                 unsupported_methods=()):
+        if receipt_style not in RECEIPT_STYLES:
+            raise ValueError(f"Unknown receipt style: {receipt_style} (expected one of {', '.join(RECEIPT_STYLES)})")
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.inclusion_delay = inclusion_delay
+        self.receipt_style = receipt_style
+        self.gas_price_wei = gas_price_wei
+        self.max_txs_per_block = max_txs_per_block
+        self.reject_rate = reject_rate
+        self.drop_rate = drop_rate
+        self.revert_rate = revert_rate
+        self.rpc_error_rate = rpc_error_rate
+        self.response_delay = response_delay
+        self.seed = seed
+        self.balance_wei = balance_wei
+        self.l1_gas_price_wei = l1_gas_price_wei
+        self.call_gas = call_gas
+        self.unsupported_methods = set(unsupported_methods)
+        self._lock = threading.Lock()
+        self._rpc_rng = random.Random(seed) # per-call errors: deterministic for a given request order
+        self._blocks = [self._new_block(0, b'\0' * 32, int(time.time()), [])]
+        self._txs = {} # hash -> decoded tx (+ submitted_at)
+        self._pending = [] # hashes with contiguous nonces, in arrival order
+        self._queued = {} # sender -> {nonce: hash} waiting for a nonce gap to fill
+        self._next_nonce = {} # sender -> pending nonce
+        self._mined_nonce = {} # sender -> latest (mined) nonce
+        self._receipts = {} # hash -> receipt
+        self._code = {} # address -> code
+        self._token_ids = {} # NFT contract -> next token id
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.stats = {'requests': {}, 'handler_seconds': 0.0, 'txs_accepted': 0, 'txs_rejected': 0,
+                      'txs_dropped': 0, 'txs_reverted': 0, 'txs_mined': 0}
+
+    # --- Block production ---
+    def start(self):
+        if self.block_time > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mock-miner", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.block_time + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.block_time):
+            self.mine_block()
+
+    @staticmethod
+    def _new_block(number, parent_hash, timestamp, tx_hashes):
+        block_hash = keccak(number.to_bytes(32, 'big') + parent_hash + timestamp.to_bytes(32, 'big') + b''.join(tx_hashes))
+        return {'number': number, 'hash': block_hash, 'parent_hash': parent_hash, 'timestamp': timestamp, 'tx_hashes': tx_hashes, 'gas_used': 0}
+
+    def mine_block(self, include_all=False):
+        """Seals a block with the pending txs that have waited inclusion_delay (or all of them); returns its number."""
+        now = time.time()
+        with self._lock:
+            ready = [h for h in self._pending if include_all or self._txs[h]['submitted_at'] + self.inclusion_delay <= now]
+            if self.max_txs_per_block is not None: ready = ready[:self.max_txs_per_block]
+            included = set(ready)
+            self._pending = [h for h in self._pending if h not in included]
+            parent = self._blocks[-1]
+            block = self._new_block(parent['number'] + 1, parent['hash'], max(int(now), parent['timestamp']), ready)
+            self._blocks.append(block)
+            for index, tx_hash in enumerate(ready):
+                block['gas_used'] += self._execute(self._txs[tx_hash], block, index, block['gas_used'])
+            return block['number']
+
+    # --- Execution model ---
+    def _roll(self, tx_hash, salt):
+        return int.from_bytes(keccak(self.seed.to_bytes(8, 'big', signed=True) + salt.encode() + tx_hash)[:8], 'big') / 2**64
+
+    def _contract_address(self, tx):
+        sender = bytes.fromhex(tx['from'][2:])
+        if tx['to'] is not None and tx['to'].lower() == ZKSYNC_CONTRACT_DEPLOYER:
+            return to_checksum_address(keccak(_ZKSYNC_CREATE_PREFIX + sender.rjust(32, b'\0') + tx['nonce'].to_bytes(32, 'big'))[12:])
+        if tx['to'] is None:
+            return to_checksum_address(keccak(rlp.encode([sender, tx['nonce']]))[12:])
+        return None
+
+    def _logs(self, tx):
+        """Transfer events of the calls the runner checks (NFT token ids come from these logs)."""
+        to, data = tx['to'], tx['data']
+        if to is None or to.lower() not in self._code or len(data) < 4: return []
+        if data[:4] == _SAFE_MINT_SELECTOR:
+            token_id = self._token_ids.get(to.lower(), 0); self._token_ids[to.lower()] = token_id + 1
+            return [(to, [_TRANSFER_TOPIC, _ZERO_WORD, _word(data[4:36]), _word(token_id)], "0x")]
+        if data[:4] == _ERC20_MINT_SELECTOR:
+            return [(to, [_TRANSFER_TOPIC, _ZERO_WORD, _word(data[4:36])], "0x" + data[36:68].hex())]
+        return []
+
+    def _execute(self, tx, block, index, cumulative_gas):
+        reverted = self._roll(tx['hash'], 'revert') < self.revert_rate
+        contract_address = self._contract_address(tx)
+        gas_used = intrinsic_gas(tx['data'], create=contract_address is not None) + sum(len(dep) for dep in tx['factory_deps'])
+        if tx['to'] is not None and tx['to'].lower() in self._code: gas_used += self.call_gas
+        gas_used = min(gas_used, tx['gas'])
+        logs = [] if reverted else self._logs(tx)
+        if contract_address and not reverted:
+            self._code[contract_address.lower()] = tx['factory_deps'][0] if tx['factory_deps'] else tx['data'] or b'\0'
+        sender = tx['from'].lower()
+        self._mined_nonce[sender] = max(self._mined_nonce.get(sender, 0), tx['nonce'] + 1)
+        self.stats['txs_mined'] += 1
+        if reverted: self.stats['txs_reverted'] += 1
+        tx_hash = "0x" + tx['hash'].hex(); block_hash = "0x" + block['hash'].hex()
+        receipt = {
+            'transactionHash': tx_hash, 'transactionIndex': _hex(index), 'blockHash': block_hash, 'blockNumber': _hex(block['number']),
+            'from': tx['from'], 'to': tx['to'],
+            'cumulativeGasUsed': _hex(cumulative_gas + gas_used), 'gasUsed': _hex(gas_used),
+            'effectiveGasPrice': _hex(tx['gas_price'] if tx['tip'] is None else min(tx['gas_price'], self.gas_price_wei)),
+            'contractAddress': None if reverted else contract_address, 'logsBloom': "0x" + "00" * 256,
+            'status': "0x0" if reverted else "0x1", 'type': _hex(tx['type']),
+            'logs': [{'address': address, 'topics': topics, 'data': data, 'blockNumber': _hex(block['number']), 'blockHash': block_hash,
+                      'transactionHash': tx_hash, 'transactionIndex': _hex(index), 'logIndex': _hex(i), 'removed': False}
+                     for i, (address, topics, data) in enumerate(logs)],
+        }
+        receipt.update(self._l2_receipt_fields(tx, block, index, gas_used))
+        if self.receipt_style == "zksync":
+            for log in receipt['logs']: log['l1BatchNumber'] = receipt['l1BatchNumber']
+        self._receipts[tx['hash']] = receipt
+        return gas_used
+
+    def _l2_receipt_fields(self, tx, block, index, gas_used):
+        l1_gas_used = 16 * (len(tx['data']) + 68) + 188 # calldata of the signed tx, roughly, plus fixed overhead
+        if self.receipt_style == "optimism":
+            return {'l1GasUsed': _hex(l1_gas_used), 'l1GasPrice': _hex(self.l1_gas_price_wei),
+                    'l1Fee': _hex(l1_gas_used * self.l1_gas_price_wei), 'l1FeeScalar': "1"}
+        if self.receipt_style == "arbitrum":
+            return {'gasUsedForL1': _hex(l1_gas_used * self.l1_gas_price_wei // max(1, self.gas_price_wei) // 16),
+                    'l1BlockNumber': _hex(block['number'] // 4)}
+        if self.receipt_style == "zksync":
+            return {'l1BatchNumber': _hex(block['number'] // BLOCKS_PER_L1_BATCH), 'l1BatchTxIndex': _hex(index),
+                    'l2ToL1Logs': [], 'root': "0x" + block['hash'].hex()}
+        return {}
+
+    # --- Transaction pool ---
+    def send_raw_transaction(self, raw):
+        tx = decode_raw_transaction(raw)
+        if tx['chain_id'] is not None and tx['chain_id'] != self.chain_id:
+            raise RpcError(f"invalid chain id {tx['chain_id']} (node is {self.chain_id})")
+        if tx['gas'] < intrinsic_gas(tx['data'], create=tx['to'] is None):
+            raise RpcError("intrinsic gas too low")
+        if self._roll(tx['hash'], 'reject') < self.reject_rate:
+            with self._lock: self.stats['txs_rejected'] += 1
+            raise RpcError("mock: transaction rejected (injected failure)")
+        sender = tx['from'].lower()
+        with self._lock:
+            if tx['hash'] in self._txs: raise RpcError("already known")
+            next_nonce = self._next_nonce.get(sender, 0)
+            if tx['nonce'] < next_nonce: raise RpcError(f"nonce too low: next nonce {next_nonce}, tx nonce {tx['nonce']}")
+            self.stats['txs_accepted'] += 1
+            if self._roll(tx['hash'], 'drop') < self.drop_rate:
+                self.stats['txs_dropped'] += 1 # hash returned, never pooled
+                return "0x" + tx['hash'].hex()
+            tx['submitted_at'] = time.time()
+            self._txs[tx['hash']] = tx
+            queued = self._queued.setdefault(sender, {})
+            queued[tx['nonce']] = tx['hash']
+            while next_nonce in queued: # promote contiguous nonces
+                self._pending.append(queued.pop(next_nonce)); next_nonce += 1
+            self._next_nonce[sender] = next_nonce
+        if self.block_time <= 0: self.mine_block(include_all=True)
+        return "0x" + tx['hash'].hex()
+
+    # --- JSON-RPC ---
+    def _block_by_tag(self, tag):
+        with self._lock:
+            if tag in ('latest', 'pending', 'safe', 'finalized', None): return self._blocks[-1]
+            if tag == 'earliest': return self._blocks[0]
+            number = int(tag, 16) if isinstance(tag, str) else tag
+            return self._blocks[number] if 0 <= number < len(self._blocks) else None
+
+    def _block_json(self, block, full_transactions=False):
+        if block is None: return None
+        return {
+            'number': _hex(block['number']), 'hash': "0x" + block['hash'].hex(), 'parentHash': "0x" + block['parent_hash'].hex(),
+            'timestamp': _hex(block['timestamp']), 'gasLimit': _hex(30_000_000), 'gasUsed': _hex(block['gas_used']),
+            'baseFeePerGas': _hex(self.gas_price_wei), 'miner': "0x" + "00" * 20, 'extraData': "0x", 'difficulty': "0x0",
+            'totalDifficulty': "0x0", 'nonce': "0x0000000000000000", 'mixHash': _ZERO_WORD, 'sha3Uncles': _ZERO_WORD,
+            'logsBloom': "0x" + "00" * 256, 'transactionsRoot': _ZERO_WORD, 'stateRoot': _ZERO_WORD, 'receiptsRoot': _ZERO_WORD,
+            'size': "0x0", 'uncles': [],
+            'transactions': [self._tx_json(h) for h in block['tx_hashes']] if full_transactions else ["0x" + h.hex() for h in block['tx_hashes']],
+        }
+
+    def _tx_json(self, tx_hash):
+        tx = self._txs.get(tx_hash)
+        if tx is None: return None
+        receipt = self._receipts.get(tx_hash)
+        return {'hash': "0x" + tx_hash.hex(), 'from': tx['from'], 'to': tx['to'], 'nonce': _hex(tx['nonce']), 'gas': _hex(tx['gas']),
+                'gasPrice': _hex(tx['gas_price']), 'value': _hex(tx['value']), 'input': "0x" + tx['data'].hex(), 'type': _hex(tx['type']),
+                'chainId': _hex(self.chain_id), 'blockNumber': receipt['blockNumber'] if receipt else None,
+                'blockHash': receipt['blockHash'] if receipt else None, 'transactionIndex': receipt['transactionIndex'] if receipt else None}
+
+    def _receipt_json(self, tx_hash):
+        return self._receipts.get(bytes.fromhex(tx_hash[2:]))
+
+    def _estimate_gas(self, params):
+        data = bytes.fromhex((params.get('data') or params.get('input') or '0x')[2:])
+        to = params.get('to')
+        create = to is None or to.lower() == ZKSYNC_CONTRACT_DEPLOYER
+        factory_deps = (params.get('eip712Meta') or {}).get('factoryDeps') or []
+        gas = intrinsic_gas(data, create) + sum((len(dep) - 2) // 2 for dep in factory_deps)
+        return gas + (self.call_gas if to is not None and to.lower() in self._code else 0)
+
+    def _zks_fee(self, params):
+        return {'gas_limit': _hex(self._estimate_gas(params[0])), 'gas_per_pubdata_limit': _hex(50000),
+                'max_fee_per_gas': _hex(self.gas_price_wei), 'max_priority_fee_per_gas': "0x0"}
+
+    def _transaction_count(self, address, tag='latest'):
+        with self._lock:
+            counts = self._next_nonce if tag == 'pending' else self._mined_nonce
+            return _hex(counts.get(address.lower(), 0))
+
+    def _block_receipts(self, tag):
+        block = self._block_by_tag(tag)
+        if block is None: return None
+        with self._lock: return [self._receipts[h] for h in block['tx_hashes']]
+
+    def call(self, method, params):
+        """Result of one JSON-RPC call; raises RpcError for an error response."""
+        params = params or []
+        if method in self.unsupported_methods:
+            raise RpcError(f"the method {method} does not exist/is not available", -32601)
+        if method != 'eth_sendRawTransaction' and self.rpc_error_rate:
+            with self._lock: failed = self._rpc_rng.random() < self.rpc_error_rate
+            if failed: raise RpcError("mock: injected RPC error", -32603)
+        if method == 'eth_sendRawTransaction': return self.send_raw_transaction(bytes.fromhex(params[0][2:]))
+        if method == 'eth_getTransactionReceipt': return self._receipt_json(params[0])
+        if method == 'eth_getTransactionByHash': return self._tx_json(bytes.fromhex(params[0][2:]))
+        if method == 'eth_getTransactionCount': return self._transaction_count(*params[:2])
+        if method == 'eth_blockNumber': return _hex(self._block_by_tag('latest')['number'])
+        if method == 'eth_getBlockByNumber': return self._block_json(self._block_by_tag(params[0]), len(params) > 1 and params[1])
+        if method == 'eth_getBlockByHash':
+            with self._lock: block = next((b for b in self._blocks if "0x" + b['hash'].hex() == params[0]), None)
+            return self._block_json(block, len(params) > 1 and params[1])
+        if method == 'eth_getBlockReceipts': return self._block_receipts(params[0])
+        if method == 'eth_getCode':
+            with self._lock: code = self._code.get(params[0].lower(), b'')
+            return "0x" + code.hex()
+        if method == 'eth_estimateGas': return _hex(self._estimate_gas(params[0]))
+        if method == 'zks_estimateFee': return self._zks_fee(params)
+        if method == 'zks_estimateGasL1ToL2': return _hex(self._estimate_gas(params[0]) + 200000)
+        if method == 'zks_L1BatchNumber': return _hex(self._block_by_tag('latest')['number'] // BLOCKS_PER_L1_BATCH)
+        if method == 'zks_L1ChainId': return _hex(MOCK_L1_CHAIN_ID)
+        if method in ('eth_gasPrice', 'eth_maxPriorityFeePerGas'): return _hex(self.gas_price_wei if method == 'eth_gasPrice' else 0)
+        if method == 'eth_getBalance': return _hex(self.balance_wei)
+        if method == 'eth_call': return _ZERO_WORD # no EVM: every view call returns zero
+        if method == 'eth_chainId': return _hex(self.chain_id)
+        if method == 'net_version': return str(self.chain_id)
+        if method == 'web3_clientVersion': return CLIENT_VERSION
+        if method == 'eth_syncing': return False
+        raise RpcError(f"the method {method} does not exist/is not available", -32601)
+
+    def handle(self, request):
+        """JSON-RPC response object for one request object."""
+        method = request.get('method')
+        start = time.perf_counter()
+        try:
+            response = {'jsonrpc': "2.0", 'id': request.get('id'), 'result': self.call(method, request.get('params'))}
+        except RpcError as e:
+            response = {'jsonrpc': "2.0", 'id': request.get('id'), 'error': {'code': e.code, 'message': str(e)}}
+        except Exception as e:
+            response = {'jsonrpc': "2.0", 'id': request.get('id'), 'error': {'code': -32602, 'message': f"invalid params: {e}"}}
+        with self._lock:
+            self.stats['requests'][method] = self.stats['requests'].get(method, 0) + 1
+            self.stats['handler_seconds'] += time.perf_counter() - start
+        return response
+
+    def summary(self):
+        with self._lock:
+            requests = sum(self.stats['requests'].values())
+            return (f"{len(self._blocks) - 1} blocks; txs accepted {self.stats['txs_accepted']}, mined {self.stats['txs_mined']}, "
+                    f"reverted {self.stats['txs_reverted']}, rejected {self.stats['txs_rejected']}, dropped {self.stats['txs_dropped']}; "
+                    f"{requests} RPC calls, {self.stats['handler_seconds'] / requests * 1000 if requests else 0:.3f} ms mock time per call")
+
+
+# --- HTTP Endpoint ---
+class _MockRpcHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive, like a real node behind the pooled transports
+    node = None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.node.response_delay: time.sleep(self.node.response_delay)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if isinstance(payload, list):
+            response = [self.node.handle(request) for request in payload] # batch array
+        elif isinstance(payload, dict):
+            response = self.node.handle(payload)
+        else:
+            response = {'jsonrpc': "2.0", 'id': None, 'error': {'code': -32700, 'message': "parse error"}}
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _MockRpcServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError): return # client went away mid-response (e.g. a cancelled poll)
+        super().handle_error(request, client_address)
+
+
+def start_mock_node(node, port=DEFAULT_MOCK_PORT, host=DEFAULT_MOCK_HOST):
+    """Serves node over HTTP JSON-RPC (single and batch requests) from a daemon thread; returns the server."""
+    handler = type("MockRpcHandler", (_MockRpcHandler,), {'node': node})
+    server = _MockRpcServer((host, port), handler)
+    node.start()
+    threading.Thread(target=server.serve_forever, name="mock-node", daemon=True).start()
+    return server
+
+
+def stop_mock_node(server):
+    server.shutdown()
+    server.server_close()
+    server.RequestHandlerClass.node.stop()
@@ -0,0 +1,174 @@
+# lib/multi_chain.py
+import multiprocessing
+import os
+import queue as queue_module
+import sys
+import threading
+import time
+
+# Scenario phases wait for every chain at this barrier, so e.g. the sustained load
+# windows of all chains overlap instead of drifting apart with deploy/funding times.
+PHASE_BARRIER_TIMEOUT_SECONDS = 600
+
+_PHASE_BARRIER = None # Set in each chain worker process; None outside a multi-chain run
+
+
+# --- Phase Synchronisation ---
+def sync_phase(phase_name):
+    """Blocks until every chain of a multi-chain run reaches this phase (no-op in single-chain runs)."""
+    if _PHASE_BARRIER is None or _PHASE_BARRIER.broken:
+        return
+    try:
+        _PHASE_BARRIER.wait(timeout=PHASE_BARRIER_TIMEOUT_SECONDS)
+    except threading.BrokenBarrierError:
+        print(f"⚠️ Phase '{phase_name}': another chain stopped or timed out; continuing without cross-chain sync.")
+
+
+class _PrefixedStream:
+    """Line-prefixes a worker's stdout with its chain name and writes whole lines only, so chains don't interleave mid-line."""
+
+    def __init__(self, stream, prefix):
+        self.stream = stream
+        self.prefix = prefix
+        self._partial_line = ''
+
+    def write(self, text):
+        lines = (self._partial_line + text).split('\n')
+        self._partial_line = lines.pop()
+        if lines:
+            self.stream.write(''.join(f"{self.prefix}{line}\n" if line.strip() else '\n' for line in lines))
+            self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        if self._partial_line:
+            self.stream.write(f"{self.prefix}{self._partial_line}")
+            self._partial_line = ''
+        self.stream.flush()
+
+
+# --- Chain Worker Process ---
+def _chain_worker_main(run_fn, chain_name, run_name, overrides, phase_barrier, result_queue):
+    """Runs the whole suite for one chain and reports run_fn's results CSV path (or the error)."""
+    global _PHASE_BARRIER
+    _PHASE_BARRIER = phase_barrier
+    sys.stdout = _PrefixedStream(sys.stdout, f"[{chain_name}] ")
+    try:
+        csv_path = run_fn(l2_config_name=chain_name, run_name=run_name, overrides=overrides)
+        if csv_path is None:
+            phase_barrier.abort() # setup failed before the first phase (or nothing was recorded); release the other chains
+        result_queue.put((chain_name, csv_path, None))
+    except BaseException as e:
+        phase_barrier.abort() # never leave the other chains waiting on this one
+        result_queue.put((chain_name, None, f"{type(e).__name__}: {e}"))
+    finally:
+        sys.stdout.flush()
+
+
+# --- Coordinator ---
+def run_chains_concurrently(run_fn, chain_names, run_name, overrides=None):
+    """
+    Runs run_fn(l2_config_name=, run_name=, overrides=) for every chain at the same
+    time, each in its own spawned process (own connections, nonce streams, gas
+    oracle and open-loop rate controller). run_fn must be a module-level function
+    that returns the path of the results CSV it wrote.
+    Returns {chain_name: csv_path or None}.
+    """
+    context = multiprocessing.get_context("spawn") # fresh interpreters: no shared module state between chains
+    manager = context.Manager()
+    phase_barrier = manager.Barrier(len(chain_names))
+    result_queue = context.Queue()
+    processes = {}
+    csv_paths = {}
+    try:
+        for chain_name in chain_names:
+            # Each worker drives only its own chain in the load profile stage. Not daemonic, so a chain
+            # can still spawn its own load worker processes (LOAD_WORKER_PROCESSES > 1).
+            chain_overrides = dict(overrides or {}, LOAD_PROFILE_CHAINS=[chain_name])
+            process = context.Process(target=_chain_worker_main, name=f"chain-{chain_name}", args=(
+                run_fn, chain_name, f"{run_name}_{chain_name}", chain_overrides, phase_barrier, result_queue))
+            process.start()
+            processes[chain_name] = process
+        while len(csv_paths) < len(processes):
+            try:
+                chain_name, csv_path, error = result_queue.get(timeout=1.0)
+            except queue_module.Empty:
+                dead = [name for name, p in processes.items() if name not in csv_paths and not p.is_alive()]
+                if dead and result_queue.empty():
+                    for chain_name in dead: # died without reporting (e.g. killed)
+                        print(f"❌ {chain_name}: worker exited with code {processes[chain_name].exitcode}")
+                        csv_paths[chain_name] = None
+                    phase_barrier.abort()
+                continue
+            if error:
+                print(f"❌ {chain_name}: run failed ({error})")
+            csv_paths[chain_name] = csv_path
+    finally:
+        for process in processes.values():
+            process.join()
+        manager.shutdown()
+    return csv_paths
+
+
+def combine_chain_histograms(csv_paths, combined_path):
+    """Merges the per-chain latency histogram files into one next to the combined CSV; returns the merged histograms."""
+    from .latency_histogram import histogram_path, load_histograms, write_histograms
+    paths = [histogram_path(path) for path in csv_paths.values() if path and os.path.exists(histogram_path(path))]
+    if not paths:
+        return None
+    merged = load_histograms(paths)
+    write_histograms(histogram_path(combined_path), merged)
+    return merged
+
+
+def combine_chain_results(csv_paths, run_name, results_dir='results'):
+    """Concatenates the per-chain result files into one chain-tagged CSV; returns (combined_df, path)."""
+    import pandas as pd # only needed once the runs are done
+    from .result_sink import load_results
+    frames = []
+    for chain_name, csv_path in csv_paths.items():
+        if not csv_path or not os.path.exists(csv_path):
+            continue
+        frame = load_results(csv_path)
+        frame['chain'] = frame['chain'].fillna(chain_name) if 'chain' in frame.columns else chain_name
+        frames.append(frame)
+    if not frames:
+        return None, None
+    combined = pd.concat(frames, ignore_index=True)
+    combined = combined[['chain'] + [col for col in combined.columns if col != 'chain']]
+    os.makedirs(results_dir, exist_ok=True)
+    combined_path = f"{results_dir}/benchmark_results_{run_name}_multichain_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+    combined.to_csv(combined_path, index=False)
+    return combined, combined_path
+
+
+def format_chain_comparison(combined):
+    """Per chain and action: tx count, success rate and confirmation-time percentiles."""
+    df = combined.copy()
+    df['success'] = df['status'] == 'Success'
+    df['confirmation_time_sec'] = df['confirmation_time_sec'].where(df['success'])
+    grouped = df.groupby(['chain', 'action'])
+    table = grouped.agg(txs=('status', 'size'), success_rate=('success', 'mean'),
+                        p50_sec=('confirmation_time_sec', 'median'),
+                        p99_sec=('confirmation_time_sec', lambda s: s.quantile(0.99)))
+    return table.round(4).reset_index().to_string(index=False)
+
+
+def run_multi_chain(run_fn, chain_names, run_name, overrides=None):
+    """Runs the chains concurrently, then writes and summarises the combined chain-tagged results."""
+    print(f"🚀 Multi-chain run '{run_name}' on {', '.join(chain_names)} (one worker process per chain)")
+    start_time = time.time()
+    csv_paths = run_chains_concurrently(run_fn, chain_names, run_name, overrides)
+    combined, combined_path = combine_chain_results(csv_paths, run_name)
+    if combined is None:
+        print("⚠️ No chain produced results."); return None
+    print(f"\n✅ Combined results ({len(combined)} rows from {combined['chain'].nunique()} chain(s)) saved to: {combined_path}")
+    print(f"Wall time: {time.time() - start_time:.1f}s")
+    print(f"\n--- Chain Comparison ---")
+    print(format_chain_comparison(combined))
+    histograms = combine_chain_histograms(csv_paths, combined_path)
+    if histograms:
+        from .latency_histogram import format_histogram_table
+        print(f"\n--- Confirmation Time Percentiles (seconds, merged histograms) ---")
+        print(format_histogram_table(histograms))
+    return combined_path
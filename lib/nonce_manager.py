@@ -0,0 +1,95 @@
+# lib/nonce_manager.py
+import threading
+
+from .chain_identity import chain_key
+from .metrics_server import NONCE_RESYNCS, NONCE_GAP
+
+# --- Per-Sender Nonce Manager ---
+class NonceManager:
+    """
+    Hands out nonces for one sender locally. The "pending" transaction count is
+    fetched once up front and again only after invalidate() (send errors,
+    dropped or timed-out txs), so the hot path makes no eth_getTransactionCount call.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce = None
+        self._stale_next_nonce = None # local next nonce when invalidated, to measure the gap at resync
+        self.issued_count = 0
+        self.resync_count = 0
+
+    @property
+    def needs_sync(self):
+        return self._next_nonce is None
+
+    def seed(self, pending_count):
+        """Sets the next nonce from a freshly fetched pending count (ignored if another caller already did)."""
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = pending_count
+                if self._stale_next_nonce is not None and self._stale_next_nonce > pending_count:
+                    NONCE_GAP.inc(self._stale_next_nonce - pending_count)
+                self._stale_next_nonce = None
+
+    def take(self):
+        with self._lock:
+            if self._next_nonce is None:
+                raise RuntimeError(f"Nonce manager for {self.address} is not synced.")
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            self.issued_count += 1
+            return nonce
+
+    def peek(self):
+        with self._lock:
+            return self._next_nonce
+
+    def invalidate(self):
+        """Forces a resync from the node's pending count before the next nonce is handed out."""
+        with self._lock:
+            if self._next_nonce is not None:
+                self._stale_next_nonce = self._next_nonce
+                self._next_nonce = None
+                self.resync_count += 1
+                NONCE_RESYNCS.inc()
+
+
+# --- Shared Registry ---
+# Keyed by (chain, sender address) so every execute_* / deploy_* helper and the
+# async engine draw from the same nonce stream for a given account and chain,
+# whichever transport (HTTP or WebSocket) they are connected through.
+_NONCE_MANAGERS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+def _registry_key(w3_instance, address):
+    return (chain_key(w3_instance), address.lower())
+
+def get_nonce_manager(w3_instance, address):
+    key = _registry_key(w3_instance, address)
+    with _REGISTRY_LOCK:
+        manager = _NONCE_MANAGERS.get(key)
+        if manager is None:
+            manager = NonceManager(address)
+            _NONCE_MANAGERS[key] = manager
+        return manager
+
+def next_nonce(w3_instance, address):
+    """Returns the next nonce for address, fetching the pending count only when the manager needs a sync."""
+    manager = get_nonce_manager(w3_instance, address)
+    if manager.needs_sync:
+        manager.seed(w3_instance.eth.get_transaction_count(address, 'pending'))
+    return manager.take()
+
+async def next_nonce_async(async_w3, address):
+    """AsyncWeb3 counterpart of next_nonce; shares the same registry."""
+    manager = get_nonce_manager(async_w3, address)
+    if manager.needs_sync:
+        manager.seed(await async_w3.eth.get_transaction_count(address, 'pending'))
+    return manager.take()
+
+def invalidate_nonce(w3_instance, address):
+    """Call after a send error or dropped tx so the next nonce is refetched from the node."""
+    if address and address != 'N/A':
+        get_nonce_manager(w3_instance, address).invalidate()
@@ -0,0 +1,175 @@
+# lib/presigned_corpus.py
+import asyncio
+import struct
+import time
+from eth_account import Account
+from web3 import Web3
+
+from .async_engine import connect_to_l2_async, fill_receipt_fields, await_receipt, RECEIPT_TIMEOUT_SECONDS
+from .chain_adapters import chain_adapter_for
+from .nonce_manager import invalidate_nonce
+from .receipt_tracker import BlockReceiptTracker
+from .tx_record import TxRecord, stamp
+
+# --- Corpus File Format ---
+# Header: magic, chain id, record count.
+# Record: fixed part (below) followed by run_identifier, action and raw signed tx bytes.
+CORPUS_MAGIC = b'L2BCORP1'
+_HEADER = struct.Struct('>8sQI')
+_RECORD = struct.Struct('>HHI20s20sQQQ32s') # run_id len, action len, raw len, sender, contract, nonce, gas, gas price, tx hash
+_NO_CONTRACT = b'\x00' * 20
+
+
+# --- Corpus Generation ---
+def sign_corpus(w3_instance, jobs_with_keys, gas_price_wei, chain_adapter=None):
+    """
+    Signs every (job, sender_pk) pair ahead of time. Jobs use the async_engine
+    job format; nonces come from the shared nonce manager, so they continue each
+    sender's sequence as the corpus will be sent in order. Returns record dicts
+    carrying the raw signed bytes and the metadata needed for result rows.
+    """
+    chain_adapter = chain_adapter or chain_adapter_for(w3_instance)
+    chain_id = w3_instance.eth.chain_id
+    records = []
+    for job, sender_pk in jobs_with_keys:
+        sender_address = Account.from_key(sender_pk).address
+        tx_details = chain_adapter.build_transaction(w3_instance, sender_address, job['tx'], gas_price_wei)
+        tx_details = chain_adapter.prepare_transaction(w3_instance, tx_details)
+        raw_tx, tx_hash = chain_adapter.sign_transaction(tx_details, sender_pk)
+        records.append({
+            'run_identifier': job['run_identifier'], 'action': job['action'],
+            'sender_address': sender_address, 'nonce': tx_details['nonce'], 'gas': tx_details['gas'],
+            'gas_price_wei': gas_price_wei, 'tx_hash': tx_hash,
+            'contract_address': (job.get('extra_fields') or {}).get('contract_address'),
+            'raw_tx': raw_tx,
+        })
+    return chain_id, records
+
+
+def write_corpus(path, chain_id, records):
+    """Writes signed records to a compact binary corpus file; returns its size in bytes."""
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(CORPUS_MAGIC, chain_id, len(records)))
+        for record in records:
+            run_id = record['run_identifier'].encode(); action = record['action'].encode()
+            contract = bytes.fromhex(record['contract_address'][2:]) if record.get('contract_address') else _NO_CONTRACT
+            f.write(_RECORD.pack(
+                len(run_id), len(action), len(record['raw_tx']), bytes.fromhex(record['sender_address'][2:]), contract,
+                record['nonce'], record['gas'], record['gas_price_wei'], record['tx_hash']
+            ))
+            f.write(run_id); f.write(action); f.write(record['raw_tx'])
+        return f.tell()
+
+
+def read_corpus_header(path):
+    with open(path, 'rb') as f:
+        magic, chain_id, count = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != CORPUS_MAGIC:
+        raise ValueError(f"{path} is not a pre-signed corpus file.")
+    return chain_id, count
+
+
+def iter_corpus(path):
+    """Streams record dicts from a corpus file without loading the whole file."""
+    with open(path, 'rb') as f:
+        magic, _, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != CORPUS_MAGIC:
+            raise ValueError(f"{path} is not a pre-signed corpus file.")
+        for _ in range(count):
+            run_id_len, action_len, raw_len, sender, contract, nonce, gas, gas_price_wei, tx_hash = _RECORD.unpack(f.read(_RECORD.size))
+            yield {
+                'run_identifier': f.read(run_id_len).decode(), 'action': f.read(action_len).decode(),
+                'sender_address': Web3.to_checksum_address(sender), 'nonce': nonce, 'gas': gas,
+                'gas_price_wei': gas_price_wei, 'tx_hash': tx_hash,
+                'contract_address': Web3.to_checksum_address(contract) if contract != _NO_CONTRACT else None,
+                'raw_tx': f.read(raw_len),
+            }
+
+
+# --- Send Phase ---
+async def send_corpus(async_w3, records, receipt_timeout=RECEIPT_TIMEOUT_SECONDS, on_result=None, chain_adapter=None):
+    """
+    Streams raw signed bytes to eth_sendRawTransaction: each sender's records go
+    out back-to-back in nonce order, all senders concurrently. Receipts are
+    collected afterwards by a block-driven tracker, so nothing but the send
+    itself is on the hot path. Returns (results, send_duration_seconds).
+    """
+    by_sender = {}
+    for record in records:
+        by_sender.setdefault(record['sender_address'], []).append(record)
+
+    tracker = BlockReceiptTracker(async_w3)
+    await tracker.start()
+    send_errors = {}
+    send_times = {}
+    send_stages = {} # tx hash -> submit start/ack stamps (build and sign happened when the corpus was made)
+
+    async def _send_sender(sender_records):
+        for record in sender_records:
+            tracker.track(record['tx_hash'])
+            stages = send_stages[record['tx_hash']] = {}
+            try:
+                send_times[record['tx_hash']] = time.time(); stamp(stages, 'submit_start_ns')
+                await async_w3.eth.send_raw_transaction(record['raw_tx'])
+                stamp(stages, 'submit_ack_ns')
+            except Exception as e:
+                tracker.untrack(record['tx_hash'])
+                send_errors[record['tx_hash']] = str(e)
+
+    try:
+        send_start = time.time()
+        await asyncio.gather(*(_send_sender(sender_records) for sender_records in by_sender.values()))
+        send_duration = time.time() - send_start
+
+        async def _collect(record):
+            result = TxRecord(record['run_identifier'], record['action'], None, record['sender_address'], record['nonce'],
+                              Web3.to_hex(record['tx_hash']), contract_address=record['contract_address'],
+                              actual_send_time=send_times.get(record['tx_hash']), **send_stages.get(record['tx_hash'], {}))
+            if record['tx_hash'] in send_errors:
+                result.status = 'Error'; result['error_message'] = send_errors[record['tx_hash']]
+            else:
+                try:
+                    tx_receipt, _ = await await_receipt(async_w3, record['tx_hash'], result, tracker, receipt_timeout)
+                    fill_receipt_fields(result, tx_receipt, record['gas_price_wei'], chain_adapter)
+                except Exception as e:
+                    result.status = 'Error'; result['error_message'] = str(e)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        results = await asyncio.gather(*(_collect(record) for record in records))
+    finally:
+        await tracker.stop()
+
+    for sender_address in by_sender:
+        # The corpus bypassed the shared nonce manager at send time; resync from the node.
+        invalidate_nonce(async_w3, sender_address)
+    return results, send_duration
+
+
+def run_corpus_send(rpc_url, expected_chain_id, corpus_path, on_result=None, chain_adapter=None):
+    """Blocking entry point: replays a corpus file against the node and returns (results, summary)."""
+    corpus_chain_id, count = read_corpus_header(corpus_path)
+    if expected_chain_id is not None and corpus_chain_id != expected_chain_id:
+        raise ValueError(f"Corpus was signed for chain {corpus_chain_id}, but target chain is {expected_chain_id}.")
+    records = list(iter_corpus(corpus_path))
+
+    async def _main():
+        async_w3 = await connect_to_l2_async(rpc_url, expected_chain_id)
+        try:
+            return await send_corpus(async_w3, records, on_result=on_result, chain_adapter=chain_adapter)
+        finally:
+            await async_w3.provider.disconnect()
+
+    results, send_duration = asyncio.run(_main())
+    confirmed = [r for r in results if r.get('status') == 'Success']
+    block_numbers = [r['block_number'] for r in confirmed]
+    summary = {
+        'corpus_txs': count,
+        'send_duration_sec': send_duration,
+        'send_tps': count / send_duration if send_duration > 0 else 0.0,
+        'confirmed_txs': len(confirmed),
+        'failed_txs': len(results) - len(confirmed),
+        'blocks_spanned': (max(block_numbers) - min(block_numbers) + 1) if block_numbers else 0,
+    }
+    return results, summary
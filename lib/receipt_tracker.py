@@ -0,0 +1,175 @@
+# lib/receipt_tracker.py
+import asyncio
+import contextlib
+from web3 import Web3
+from web3.providers.persistent import PersistentConnectionProvider
+
+from .block_cache import get_block_cache
+
+# --- Tracker Defaults ---
+BLOCK_POLL_INTERVAL_SECONDS = 0.05
+# JSON-RPC errors meaning the node lacks a method (method not found, invalid request)
+METHOD_UNSUPPORTED_CODES = (-32601, -32600)
+METHOD_UNSUPPORTED_MESSAGES = ("method not found", "does not exist", "not supported", "unsupported method")
+
+
+def _hash_key(tx_hash):
+    return Web3.to_hex(tx_hash).lower()
+
+
+def _is_method_unsupported(error):
+    """True if an RPC error says the method is unavailable, as opposed to a timeout or transient failure."""
+    rpc_error = (getattr(error, 'rpc_response', None) or {}).get('error')
+    if rpc_error is None and error.args and isinstance(error.args[0], dict): rpc_error = error.args[0]
+    if isinstance(rpc_error, dict) and rpc_error.get('code') in METHOD_UNSUPPORTED_CODES: return True
+    message = str(rpc_error.get('message', '') if isinstance(rpc_error, dict) else error).lower()
+    return any(text in message for text in METHOD_UNSUPPORTED_MESSAGES)
+
+
+# --- Block-Driven Receipt Tracker ---
+class BlockReceiptTracker:
+    """
+    Follows new blocks (newHeads over a persistent connection, eth_blockNumber
+    polling otherwise) and fetches all receipts of each block in one call
+    (eth_getBlockReceipts, or a batched eth_getTransactionReceipt fallback),
+    resolving the waiter of every tracked hash included in that block. RPC
+    traffic scales with blocks, not with in-flight transactions, and a receipt's
+    timestamp is the moment its block was first seen, not a poll tick.
+    """
+
+    def __init__(self, async_w3, poll_interval=BLOCK_POLL_INTERVAL_SECONDS):
+        self.async_w3 = async_w3
+        self.block_cache = get_block_cache(async_w3)
+        self.poll_interval = poll_interval
+        self._pending = {} # tx hash (lowercase hex) -> Future[(receipt, block_seen_time, block_seen_ns)]
+        self._last_block = None
+        self._block_receipts_supported = True
+        self._task = None
+        self.blocks_processed = 0
+        self.rpc_calls = 0
+
+    # --- Public API ---
+    def track(self, tx_hash):
+        """Registers a hash before it is sent, so its block cannot be processed before anyone waits for it."""
+        key = _hash_key(tx_hash)
+        if key not in self._pending:
+            self._pending[key] = asyncio.get_running_loop().create_future()
+        return self._pending[key]
+
+    def untrack(self, tx_hash):
+        future = self._pending.pop(_hash_key(tx_hash), None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    async def wait_for(self, tx_hash, timeout):
+        """
+        Returns (receipt, block_seen_time, block_seen_ns) for a tracked hash: wall-clock
+        and perf_counter_ns time the block was first seen. Raises TimeoutError after timeout.
+        """
+        future = self.track(tx_hash)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Transaction {_hash_key(tx_hash)} not included in a block after {timeout} seconds")
+        finally:
+            # Resolved futures stay registered until their waiter collects them
+            self.untrack(tx_hash)
+
+    async def start(self):
+        self._last_block = await self.async_w3.eth.block_number
+        self.rpc_calls += 1
+        if isinstance(self.async_w3.provider, PersistentConnectionProvider):
+            await self.async_w3.eth.subscribe('newHeads')
+            self._task = asyncio.create_task(self._follow_new_heads())
+        else:
+            self._task = asyncio.create_task(self._poll_block_number())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    # --- Block Sources ---
+    async def _poll_block_number(self):
+        while True:
+            try:
+                latest_block = await self.async_w3.eth.block_number
+                self.rpc_calls += 1
+                await self._catch_up(latest_block)
+            except Exception as e:
+                print(f"⚠️ Receipt tracker: block poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _follow_new_heads(self):
+        async for message in self.async_w3.socket.process_subscriptions():
+            try:
+                head = message['result']
+                self.block_cache.observe(int(head['number']), head.get('timestamp')) # the head carries its timestamp
+                await self._catch_up(int(head['number']))
+            except Exception as e:
+                print(f"⚠️ Receipt tracker: newHeads processing failed: {e}")
+
+    async def _catch_up(self, latest_block):
+        """Processes every block after the last one seen, in order; a failed block is retried next time."""
+        while self._last_block < latest_block:
+            block_number = self._last_block + 1
+            header = self.block_cache.observe(block_number) # keeps an earlier first-seen time (e.g. from newHeads)
+            seen_time, seen_ns = header.seen_time, header.seen_ns
+            if self._pending:
+                await self._resolve_block(block_number, seen_time, seen_ns)
+            self._last_block = block_number
+            self.blocks_processed += 1
+
+    # --- Receipt Fetching ---
+    async def _resolve_block(self, block_number, seen_time, seen_ns):
+        for receipt in await self._fetch_block_receipts(block_number):
+            future = self._pending.get(_hash_key(receipt['transactionHash']))
+            if future is not None and not future.done():
+                future.set_result((receipt, seen_time, seen_ns))
+
+    async def _fetch_block_receipts(self, block_number):
+        if self._block_receipts_supported:
+            try:
+                receipts = await self.async_w3.eth.get_block_receipts(block_number)
+                self.rpc_calls += 1
+                return receipts
+            except Exception as e:
+                if _is_method_unsupported(e):
+                    print(f"⚠️ Receipt tracker: eth_getBlockReceipts unavailable ({e}); falling back to batched receipt requests.")
+                    self._block_receipts_supported = False
+                else: # a blip: batched requests for this block only
+                    print(f"⚠️ Receipt tracker: eth_getBlockReceipts failed for block {block_number} ({e}); using batched receipt requests for it.")
+
+        block = await self.async_w3.eth.get_block(block_number)
+        self.rpc_calls += 1
+        self.block_cache.observe(block_number, block['timestamp'])
+        tracked_hashes = [tx_hash for tx_hash in block['transactions'] if _hash_key(tx_hash) in self._pending]
+        if not tracked_hashes:
+            return []
+        async with self.async_w3.batch_requests() as batch:
+            for tx_hash in tracked_hashes:
+                batch.add(self.async_w3.eth.get_transaction_receipt(tx_hash))
+            receipts = await batch.async_execute()
+        self.rpc_calls += 1
+        return receipts
+
+
+@contextlib.asynccontextmanager
+async def block_receipt_tracking(async_w3, enabled=True, poll_interval=BLOCK_POLL_INTERVAL_SECONDS):
+    """Runs a BlockReceiptTracker for the duration of the block; yields None when disabled (per-tx polling)."""
+    if not enabled:
+        yield None
+        return
+    tracker = BlockReceiptTracker(async_w3, poll_interval)
+    await tracker.start()
+    try:
+        yield tracker
+    finally:
+        await tracker.stop()
+        print(f"Receipt tracker: {tracker.blocks_processed} block(s) followed with {tracker.rpc_calls} RPC call(s).")
@@ -0,0 +1,295 @@
+# lib/result_sink.py
+import atexit
+import csv
+import os
+import threading
+import time
+from decimal import Decimal
+
+# Columns of the results CSV, in the order the runner has always written them; CSV sinks default to these
+BASELINE_COLUMNS = [
+    'run_identifier', 'action', 'status', 'sender_address', 'nonce', 'tx_hash',
+    'block_number', 'gas_used', 'configured_gas_price_gwei', 'effective_gas_price_gwei',
+    'fee_paid_eth', 'confirmation_time_sec', 'contract_address', 'token_id_minted', 'token_id_transferred',
+    # L1 fee columns
+    'l1_fee_wei', 'l1_fee_eth', 'l1_gas_used', 'l1_gas_price_gwei', 'l1_fee_scalar'
+]
+
+# Columns recorded beyond the baseline; the columnar formats always write them, a CSV only when asked to
+EXTENDED_COLUMNS = [
+    'chain', 'block_timestamp', 'block_seen_time', 'l1_batch_number',
+    # Open-loop timing columns (sustained load test)
+    'intended_send_time', 'actual_send_time', 'send_lag_sec', 'latency_from_intended_sec',
+    # Load profile step columns (saturation search)
+    'load_step', 'load_step_target_tps',
+    # Multi-process load generator
+    'worker_index',
+    # Latency breakdown (seconds) and the perf_counter_ns stage stamps it is derived from
+    'build_sec', 'sign_sec', 'submit_rtt_sec', 'inclusion_sec', 'receipt_lag_sec',
+    # Inclusion and block arrival latency against the block timestamp
+    'inclusion_latency_sec', 'block_arrival_latency_sec',
+    'build_start_ns', 'sign_start_ns', 'submit_start_ns', 'submit_ack_ns', 'block_seen_ns', 'receipt_fetched_ns'
+]
+
+# Every result column, in column order
+RESULT_COLUMNS = BASELINE_COLUMNS + EXTENDED_COLUMNS
+
+# Column types for the columnar formats; anything not listed is float64
+_STRING_COLUMNS = {'chain', 'run_identifier', 'action', 'status', 'sender_address', 'tx_hash', 'contract_address', 'l1_fee_scalar'}
+_INTEGER_COLUMNS = {'nonce', 'block_number', 'block_timestamp', 'gas_used', 'token_id_minted', 'token_id_transferred',
+                    'l1_gas_used', 'l1_batch_number', 'load_step', 'worker_index',
+                    'build_start_ns', 'sign_start_ns', 'submit_start_ns', 'submit_ack_ns', 'block_seen_ns', 'receipt_fetched_ns'}
+# Exact amounts as decimal128(38, scale): wei, gwei and ETH
+DECIMAL_COLUMN_SCALES = {'l1_fee_wei': 0, 'configured_gas_price_gwei': 9, 'effective_gas_price_gwei': 9,
+                         'l1_gas_price_gwei': 9, 'fee_paid_eth': 18, 'l1_fee_eth': 18}
+
+SINK_FORMATS = {"csv": ".csv", "arrow": ".arrows", "parquet": ""} # parquet: a partition directory, see result_store
+DEFAULT_CHUNK_ROWS = 500
+DEFAULT_FSYNC_INTERVAL_SECONDS = 5.0
+
+
+def default_columns(sink_format):
+    """Baseline columns for CSV (existing consumers keep their schema), every column for the typed formats."""
+    return BASELINE_COLUMNS if sink_format == "csv" else RESULT_COLUMNS
+
+
+def _cell(column, value):
+    """Normalises one value for the declared column type (Decimal/HexBytes/hex strings from web3)."""
+    if value is None:
+        return None
+    if column in _STRING_COLUMNS:
+        return value.hex() if isinstance(value, (bytes, bytearray)) else str(value)
+    try:
+        if isinstance(value, str) and value.startswith('0x') and column not in _STRING_COLUMNS:
+            value = int(value, 16)
+        if column in _INTEGER_COLUMNS:
+            return int(value)
+        if column in DECIMAL_COLUMN_SCALES:
+            return value if isinstance(value, Decimal) else Decimal(str(value)) # str(): no binary float noise
+        return float(value)
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+
+
+def arrow_schema(columns):
+    """Typed Arrow schema for result columns (shared by the .arrows sink and the Parquet store)."""
+    import pyarrow as pa # optional dependency, only needed for the columnar formats
+    def _type(col):
+        if col in _STRING_COLUMNS: return pa.string()
+        if col in _INTEGER_COLUMNS: return pa.int64()
+        if col in DECIMAL_COLUMN_SCALES: return pa.decimal128(38, DECIMAL_COLUMN_SCALES[col])
+        return pa.float64()
+    return pa.schema([(col, _type(col)) for col in columns])
+
+
+def arrow_table(rows, schema):
+    """Builds a table from _cell-normalised rows (lists in schema column order)."""
+    import pyarrow as pa
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [row[i] for row in rows]
+        if pa.types.is_decimal(field.type): # quantize, or Arrow refuses values with more digits than the scale
+            quantum = Decimal(1).scaleb(-field.type.scale)
+            values = [None if v is None else v.quantize(quantum) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# --- Writers ---
+# resume_rows: keep that many rows of an existing file at path and append after
+# them; rows past it (from a phase a crash cut short) are dropped.
+def _truncate_csv(path, keep_rows):
+    with open(path, 'rb+') as f:
+        for _ in range(keep_rows + 1): # header + rows; no result column holds a newline
+            if not f.readline(): break
+        f.truncate(f.tell())
+
+
+class _CsvWriter:
+    def __init__(self, path, columns, resume_rows=None):
+        if resume_rows is not None and os.path.exists(path): _truncate_csv(path, resume_rows)
+        self.file = open(path, 'a' if resume_rows is not None else 'w', newline='')
+        self.writer = csv.writer(self.file)
+        if self.file.tell() == 0: self.writer.writerow(columns)
+
+    def write_rows(self, rows):
+        self.writer.writerows(['' if value is None else value for value in row] for row in rows)
+
+    def flush(self, fsync):
+        self.file.flush()
+        if fsync: os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class _ArrowStreamWriter:
+    """
+    Arrow IPC stream: one record batch per chunk. Unlike a single Parquet file, a
+    stream stays readable up to its last complete batch if the run dies mid-write.
+    """
+
+    def __init__(self, path, columns, resume_rows=None):
+        import pyarrow as pa
+        self.schema = arrow_schema(columns)
+        kept = read_arrow_stream(path, resume_rows).slice(0, resume_rows) if resume_rows is not None and os.path.exists(path) else None
+        self.file = open(path, 'wb') # a stream cannot be reopened for append; the kept rows are rewritten
+        self.writer = pa.ipc.new_stream(self.file, self.schema)
+        if kept is not None and kept.num_rows: self.writer.write_table(kept.cast(self.schema))
+
+    def write_rows(self, rows):
+        self.writer.write_table(arrow_table(rows, self.schema))
+
+    def flush(self, fsync):
+        self.file.flush()
+        if fsync: os.fsync(self.file.fileno())
+
+    def close(self):
+        self.writer.close()
+        self.file.close()
+
+
+def _parquet_store_writer(path, columns, resume_rows=None):
+    from .result_store import ParquetPartitionWriter # imports result_sink itself
+    return ParquetPartitionWriter(path, columns, resume_rows)
+
+
+_WRITERS = {"csv": _CsvWriter, "arrow": _ArrowStreamWriter, "parquet": _parquet_store_writer}
+
+
+# --- Sink ---
+class ResultSink:
+    """
+    Drop-in for the all_results list: append()/extend() buffer result dicts and
+    write them to disk in chunks of chunk_rows (or whenever fsync_interval_seconds
+    has passed), fsyncing at most once per interval. Memory stays bounded by the
+    chunk size; a crash loses at most the rows of the unflushed chunk.
+    observers are called with every appended result (e.g. a LiveLatencyRecorder).
+    columns defaults to default_columns(sink_format). extra_outputs are further
+    (path, sink_format) outputs written in step with the main one, each with every
+    column (e.g. the Parquet store next to the CSV). resume_rows continues existing
+    results after their first resume_rows rows (the results offset of a run checkpoint).
+    """
+
+    def __init__(self, path, sink_format="csv", columns=None, defaults=None,
+                 chunk_rows=DEFAULT_CHUNK_ROWS, fsync_interval_seconds=DEFAULT_FSYNC_INTERVAL_SECONDS, observers=None, resume_rows=None,
+                 extra_outputs=None):
+        self.extra_outputs = [tuple(output) for output in (extra_outputs or [])]
+        for output_format in [sink_format] + [output_format for _, output_format in self.extra_outputs]:
+            if output_format not in _WRITERS:
+                raise ValueError(f"Unknown result sink format: {output_format} (expected one of {', '.join(_WRITERS)})")
+        self.path = path
+        self.sink_format = sink_format
+        self.columns = list(columns or default_columns(sink_format))
+        self.defaults = dict(defaults or {})
+        self.chunk_rows = max(1, chunk_rows)
+        self.fsync_interval_seconds = fsync_interval_seconds
+        self.observers = list(observers or [])
+        self._outputs = [] # (columns, writer), the main output first
+        for output_path, output_format, output_columns in [(path, sink_format, self.columns)] + [(p, f, RESULT_COLUMNS) for p, f in self.extra_outputs]:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            self._outputs.append((output_columns, _WRITERS[output_format](output_path, output_columns, resume_rows=resume_rows)))
+        self._buffers = [[] for _ in self._outputs]
+        self._lock = threading.Lock() # results arrive from funding threads and engine callbacks
+        self._last_flush = time.monotonic()
+        self._last_fsync = time.monotonic()
+        self.rows_written = resume_rows or 0
+        self.rows_total = resume_rows or 0
+        self.closed = False
+        atexit.register(self.close) # Ctrl-C / exit() mid-run still writes the buffered chunk
+
+    def append(self, result):
+        with self._lock:
+            for (columns, _), buffer in zip(self._outputs, self._buffers):
+                buffer.append([_cell(col, result.get(col, self.defaults.get(col))) for col in columns])
+            self.rows_total += 1
+            if len(self._buffers[0]) >= self.chunk_rows or time.monotonic() - self._last_flush >= self.fsync_interval_seconds:
+                self._flush_locked()
+        for observer in self.observers:
+            observer(result)
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    def _flush_locked(self, force_fsync=False):
+        if self._buffers[0]:
+            for (_, writer), buffer in zip(self._outputs, self._buffers):
+                writer.write_rows(buffer)
+            self.rows_written += len(self._buffers[0])
+            self._buffers = [[] for _ in self._outputs]
+        now = time.monotonic()
+        do_fsync = force_fsync or now - self._last_fsync >= self.fsync_interval_seconds
+        for _, writer in self._outputs:
+            writer.flush(do_fsync)
+        self._last_flush = now
+        if do_fsync: self._last_fsync = now
+
+    def flush(self):
+        """Writes buffered rows and fsyncs now."""
+        with self._lock:
+            if not self.closed: self._flush_locked(force_fsync=True)
+
+    def close(self):
+        with self._lock:
+            if self.closed: return
+            self._flush_locked(force_fsync=True)
+            for _, writer in self._outputs:
+                writer.close()
+            self.closed = True
+
+    def __len__(self):
+        return self.rows_total
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def result_sink_path(results_dir, run_name, sink_format="csv", timestamp=None, chain=None):
+    """Results file for a run; for "parquet" the run's chain=/run= directory in the partitioned store."""
+    timestamp = timestamp or time.strftime("%Y%m%d_%H%M%S")
+    if sink_format == "parquet":
+        from .result_store import run_partition_path, RESULT_STORE_SUBDIR
+        return run_partition_path(os.path.join(results_dir, RESULT_STORE_SUBDIR), chain or "unknown", f"{run_name}_{timestamp}")
+    return os.path.join(results_dir, f"benchmark_results_{run_name}_{timestamp}{SINK_FORMATS[sink_format]}")
+
+
+def arrow_to_pandas(table, decimals_as_float=True):
+    """Typed table -> DataFrame; decimal amounts become float64 unless exact Decimal objects are wanted."""
+    import pyarrow as pa
+    if decimals_as_float:
+        fields = [pa.field(f.name, pa.float64()) if pa.types.is_decimal(f.type) else f for f in table.schema]
+        table = table.cast(pa.schema(fields))
+    return table.to_pandas()
+
+
+def read_arrow_stream(path, nrows=None):
+    """Complete record batches of an Arrow stream (at least nrows rows if given) as a table."""
+    import pyarrow as pa
+    batches = []
+    with open(path, 'rb') as f:
+        reader = pa.ipc.open_stream(f)
+        try:
+            for batch in reader:
+                batches.append(batch)
+                if nrows is not None and sum(len(b) for b in batches) >= nrows: break
+        except (pa.ArrowInvalid, OSError):
+            pass # truncated tail after a crash; keep the complete batches
+        return pa.Table.from_batches(batches, schema=reader.schema)
+
+
+def load_results(path, columns=None, nrows=None, decimals_as_float=True):
+    """Reads a sink output (CSV, Arrow stream or Parquet run partition; complete or cut short by a crash) into a DataFrame."""
+    import pandas as pd
+    if os.path.isdir(path):
+        from .result_store import load_run_partition
+        df = load_run_partition(path, columns, decimals_as_float)
+        return df.head(nrows) if nrows is not None else df
+    if path.endswith(SINK_FORMATS["arrow"]):
+        table = read_arrow_stream(path, nrows)
+        df = arrow_to_pandas(table.select(columns) if columns else table, decimals_as_float)
+        return df.head(nrows) if nrows is not None else df
+    return pd.read_csv(path, usecols=columns, nrows=nrows)
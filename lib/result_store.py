@@ -0,0 +1,144 @@
+# lib/result_store.py
+import os
+import re
+
+from .result_sink import RESULT_COLUMNS, arrow_schema, arrow_table, arrow_to_pandas
+
+# Typed Parquet store shared by all runs:
+#   results/store/chain=<chain>/run=<run>_<timestamp>/action=<action>/part-00000.parquet
+# chain/run/action live only in the directory names (hive partitioning), so the
+# loader can skip whole chains, runs or actions without opening their files.
+RESULT_STORE_SUBDIR = "store"
+DEFAULT_RESULT_STORE_DIR = os.path.join("results", RESULT_STORE_SUBDIR)
+PARTITION_COLUMNS = ['chain', 'run', 'action']
+PARQUET_COMPRESSION = "zstd"
+
+
+def _partition_value(value):
+    # Keep directory names valid and unambiguous (no separators or '=')
+    return re.sub(r'[\\/=\s]+', '_', str(value)) or '_'
+
+
+def run_partition_path(store_dir, chain, run):
+    return os.path.join(store_dir, f"chain={_partition_value(chain)}", f"run={_partition_value(run)}")
+
+
+def store_schema():
+    """Data columns plus the partition columns, as the loader sees them."""
+    import pyarrow as pa
+    data_schema = arrow_schema([col for col in RESULT_COLUMNS if col not in PARTITION_COLUMNS])
+    return pa.schema([pa.field(col, pa.string()) for col in PARTITION_COLUMNS] + list(data_schema))
+
+
+# --- Writer ---
+class ParquetPartitionWriter:
+    """
+    Result sink writer for one run: each chunk is split by action and written as
+    complete Parquet files under <run dir>/action=<action>/, so a crash leaves every
+    earlier chunk readable. Used via ResultSink(..., sink_format="parquet").
+    With resume_rows, parts past the first resume_rows rows are deleted and
+    numbering continues after the kept ones.
+    """
+
+    def __init__(self, run_dir, columns, resume_rows=None):
+        import pyarrow.parquet as pq
+        self.pq = pq
+        self.run_dir = run_dir
+        self.columns = list(columns)
+        self.data_columns = [col for col in self.columns if col not in PARTITION_COLUMNS]
+        self.schema = arrow_schema(self.data_columns)
+        self._data_index = [self.columns.index(col) for col in self.data_columns]
+        self._action_index = self.columns.index('action')
+        self._part_number = 0
+        self._unsynced_paths = []
+        os.makedirs(run_dir, exist_ok=True)
+        if resume_rows is not None: self._part_number = self._truncate_parts(resume_rows)
+
+    def _truncate_parts(self, keep_rows):
+        # A chunk is one part number across action directories; chunks are kept whole, in write order
+        parts = {}
+        for action_dir in os.listdir(self.run_dir):
+            if not action_dir.startswith("action="): continue
+            for name in os.listdir(os.path.join(self.run_dir, action_dir)):
+                match = re.fullmatch(r'part-(\d+)\.parquet', name)
+                if match: parts.setdefault(int(match.group(1)), []).append(os.path.join(self.run_dir, action_dir, name))
+        kept_rows, next_part = 0, 0
+        for number in sorted(parts):
+            rows = sum(self.pq.read_metadata(path).num_rows for path in parts[number])
+            if kept_rows + rows > keep_rows:
+                for path in (path for later in sorted(parts) if later >= number for path in parts[later]): os.remove(path)
+                break
+            kept_rows += rows; next_part = number + 1
+        return next_part
+
+    def write_rows(self, rows):
+        rows_by_action = {}
+        for row in rows:
+            rows_by_action.setdefault(row[self._action_index] or 'unknown', []).append([row[i] for i in self._data_index])
+        for action, action_rows in rows_by_action.items():
+            action_dir = os.path.join(self.run_dir, f"action={_partition_value(action)}")
+            os.makedirs(action_dir, exist_ok=True)
+            path = os.path.join(action_dir, f"part-{self._part_number:05d}.parquet")
+            self.pq.write_table(arrow_table(action_rows, self.schema), path, compression=PARQUET_COMPRESSION)
+            self._unsynced_paths.append(path)
+        self._part_number += 1
+
+    def flush(self, fsync):
+        if not fsync: return # every part file is complete once written
+        for path in self._unsynced_paths:
+            with open(path, 'rb') as f: os.fsync(f.fileno())
+        self._unsynced_paths = []
+
+    def close(self):
+        self.flush(True)
+
+
+# --- Loader ---
+def _dataset(store_dir):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    partitioning = ds.partitioning(pa.schema([pa.field(col, pa.string()) for col in PARTITION_COLUMNS]), flavor="hive")
+    return ds.dataset(store_dir, format="parquet", partitioning=partitioning, schema=store_schema())
+
+
+def load_store(store_dir=DEFAULT_RESULT_STORE_DIR, columns=None, chains=None, runs=None, actions=None, where=None,
+               decimals_as_float=True):
+    """
+    Reads results across every run in the store into a DataFrame. Only the given
+    columns are read; chains/runs/actions prune partition directories, and `where`
+    (a pyarrow.dataset expression, e.g. ds.field('status') == 'Success') is pushed
+    down to Parquet row-group statistics.
+    """
+    import pyarrow.dataset as ds
+    dataset = _dataset(store_dir)
+    filters = [ds.field(col).isin(list(values)) for col, values in (('chain', chains), ('run', runs), ('action', actions)) if values]
+    if where is not None:
+        filters.append(where)
+    expression = None
+    for f in filters:
+        expression = f if expression is None else expression & f
+    if columns is not None:
+        columns = [col for col in columns if col in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=expression)
+    df = arrow_to_pandas(table, decimals_as_float)
+    return df[[col for col in RESULT_COLUMNS + ['run'] if col in df.columns]]
+
+
+def list_runs(store_dir=DEFAULT_RESULT_STORE_DIR):
+    """[(chain, run)] present in the store, from the directory layout alone."""
+    runs = []
+    if not os.path.isdir(store_dir): return runs
+    for chain_dir in sorted(os.listdir(store_dir)):
+        if not chain_dir.startswith("chain="): continue
+        for run_dir in sorted(os.listdir(os.path.join(store_dir, chain_dir))):
+            if run_dir.startswith("run="): runs.append((chain_dir[len("chain="):], run_dir[len("run="):]))
+    return runs
+
+
+def load_run_partition(run_dir, columns=None, decimals_as_float=True):
+    """Reads one run's directory (as returned by result_sink_path for "parquet")."""
+    run_dir = os.path.normpath(run_dir)
+    chain_dir, run_part = os.path.split(run_dir)
+    store_dir, chain_part = os.path.split(chain_dir)
+    return load_store(store_dir, columns, chains=[chain_part.split('=', 1)[1]], runs=[run_part.split('=', 1)[1]],
+                      decimals_as_float=decimals_as_float)
@@ -0,0 +1,101 @@
+# lib/rpc_batching.py
+import threading
+from web3 import HTTPProvider
+
+# --- Batching Defaults ---
+DEFAULT_BATCH_WINDOW_SECONDS = 0.002
+DEFAULT_MAX_BATCH_SIZE = 50 # Well below common node limits (geth: 1000 per batch)
+
+
+class _PendingCall:
+    __slots__ = ('method', 'params', 'response', 'error', 'done')
+
+    def __init__(self, method, params):
+        self.method = method
+        self.params = params
+        self.response = None
+        self.error = None
+        self.done = threading.Event()
+
+
+# --- Batching Provider ---
+class BatchingHTTPProvider(HTTPProvider):
+    """
+    Drop-in HTTPProvider that coalesces concurrent requests (e.g. from the
+    funding fan-out's thread pool) into JSON-RPC batch arrays. The first caller
+    of a window waits up to batch_window_seconds, or until max_batch_size calls
+    are queued, then sends everything queued as one HTTP request; the other
+    callers block until their entry of the batch response arrives. A call made
+    while no other call is in flight skips the window and goes out as a plain
+    request, so sequential code (and a lone eth_sendRawTransaction) is not delayed.
+    """
+
+    def __init__(self, endpoint_uri=None, batch_window_seconds=DEFAULT_BATCH_WINDOW_SECONDS,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch_size = max_batch_size
+        self._queue_lock = threading.Lock()
+        self._queue = []
+        self._batch_full = threading.Event()
+        self._calls_in_flight = 0 # make_request calls not yet returned, queued or being sent
+        self.http_requests_sent = 0
+        self.calls_made = 0
+
+    def make_request(self, method, params):
+        call = _PendingCall(method, params)
+        with self._queue_lock:
+            self._queue.append(call)
+            self._calls_in_flight += 1
+            is_leader = len(self._queue) == 1
+            is_alone = self._calls_in_flight == 1 # nothing else in flight to batch with
+            if len(self._queue) >= self.max_batch_size:
+                self._batch_full.set()
+
+        try:
+            if is_leader:
+                if not is_alone:
+                    self._batch_full.wait(self.batch_window_seconds)
+                with self._queue_lock:
+                    batch, self._queue = self._queue, []
+                    self._batch_full.clear()
+                for start in range(0, len(batch), self.max_batch_size):
+                    self._send(batch[start:start + self.max_batch_size])
+            else:
+                call.done.wait()
+        finally:
+            with self._queue_lock:
+                self._calls_in_flight -= 1
+
+        if call.error is not None:
+            raise call.error
+        return call.response
+
+    def _send(self, calls):
+        try:
+            if len(calls) == 1:
+                calls[0].response = super().make_request(calls[0].method, calls[0].params)
+            else:
+                responses = self.make_batch_request([(call.method, call.params) for call in calls])
+                if not isinstance(responses, list):
+                    # The node rejected the whole batch with a single error object
+                    responses = [responses] * len(calls)
+                for call, response in zip(calls, responses):
+                    call.response = response
+        except Exception as e:
+            for call in calls:
+                call.error = e
+        finally:
+            with self._queue_lock:
+                self.http_requests_sent += 1
+                self.calls_made += len(calls)
+            for call in calls:
+                call.done.set()
+
+    def batching_stats(self):
+        """Calls made vs HTTP requests actually sent (calls per request > 1 means batching is paying off)."""
+        return {
+            'calls_made': self.calls_made,
+            'http_requests_sent': self.http_requests_sent,
+            'calls_per_request': self.calls_made / self.http_requests_sent if self.http_requests_sent else 0.0,
+        }
@@ -0,0 +1,85 @@
+# lib/sender_pool.py
+import itertools
+import os
+import threading
+from eth_account import Account
+from web3 import Web3
+
+# HD derivation is flagged "unaudited" by eth_account; it is only used here to
+# derive throwaway benchmark accounts from a dev mnemonic.
+Account.enable_unaudited_hdwallet_features()
+
+# Standard Ethereum BIP-44 path, same as Hardhat/Anvil dev accounts
+DEFAULT_DERIVATION_PATH = "m/44'/60'/0'/0/{index}"
+# .env names used when a config entry does not name its own
+DEFAULT_PRIVATE_KEY_ENV = "SENDER_PRIVATE_KEY_1"
+DEFAULT_MNEMONIC_ENV = "SENDER_MNEMONIC"
+
+
+# --- Sender Pool ---
+class SenderPool:
+    """
+    A fixed set of sender accounts that load is spread across. Each account has
+    its own nonce stream (see nonce_manager), so throughput is no longer bound
+    by a single account's nonce sequence.
+    """
+
+    def __init__(self, private_keys):
+        if not private_keys:
+            raise ValueError("SenderPool needs at least one private key.")
+        self.accounts = [Account.from_key(pk) for pk in private_keys]
+        self._cycle = itertools.cycle(range(len(self.accounts)))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_mnemonic(cls, mnemonic, count, start_index=0, path_template=DEFAULT_DERIVATION_PATH):
+        """Derives `count` accounts from one mnemonic along path_template."""
+        private_keys = []
+        for index in range(start_index, start_index + count):
+            account = Account.from_mnemonic(mnemonic, account_path=path_template.format(index=index))
+            private_keys.append(Web3.to_hex(account.key))
+        return cls(private_keys)
+
+    @classmethod
+    def from_env(cls, mnemonic_env_var, fallback_pk, count):
+        """Uses the mnemonic in mnemonic_env_var if set, otherwise a single-account pool of fallback_pk."""
+        mnemonic = os.getenv(mnemonic_env_var)
+        if mnemonic and count > 0:
+            return cls.from_mnemonic(mnemonic, count)
+        return cls([fallback_pk])
+
+    @classmethod
+    def from_config(cls, l2_config, count):
+        """Pool from the .env keys a config entry names (private_key_env, mnemonic_env)."""
+        private_key_env = l2_config.get("private_key_env", DEFAULT_PRIVATE_KEY_ENV)
+        fallback_pk = os.getenv(private_key_env)
+        if not fallback_pk:
+            raise ValueError(f"{private_key_env} not found in .env file.")
+        return cls.from_env(l2_config.get("mnemonic_env", DEFAULT_MNEMONIC_ENV), fallback_pk, count)
+
+    def __len__(self):
+        return len(self.accounts)
+
+    @property
+    def addresses(self):
+        return [account.address for account in self.accounts]
+
+    @property
+    def private_keys(self):
+        return [Web3.to_hex(account.key) for account in self.accounts]
+
+    def next_key(self):
+        """Round-robin: returns the private key of the next account in the pool (thread-safe)."""
+        with self._lock:
+            index = next(self._cycle)
+        return Web3.to_hex(self.accounts[index].key)
+
+    def key_for(self, work_index):
+        """Sharding: work item `work_index` always maps to the same account."""
+        return Web3.to_hex(self.accounts[work_index % len(self.accounts)].key)
+
+    def shard(self, num_shards):
+        """Splits the pool into up to num_shards disjoint sub-pools (for parallel workers)."""
+        num_shards = max(1, min(num_shards, len(self.accounts)))
+        keys = self.private_keys
+        return [SenderPool(keys[i::num_shards]) for i in range(num_shards)]
@@ -1,114 +1,83 @@
 # lib/transaction_utils.py
 from web3 import Web3
-import time
-from web3.logs import DISCARD 
 
 # Assuming contract_loader.py is in the same 'lib' directory
-from .contract_loader import load_contract_artifact
+from .contract_loader import get_contract, get_contract_artifact, resolve_lazy_artifact_constant
+from .nonce_manager import next_nonce, invalidate_nonce
+# Signing, sending, receipts and fee data go through the adapter for the connected chain type
+from .chain_adapters import chain_adapter_for, extract_l1_fee_data
+from .tx_record import TxRecord, start_stages
 
-# --- Load Contract Artifacts (Only for contracts not passed by filename) ---
-# AMM Pool Contract (from the article's simpleCPMM repo)
-# These are loaded once here because their filenames are fixed for these functions.
-# For TokenA/TokenB, we'll load them dynamically in their respective functions
-# using the passed filename.
-BASIC_POOL_ABI, BASIC_POOL_BYTECODE = load_contract_artifact("BasicPool.sol")
+# --- Contract Artifacts ---
+# BASIC_POOL_ABI/BYTECODE (AMM pool from the article's simpleCPMM repo) and
+# MY_NFT_ABI/BYTECODE are resolved lazily on first access; the helpers below get
+# their contract objects from the registry. TokenA/TokenB are loaded by filename.
+def __getattr__(name):
+    return resolve_lazy_artifact_constant(__name__, name)
 
-# Your existing NFT contract details (if you still want to include NFT tests)
-MY_NFT_ABI, MY_NFT_BYTECODE = None, None # Default to None
-try:
-    # Assuming MyNFT.sol is also managed by Hardhat and in the same artifact structure
-    MY_NFT_ABI, MY_NFT_BYTECODE = load_contract_artifact("MyNFT.sol") 
-except Exception as e: # Catch a broader exception if contract_loader itself fails or file not found
-    print(f"Warning: NFT details for MyNFT.sol not loaded via contract_loader. NFT tests might fail. Error: {e}")
 
-
-# --- Helper function to extract L1 fee data ---
-def extract_l1_fee_data(w3_instance, tx_receipt):
-    """Extract L1 fee components from transaction receipt"""
-    l1_fee_component_wei = tx_receipt.get('l1Fee')
-    l1_gas_used_on_l1 = tx_receipt.get('l1GasUsed')
-    l1_gas_price_on_l1 = tx_receipt.get('l1GasPrice')
-    l1_fee_scalar = tx_receipt.get('l1FeeScalar')
-    
-    return {
-        'l1_fee_wei': l1_fee_component_wei if l1_fee_component_wei is not None else None,
-        'l1_fee_eth': w3_instance.from_wei(l1_fee_component_wei, 'ether') if l1_fee_component_wei is not None else None,
-        'l1_gas_used': l1_gas_used_on_l1 if l1_gas_used_on_l1 is not None else None,
-        'l1_gas_price_gwei': w3_instance.from_wei(l1_gas_price_on_l1, 'gwei') if l1_gas_price_on_l1 is not None else None,
-        'l1_fee_scalar': l1_fee_scalar if l1_fee_scalar is not None else None
-    }
+def _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, action,
+                    sender_address, nonce, tx_hash, status='Success', **fields):
+    """Result record of a mined tx: raw receipt fields and stage stamps only, converted to gwei/ETH/second columns at export."""
+    record = TxRecord(run_identifier, action, status, sender_address, nonce, tx_hash.hex(), **stages, **fields)
+    return chain_adapter.record_receipt(record, tx_receipt, gas_price_wei)
 
 
 # --- Existing P2P ETH Transfer Function ---
 def execute_p2p_transfer(w3_instance, sender_pk, recipient_address, amount_eth, gas_price_wei, run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     try:
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
         checksum_recipient_address = Web3.to_checksum_address(recipient_address)
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
+        nonce_val = next_nonce(w3_instance, sender_address_val)
         tx_details = {'to': checksum_recipient_address, 'value': w3_instance.to_wei(amount_eth, 'ether'), 'gas': 21000, 'gasPrice': gas_price_wei, 'nonce': nonce_val, 'chainId': w3_instance.eth.chain_id}
-        signed_tx = w3_instance.eth.account.sign_transaction(tx_details, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180); end_time = time.time()
-        confirmation_time = end_time - start_time; effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': 'p2p_eth_transfer', 'sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success' if tx_receipt.status == 1 else 'Failed','block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, tx_details, sender_pk, stages=stages)
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=180, stages=stages)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, 'p2p_eth_transfer', sender_address_val, nonce_val, tx_hash,
+                                 status='Success' if tx_receipt.status == 1 else 'Failed')
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'p2p_eth_transfer','sender_address': sender_address_val, 'nonce': nonce_val,'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, 'p2p_eth_transfer', 'Error', sender_address_val, nonce_val, error_message=str(e), **stages)
 
 # --- ERC20 Deployment Function (Generic for TokenA/TokenB) ---
 def deploy_simple_erc20(w3_instance, sender_pk, gas_price_wei, 
                         token_sol_filename, # Accepts .sol filename
                         initial_owner_address, token_log_name, # token_log_name is for logging
                         run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     try:
-        token_abi, token_bytecode = load_contract_artifact(token_sol_filename) # Load here
-
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
-        Contract = w3_instance.eth.contract(abi=token_abi, bytecode=token_bytecode)
-        constructor_tx_data = Contract.constructor(Web3.to_checksum_address(initial_owner_address)).build_transaction({
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        Contract = get_contract(w3_instance, token_sol_filename)
+        constructor_tx_data = chain_adapter.build_deploy_transaction(Contract, (Web3.to_checksum_address(initial_owner_address),), {
             'from': sender_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': 2000000 
         })
-        signed_tx = w3_instance.eth.account.sign_transaction(constructor_tx_data, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, constructor_tx_data, sender_pk, stages=stages)
         print(f"Deploying {token_log_name} ({token_sol_filename}) contract... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=300); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=300, stages=stages)
         if tx_receipt.status != 1: raise Exception(f"{token_log_name} contract deployment failed.")
         contract_address = tx_receipt.contractAddress
         print(f"{token_log_name} Contract deployed at: {contract_address}")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': f'deploy_{token_log_name.lower()}', 'sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': contract_address,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, f'deploy_{token_log_name.lower()}', sender_address_val, nonce_val, tx_hash, contract_address=contract_address)
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': f'deploy_{token_log_name.lower()}', 'sender_address': sender_address_val, 'nonce': nonce_val, 'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, f'deploy_{token_log_name.lower()}', 'Error', sender_address_val, nonce_val, error_message=str(e), **stages)
 
 # --- ERC20 Mint Function (for TokenA/TokenB from simpleCPMM) ---
 def execute_simple_erc20_mint(w3_instance, sender_pk, gas_price_wei, 
                               token_contract_address, token_sol_filename, # Accepts .sol filename
                               recipient_address, amount_to_mint, 
                               run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     try:
-        token_abi, _ = load_contract_artifact(token_sol_filename) # Load ABI, bytecode not needed for interaction
-
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
-        token_contract = w3_instance.eth.contract(address=Web3.to_checksum_address(token_contract_address), abi=token_abi)
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        token_contract = get_contract(w3_instance, token_sol_filename, token_contract_address)
         
         mint_tx_data = token_contract.functions.mint(
             Web3.to_checksum_address(recipient_address),
@@ -116,36 +85,27 @@ def execute_simple_erc20_mint(w3_instance, sender_pk, gas_price_wei,
         ).build_transaction({
             'from': sender_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': 150000 
         })
-        signed_tx = w3_instance.eth.account.sign_transaction(mint_tx_data, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, mint_tx_data, sender_pk, stages=stages)
         print(f"Minting tokens on {token_contract_address} to {recipient_address}... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=180, stages=stages)
         if tx_receipt.status != 1: raise Exception("Token minting failed.")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': 'erc20_mint', 'sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': token_contract_address,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, 'erc20_mint', sender_address_val, nonce_val, tx_hash, contract_address=token_contract_address)
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'erc20_mint','sender_address': sender_address_val, 'nonce': nonce_val, 'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, 'erc20_mint', 'Error', sender_address_val, nonce_val, error_message=str(e), **stages)
 
 # --- ERC20 Approve Function ---
 def execute_approve_erc20(w3_instance, owner_pk, gas_price_wei,
                           token_contract_address, token_sol_filename, # Accepts .sol filename
                           spender_address, amount_to_approve, 
                           run_identifier="N/A"):
-    owner_address_val = 'N/A'; nonce_val = 'N/A'
+    owner_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     try:
-        token_abi, _ = load_contract_artifact(token_sol_filename) # Load ABI
-
+        chain_adapter = chain_adapter_for(w3_instance)
         owner_account = w3_instance.eth.account.from_key(owner_pk); owner_address_val = owner_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(owner_address_val)
-        token_contract = w3_instance.eth.contract(address=Web3.to_checksum_address(token_contract_address), abi=token_abi)
+        nonce_val = next_nonce(w3_instance, owner_address_val)
+        token_contract = get_contract(w3_instance, token_sol_filename, token_contract_address)
         
         approve_tx_data = token_contract.functions.approve(
             Web3.to_checksum_address(spender_address),
@@ -153,55 +113,63 @@ def execute_approve_erc20(w3_instance, owner_pk, gas_price_wei,
         ).build_transaction({
             'from': owner_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': 100000 
         })
-        signed_tx = w3_instance.eth.account.sign_transaction(approve_tx_data, owner_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, approve_tx_data, owner_pk, stages=stages)
         print(f"Approving {spender_address} for tokens on {token_contract_address}... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=180, stages=stages)
         if tx_receipt.status != 1: raise Exception("ERC20 approve failed.")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': 'erc20_approve', 'sender_address': owner_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': token_contract_address,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, 'erc20_approve', owner_address_val, nonce_val, tx_hash, contract_address=token_contract_address)
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'erc20_approve','sender_address': owner_address_val, 'nonce': nonce_val, 'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, owner_address_val)
+        return TxRecord(run_identifier, 'erc20_approve', 'Error', owner_address_val, nonce_val, error_message=str(e), **stages)
 
 
+# --- Generic Contract Deployment (any artifact, any constructor) ---
+def deploy_contract(w3_instance, sender_pk, gas_price_wei, contract_sol_filename, constructor_args, action,
+                    contract_log_name=None, gas=3000000, run_identifier="N/A"):
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; contract_log_name = contract_log_name or contract_sol_filename; stages = start_stages()
+    try:
+        chain_adapter = chain_adapter_for(w3_instance)
+        sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        Contract = get_contract(w3_instance, contract_sol_filename)
+        constructor_tx_data = chain_adapter.build_deploy_transaction(Contract, tuple(constructor_args), {
+            'from': sender_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': gas
+        })
+        tx_hash = chain_adapter.sign_and_send(w3_instance, constructor_tx_data, sender_pk, stages=stages)
+        print(f"Deploying {contract_log_name} contract... Tx Hash: {tx_hash.hex()}")
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=300, stages=stages)
+        if tx_receipt.status != 1: raise Exception(f"{contract_log_name} contract deployment failed.")
+        contract_address = tx_receipt.contractAddress
+        print(f"{contract_log_name} Contract deployed at: {contract_address}")
+        return _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, action, sender_address_val, nonce_val, tx_hash, contract_address=contract_address)
+    except Exception as e:
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, action, 'Error', sender_address_val, nonce_val, error_message=str(e), **stages)
+
 # --- AMM Pool (BasicPool.sol) Deployment ---
 def deploy_amm_pool_contract(w3_instance, sender_pk, gas_price_wei, 
                              run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     try:
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
-        Contract = w3_instance.eth.contract(abi=BASIC_POOL_ABI, bytecode=BASIC_POOL_BYTECODE)
-        constructor_tx_data = Contract.constructor().build_transaction({
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        Contract = get_contract(w3_instance, "BasicPool.sol")
+        constructor_tx_data = chain_adapter.build_deploy_transaction(Contract, (), {
             'from': sender_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': 4000000 
         })
-        signed_tx = w3_instance.eth.account.sign_transaction(constructor_tx_data, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, constructor_tx_data, sender_pk, stages=stages)
         print(f"Deploying AMM Pool contract... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=300); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=300, stages=stages)
         if tx_receipt.status != 1: raise Exception("AMM Pool contract deployment failed.")
         contract_address = tx_receipt.contractAddress
         print(f"AMM Pool Contract deployed at: {contract_address}")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': 'deploy_amm_pool', 'sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': contract_address,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, 'deploy_amm_pool', sender_address_val, nonce_val, tx_hash, contract_address=contract_address)
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'deploy_amm_pool','sender_address': sender_address_val, 'nonce': nonce_val, 'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, 'deploy_amm_pool', 'Error', sender_address_val, nonce_val, error_message=str(e), **stages)
 
 # --- AMM Pool: Set Tokens ---
 def execute_pool_set_tokens(w3_instance, owner_pk, gas_price_wei,
@@ -209,69 +177,63 @@ def execute_pool_set_tokens(w3_instance, owner_pk, gas_price_wei,
                             run_identifier="N/A"):
     owner_address_val = 'N/A'; nonce_val = 'N/A'
     try:
-        # BASIC_POOL_ABI is loaded at the top
+        # BasicPool contract objects come from the shared contract registry
+        chain_adapter = chain_adapter_for(w3_instance)
         owner_account = w3_instance.eth.account.from_key(owner_pk); owner_address_val = owner_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(owner_address_val)
-        pool_contract = w3_instance.eth.contract(address=Web3.to_checksum_address(pool_contract_address), abi=BASIC_POOL_ABI)
+        nonce_val = next_nonce(w3_instance, owner_address_val)
+        pool_contract = get_contract(w3_instance, "BasicPool.sol", pool_contract_address)
         
         tx_set_a_data = pool_contract.functions.setTokenA(Web3.to_checksum_address(token_a_address)).build_transaction({
             'from': owner_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': 100000
         })
-        signed_tx_a = w3_instance.eth.account.sign_transaction(tx_set_a_data, owner_pk)
-        tx_hash_a = w3_instance.eth.send_raw_transaction(signed_tx_a.raw_transaction)
+        tx_hash_a = chain_adapter.sign_and_send(w3_instance, tx_set_a_data, owner_pk)
         print(f"Setting TokenA on pool {pool_contract_address}... Tx Hash: {tx_hash_a.hex()}")
-        tx_receipt_a = w3_instance.eth.wait_for_transaction_receipt(tx_hash_a, timeout=180)
+        tx_receipt_a = chain_adapter.wait_for_receipt(w3_instance, tx_hash_a, timeout=180)
         if tx_receipt_a.status != 1: raise Exception("Pool setTokenA failed.")
         
-        nonce_val += 1 
+        first_nonce_val = nonce_val
+        nonce_val = next_nonce(w3_instance, owner_address_val)
         tx_set_b_data = pool_contract.functions.setTokenB(Web3.to_checksum_address(token_b_address)).build_transaction({
             'from': owner_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': 100000
         })
-        signed_tx_b = w3_instance.eth.account.sign_transaction(tx_set_b_data, owner_pk)
-        tx_hash_b = w3_instance.eth.send_raw_transaction(signed_tx_b.raw_transaction)
+        tx_hash_b = chain_adapter.sign_and_send(w3_instance, tx_set_b_data, owner_pk)
         print(f"Setting TokenB on pool {pool_contract_address}... Tx Hash: {tx_hash_b.hex()}")
-        tx_receipt_b = w3_instance.eth.wait_for_transaction_receipt(tx_hash_b, timeout=180)
+        tx_receipt_b = chain_adapter.wait_for_receipt(w3_instance, tx_hash_b, timeout=180)
         if tx_receipt_b.status != 1: raise Exception("Pool setTokenB failed.")
         
         print(f"Tokens set successfully for pool {pool_contract_address}")
-        return {'run_identifier': run_identifier, 'action': 'pool_set_tokens', 'status': 'Success', 'contract_address': pool_contract_address, 'sender_address': owner_address_val, 'nonce': nonce_val-1} # Report initial nonce for the sequence
+        return TxRecord(run_identifier, 'pool_set_tokens', 'Success', owner_address_val, first_nonce_val, contract_address=pool_contract_address) # Report initial nonce for the sequence
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'pool_set_tokens', 'sender_address': owner_address_val, 'nonce': nonce_val, 'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, owner_address_val)
+        return TxRecord(run_identifier, 'pool_set_tokens', 'Error', owner_address_val, nonce_val, error_message=str(e))
 
 # --- AMM Pool: Add Liquidity ---
 def execute_add_liquidity(w3_instance, sender_pk, gas_price_wei,
                           pool_contract_address,
                           amount_a_to_add, amount_b_to_add, 
                           run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     try:
-        # BASIC_POOL_ABI is loaded at the top
+        # BasicPool contract objects come from the shared contract registry
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
-        pool_contract = w3_instance.eth.contract(address=Web3.to_checksum_address(pool_contract_address), abi=BASIC_POOL_ABI)
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        pool_contract = get_contract(w3_instance, "BasicPool.sol", pool_contract_address)
         
         add_liquidity_tx_data = pool_contract.functions.addLiquidity(
             amount_a_to_add, amount_b_to_add
         ).build_transaction({
             'from': sender_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': 500000 
         })
-        signed_tx = w3_instance.eth.account.sign_transaction(add_liquidity_tx_data, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, add_liquidity_tx_data, sender_pk, stages=stages)
         print(f"Adding liquidity to pool {pool_contract_address}... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=180, stages=stages)
         if tx_receipt.status != 1: raise Exception("Add liquidity failed.")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': 'amm_add_liquidity', 'sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': pool_contract_address,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, 'amm_add_liquidity', sender_address_val, nonce_val, tx_hash, contract_address=pool_contract_address)
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'amm_add_liquidity','sender_address': sender_address_val, 'nonce': nonce_val, 'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, 'amm_add_liquidity', 'Error', sender_address_val, nonce_val, error_message=str(e), **stages)
 
 # --- AMM Pool: Swap Tokens ---
 def execute_amm_swap(w3_instance, sender_pk, gas_price_wei,
@@ -280,13 +242,14 @@ def execute_amm_swap(w3_instance, sender_pk, gas_price_wei,
                      token_out_address_passed, min_amount_out, 
                      recipient_address,
                      run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     action_name = 'amm_swap_generic_error' # Default action name
     try:
-        # BASIC_POOL_ABI is loaded at the top
+        # BasicPool contract objects come from the shared contract registry
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
-        pool_contract = w3_instance.eth.contract(address=Web3.to_checksum_address(pool_contract_address), abi=BASIC_POOL_ABI)
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        pool_contract = get_contract(w3_instance, "BasicPool.sol", pool_contract_address)
 
         pool_token_a_addr = Web3.to_checksum_address(pool_contract.functions.tokenA().call())
         # pool_token_b_addr = Web3.to_checksum_address(pool_contract.functions.tokenB().call()) # Not strictly needed here
@@ -304,108 +267,78 @@ def execute_amm_swap(w3_instance, sender_pk, gas_price_wei,
         swap_tx_data = swap_function.build_transaction({
             'from': sender_address_val, 'nonce': nonce_val, 'gasPrice': gas_price_wei, 'gas': 300000 
         })
-        signed_tx = w3_instance.eth.account.sign_transaction(swap_tx_data, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, swap_tx_data, sender_pk, stages=stages)
         print(f"Executing AMM swap ({action_name}) on {pool_contract_address}... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=180, stages=stages)
         if tx_receipt.status != 1: raise Exception(f"AMM swap ({action_name}) failed.")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': action_name, 'sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': pool_contract_address,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, action_name, sender_address_val, nonce_val, tx_hash, contract_address=pool_contract_address)
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': action_name,'sender_address': sender_address_val, 'nonce': nonce_val, 'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, action_name, 'Error', sender_address_val, nonce_val, error_message=str(e), **stages)
 
 # --- NFT Functions ---
 def deploy_nft_contract(w3_instance, sender_pk, gas_price_wei, nft_name, nft_symbol, run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     try:
-        if not MY_NFT_ABI or not MY_NFT_BYTECODE: raise ValueError("NFT ABI or Bytecode not loaded/defined.")
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
-        Contract = w3_instance.eth.contract(abi=MY_NFT_ABI, bytecode=MY_NFT_BYTECODE)
-        constructor_tx_data = Contract.constructor(nft_name, nft_symbol).build_transaction({'from': sender_address_val,'nonce': nonce_val,'gasPrice': gas_price_wei,'gas': 3500000})
-        signed_tx = w3_instance.eth.account.sign_transaction(constructor_tx_data, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        Contract = get_contract(w3_instance, "MyNFT.sol")
+        constructor_tx_data = chain_adapter.build_deploy_transaction(Contract, (nft_name, nft_symbol), {'from': sender_address_val,'nonce': nonce_val,'gasPrice': gas_price_wei,'gas': 3500000})
+        tx_hash = chain_adapter.sign_and_send(w3_instance, constructor_tx_data, sender_pk, stages=stages)
         print(f"Deploying NFT ('{nft_name}') contract... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=300); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=300, stages=stages)
         if tx_receipt.status != 1: raise Exception("NFT contract deployment failed.")
         contract_address = tx_receipt.contractAddress; print(f"NFT Contract '{nft_name}' deployed successfully at: {contract_address}")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': 'deploy_nft','sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': contract_address,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, 'deploy_nft', sender_address_val, nonce_val, tx_hash, contract_address=contract_address)
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'deploy_nft','sender_address': sender_address_val, 'nonce': nonce_val,'status': 'Error', 'error_message': str(e)}
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, 'deploy_nft', 'Error', sender_address_val, nonce_val, error_message=str(e), **stages)
 
 def execute_nft_mint(w3_instance, sender_pk, nft_contract_address, mint_to_address, gas_price_wei,run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'; minted_token_id = None
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; minted_token_id = None; stages = start_stages()
     try:
-        if not MY_NFT_ABI: raise ValueError("NFT ABI not loaded/defined.")
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
-        nft_contract_instance = w3_instance.eth.contract(address=Web3.to_checksum_address(nft_contract_address), abi=MY_NFT_ABI)
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        nft_contract_instance = get_contract(w3_instance, "MyNFT.sol", nft_contract_address)
         mint_tx_data = nft_contract_instance.functions.safeMint(Web3.to_checksum_address(mint_to_address)).build_transaction({'from': sender_address_val,'nonce': nonce_val,'gasPrice': gas_price_wei,'gas': 250000})
-        signed_tx = w3_instance.eth.account.sign_transaction(mint_tx_data, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, mint_tx_data, sender_pk, stages=stages)
         print(f"Minting NFT to {mint_to_address}... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=180, stages=stages)
         if tx_receipt.status != 1: raise Exception("NFT minting transaction failed (receipt status not 1).")
-        transfer_events = nft_contract_instance.events.Transfer().process_receipt(tx_receipt, errors=DISCARD)
+        # Transfer(from, to, tokenId) has every argument indexed, so the token id is read straight from the log topics
+        transfer_topic = get_contract_artifact("MyNFT.sol")['event_topics']['Transfer(address,address,uint256)']
         found_mint_event = False
-        for event in transfer_events:
-            if event.args['from'] == '0x0000000000000000000000000000000000000000' and event.args['to'] == Web3.to_checksum_address(mint_to_address):
-                minted_token_id = event.args.tokenId; found_mint_event = True; print(f"NFT Mint event processed. Token ID: {minted_token_id}"); break
+        for log in tx_receipt['logs']:
+            topics = [Web3.to_hex(topic) for topic in log['topics']]
+            if len(topics) == 4 and topics[0] == transfer_topic and int(topics[1], 16) == 0 and int(topics[2], 16) == int(mint_to_address, 16):
+                minted_token_id = int(topics[3], 16); found_mint_event = True; print(f"NFT Mint event processed. Token ID: {minted_token_id}"); break
         if not found_mint_event: print(f"Warning: Could not find definitive Transfer event for mint in tx {tx_hash.hex()} logs.")
         print(f"NFT minted. Tx Status: Success. Token ID (from event processing): {minted_token_id if minted_token_id is not None else 'Not reliably found'}")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': 'nft_mint','sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': nft_contract_address, 'token_id_minted': minted_token_id,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, 'nft_mint', sender_address_val, nonce_val, tx_hash, contract_address=nft_contract_address, token_id_minted=minted_token_id)
         return result, minted_token_id
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'nft_mint','sender_address': sender_address_val, 'nonce': nonce_val,'status': 'Error', 'error_message': str(e)}, None
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, 'nft_mint', 'Error', sender_address_val, nonce_val, error_message=str(e), **stages), None
 
 def execute_nft_transfer(w3_instance, sender_pk, nft_contract_address, transfer_to_address, token_id, gas_price_wei,run_identifier="N/A"):
-    sender_address_val = 'N/A'; nonce_val = 'N/A'
+    sender_address_val = 'N/A'; nonce_val = 'N/A'; stages = start_stages()
     try:
-        if not MY_NFT_ABI: raise ValueError("NFT ABI not loaded/defined.")
+        chain_adapter = chain_adapter_for(w3_instance)
         sender_account = w3_instance.eth.account.from_key(sender_pk); sender_address_val = sender_account.address
-        nonce_val = w3_instance.eth.get_transaction_count(sender_address_val)
-        nft_contract = w3_instance.eth.contract(address=Web3.to_checksum_address(nft_contract_address), abi=MY_NFT_ABI)
+        nonce_val = next_nonce(w3_instance, sender_address_val)
+        nft_contract = get_contract(w3_instance, "MyNFT.sol", nft_contract_address)
         transfer_tx_data = nft_contract.functions.safeTransferFrom(sender_address_val, Web3.to_checksum_address(transfer_to_address),token_id).build_transaction({'from': sender_address_val,'nonce': nonce_val,'gasPrice': gas_price_wei,'gas': 150000})
-        signed_tx = w3_instance.eth.account.sign_transaction(transfer_tx_data, sender_pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = chain_adapter.sign_and_send(w3_instance, transfer_tx_data, sender_pk, stages=stages)
         print(f"Transferring NFT ID {token_id} to {transfer_to_address}... Tx Hash: {tx_hash.hex()}")
-        start_time = time.time(); tx_receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180); end_time = time.time()
-        confirmation_time = end_time - start_time
+        tx_receipt = chain_adapter.wait_for_receipt(w3_instance, tx_hash, timeout=180, stages=stages)
         if tx_receipt.status != 1: raise Exception(f"NFT (ID: {token_id}) transfer failed.")
         print(f"NFT ID {token_id} transferred successfully.")
-        effective_gas_price = tx_receipt.get('effectiveGasPrice', gas_price_wei)
-        fee_paid_wei = tx_receipt.gasUsed * effective_gas_price; fee_paid_eth = w3_instance.from_wei(fee_paid_wei, 'ether')
-        
-        # Extract L1 fee data
-        l1_fee_data = extract_l1_fee_data(w3_instance, tx_receipt)
-        
-        result = {'run_identifier': run_identifier, 'action': 'nft_transfer','sender_address': sender_address_val, 'nonce': nonce_val, 'tx_hash': tx_hash.hex(),'status': 'Success', 'contract_address': nft_contract_address, 'token_id_transferred': token_id,'block_number': tx_receipt.blockNumber, 'gas_used': tx_receipt.gasUsed,'configured_gas_price_gwei': round(w3_instance.from_wei(gas_price_wei, 'gwei'), 4),'effective_gas_price_gwei': round(w3_instance.from_wei(effective_gas_price, 'gwei'), 4),'fee_paid_eth': fee_paid_eth, 'confirmation_time_sec': round(confirmation_time, 6)}
-        result.update(l1_fee_data)
+        result = _receipt_record(chain_adapter, tx_receipt, gas_price_wei, stages, run_identifier, 'nft_transfer', sender_address_val, nonce_val, tx_hash, contract_address=nft_contract_address, token_id_transferred=token_id)
         return result
     except Exception as e:
-        return {'run_identifier': run_identifier, 'action': 'nft_transfer','sender_address': sender_address_val, 'nonce': nonce_val, 'token_id_transferred': token_id,'status': 'Error', 'error_message': str(e)}
\ No newline at end of file
+        if nonce_val != 'N/A': invalidate_nonce(w3_instance, sender_address_val)
+        return TxRecord(run_identifier, 'nft_transfer', 'Error', sender_address_val, nonce_val, token_id_transferred=token_id, error_message=str(e), **stages)
\ No newline at end of file
@@ -0,0 +1,280 @@
+# lib/transports.py
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from web3 import WebSocketProvider
+
+# --- Transport Defaults ---
+DEFAULT_POOL_SIZE = 64 # Connections kept open per endpoint (sync and async)
+DEFAULT_KEEP_ALIVE = True
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 30
+KEEPALIVE_IDLE_SECONDS = 30 # How long an idle async connection stays in the pool
+
+# Process-wide settings used by every connect_* helper; set once by the runner
+_TRANSPORT_SETTINGS = {
+    'pool_size': DEFAULT_POOL_SIZE,
+    'keep_alive': DEFAULT_KEEP_ALIVE,
+    'request_timeout': DEFAULT_REQUEST_TIMEOUT_SECONDS,
+}
+# Reuse counters, keyed by (transport kind, endpoint)
+_TRANSPORT_STATS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def configure_transports(pool_size=DEFAULT_POOL_SIZE, keep_alive=DEFAULT_KEEP_ALIVE,
+                         request_timeout=DEFAULT_REQUEST_TIMEOUT_SECONDS):
+    """Sets the pool size, keep-alive and request timeout for connections opened afterwards."""
+    _TRANSPORT_SETTINGS.update({'pool_size': pool_size, 'keep_alive': keep_alive, 'request_timeout': request_timeout})
+
+
+def current_transport_settings():
+    """Copy of the active settings, e.g. to pass to spawned worker processes."""
+    return dict(_TRANSPORT_SETTINGS)
+
+
+def is_websocket_url(url):
+    return str(url).startswith(("ws://", "wss://"))
+
+
+def async_rpc_endpoint(l2_config):
+    """The endpoint for async connections: the entry's ws_url when configured, otherwise rpc_url."""
+    return l2_config.get("ws_url") or l2_config["rpc_url"]
+
+
+# --- Reuse Statistics ---
+class TransportStats:
+    """
+    Counts requests and newly opened connections for one endpoint, and the
+    time spent in each. Connection setup time (TCP/TLS/WebSocket handshake)
+    is transport overhead; the rest of the request time is the node's latency
+    plus the wire round trip.
+    """
+
+    def __init__(self, kind, endpoint):
+        self.kind = kind
+        self.endpoint = endpoint
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.request_seconds = 0.0
+        self.connections_opened = 0
+        self.connect_seconds = 0.0
+
+    def record_request(self, seconds):
+        with self._lock:
+            self.requests += 1
+            self.request_seconds += seconds
+
+    def record_connection(self, seconds):
+        with self._lock:
+            self.connections_opened += 1
+            self.connect_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            requests_made, connections = self.requests, self.connections_opened
+            request_seconds, connect_seconds = self.request_seconds, self.connect_seconds
+        return {
+            'transport': self.kind,
+            'endpoint': self.endpoint,
+            'requests': requests_made,
+            'connections_opened': connections,
+            'connection_reuse_ratio': 1 - min(connections, requests_made) / requests_made if requests_made else 0.0,
+            'avg_request_ms': request_seconds / requests_made * 1000 if requests_made else 0.0,
+            'avg_connect_ms': connect_seconds / connections * 1000 if connections else 0.0,
+            'connect_overhead_share': connect_seconds / request_seconds if request_seconds else 0.0,
+        }
+
+
+def get_transport_stats(kind, endpoint):
+    key = (kind, str(endpoint))
+    with _REGISTRY_LOCK:
+        stats = _TRANSPORT_STATS.get(key)
+        if stats is None:
+            stats = _TRANSPORT_STATS[key] = TransportStats(kind, str(endpoint))
+    return stats
+
+
+def transport_stats_report():
+    """Snapshots of every endpoint used in this process."""
+    with _REGISTRY_LOCK:
+        all_stats = list(_TRANSPORT_STATS.values())
+    return [stats.snapshot() for stats in all_stats]
+
+
+def print_transport_stats():
+    for snapshot in transport_stats_report():
+        print(f"  {snapshot['transport']:<10} {snapshot['endpoint']}: {snapshot['requests']} requests over "
+              f"{snapshot['connections_opened']} connections (reuse {snapshot['connection_reuse_ratio']:.1%}), "
+              f"avg request {snapshot['avg_request_ms']:.2f} ms, avg connect {snapshot['avg_connect_ms']:.2f} ms "
+              f"({snapshot['connect_overhead_share']:.1%} of request time)")
+
+
+# --- Sync HTTP (requests) ---
+class _TimedConnectMixin:
+    transport_stats = None
+
+    def connect(self):
+        start_time = time.perf_counter()
+        super().connect()
+        self.transport_stats.record_connection(time.perf_counter() - start_time)
+
+
+class _PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose urllib3 pools time every new connection into transport_stats."""
+
+    def __init__(self, transport_stats, pool_size):
+        self.transport_stats = transport_stats
+        # pool_block: callers wait for a free connection instead of opening throwaway ones
+        super().__init__(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        connection_classes = {
+            'http': type('TimedHTTPConnection', (_TimedConnectMixin, HTTPConnection), {'transport_stats': self.transport_stats}),
+            'https': type('TimedHTTPSConnection', (_TimedConnectMixin, HTTPSConnection), {'transport_stats': self.transport_stats}),
+        }
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('TimedHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': connection_classes['http']}),
+            'https': type('TimedHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': connection_classes['https']}),
+        }
+
+
+class _PooledSession(requests.Session):
+    def __init__(self, transport_stats):
+        super().__init__()
+        self.transport_stats = transport_stats
+
+    def send(self, request, **kwargs):
+        # Timed here rather than in the adapter so the response body read is included
+        start_time = time.perf_counter()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            self.transport_stats.record_request(time.perf_counter() - start_time)
+
+
+def build_http_session(endpoint_uri):
+    """
+    One requests.Session shared by every thread using the endpoint, with a
+    bounded keep-alive pool. web3's default keeps a separate session per thread,
+    so a funding fan-out opens a fresh pool for each worker thread.
+    """
+    settings = _TRANSPORT_SETTINGS
+    session = _PooledSession(get_transport_stats("http", endpoint_uri))
+    adapter = _PooledHTTPAdapter(session.transport_stats, settings['pool_size'])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not settings['keep_alive']:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def http_provider_kwargs(endpoint_uri):
+    """Keyword arguments for HTTPProvider (or a subclass) wiring in the pooled session and timeout."""
+    return {'session': build_http_session(endpoint_uri), 'request_kwargs': {'timeout': _TRANSPORT_SETTINGS['request_timeout']}}
+
+
+def build_zksync_provider(endpoint_uri):
+    """ZkSyncProvider (as built by ZkSyncBuilder.build) on the pooled session."""
+    from zksync2.module.zksync_provider import ZkSyncProvider
+
+    class PooledZkSyncProvider(ZkSyncProvider):
+        def __init__(self, url):
+            # Skips ZkSyncProvider.__init__, which hardcodes a fresh per-thread session and a 1000 s timeout
+            super(ZkSyncProvider, self).__init__(url, **http_provider_kwargs(url))
+
+    return PooledZkSyncProvider(endpoint_uri)
+
+
+# --- Async HTTP (aiohttp) ---
+def _aiohttp_trace_config(transport_stats):
+    import aiohttp
+
+    async def on_request_start(session, ctx, params):
+        ctx.start_time = time.perf_counter()
+
+    async def on_request_end(session, ctx, params):
+        transport_stats.record_request(time.perf_counter() - ctx.start_time)
+
+    async def on_connection_create_start(session, ctx, params):
+        ctx.connect_start_time = time.perf_counter()
+
+    async def on_connection_create_end(session, ctx, params):
+        transport_stats.record_connection(time.perf_counter() - ctx.connect_start_time)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+async def build_async_http_provider(endpoint_uri):
+    """
+    AsyncHTTPProvider on a keep-alive aiohttp session. web3's default async
+    session uses force_close, i.e. a new TCP connection for every request.
+    Must be awaited inside the event loop that will use the provider.
+    """
+    import aiohttp
+    from web3 import AsyncHTTPProvider
+
+    settings = _TRANSPORT_SETTINGS
+    timeout = aiohttp.ClientTimeout(total=settings['request_timeout'])
+    provider = AsyncHTTPProvider(endpoint_uri, request_kwargs={'timeout': timeout})
+    session = aiohttp.ClientSession(
+        raise_for_status=True,
+        timeout=timeout,
+        connector=aiohttp.TCPConnector(
+            limit=settings['pool_size'], limit_per_host=settings['pool_size'],
+            force_close=not settings['keep_alive'],
+            keepalive_timeout=KEEPALIVE_IDLE_SECONDS if settings['keep_alive'] else None,
+        ),
+        trace_configs=[_aiohttp_trace_config(get_transport_stats("http-async", endpoint_uri))],
+    )
+    await provider.cache_async_session(session)
+    return provider
+
+
+# --- Persistent WebSocket ---
+class StatsWebSocketProvider(WebSocketProvider):
+    """web3 WebSocketProvider that records handshake and request times in TransportStats."""
+
+    def __init__(self, endpoint_uri, **kwargs):
+        super().__init__(endpoint_uri, request_timeout=_TRANSPORT_SETTINGS['request_timeout'], **kwargs)
+        self.transport_stats = get_transport_stats("websocket", endpoint_uri)
+        self._request_start_times = {}
+
+    async def _provider_specific_connect(self):
+        start_time = time.perf_counter()
+        await super()._provider_specific_connect()
+        self.transport_stats.record_connection(time.perf_counter() - start_time)
+
+    async def send_request(self, method, params):
+        # web3 splits a request into send/recv halves on persistent connections; time between them by request id
+        start_time = time.perf_counter()
+        rpc_request = await super().send_request(method, params)
+        self._request_start_times[rpc_request["id"]] = start_time
+        return rpc_request
+
+    async def recv_for_request(self, rpc_request):
+        try:
+            return await super().recv_for_request(rpc_request)
+        finally:
+            start_time = self._request_start_times.pop(rpc_request["id"], None)
+            if start_time is not None:
+                self.transport_stats.record_request(time.perf_counter() - start_time)
+
+
+async def build_async_provider(endpoint_uri):
+    """
+    Async provider for the URL scheme: persistent WebSocket for ws(s)://, pooled
+    HTTP otherwise. A WebSocket provider still has to be connected once attached
+    to its AsyncWeb3 instance (see connect_to_l2_async).
+    """
+    if is_websocket_url(endpoint_uri):
+        return StatsWebSocketProvider(endpoint_uri)
+    return await build_async_http_provider(endpoint_uri)
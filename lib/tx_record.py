@@ -0,0 +1,191 @@
+# lib/tx_record.py
+import time
+from decimal import Decimal
+
+# Lifecycle stamps of one tx, time.perf_counter_ns() in the sending process:
+# build (nonce, tx fields, gas estimate) -> sign -> submit (eth_sendRawTransaction
+# call .. its response) -> block seen (the client first learns the tx is in a block)
+# -> receipt fetched. Block seen is the first time the run observed the including
+# block (block_cache); with per-tx receipt polling that can be the receipt itself.
+STAGE_FIELDS = ('build_start_ns', 'sign_start_ns', 'submit_start_ns', 'submit_ack_ns', 'block_seen_ns', 'receipt_fetched_ns')
+
+# Raw per-transaction fields, stored as received: integer wei/gas/ns, float epoch/elapsed seconds.
+RAW_FIELDS = (
+    'chain', 'run_identifier', 'action', 'status', 'sender_address', 'nonce', 'tx_hash',
+    'block_number', 'block_timestamp', 'block_seen_time', 'gas_used', 'gas_price_wei', 'effective_gas_price_wei', 'confirmation_time',
+    'contract_address', 'token_id_minted', 'token_id_transferred',
+    'l1_fee_wei', 'l1_gas_used', 'l1_gas_price_wei', 'l1_fee_scalar', 'l1_batch_number',
+    'intended_send_time', 'actual_send_time', 'receipt_time',
+    'load_step', 'load_step_target_tps', 'worker_index',
+) + STAGE_FIELDS
+_RAW_FIELD_SET = frozenset(RAW_FIELDS)
+
+_WEI_PER_GWEI = Decimal(10) ** 9
+_WEI_PER_ETH = Decimal(10) ** 18
+
+
+def _gwei(wei, places=None):
+    if wei is None: return None
+    value = Decimal(wei) / _WEI_PER_GWEI
+    return round(value, places) if places is not None else value
+
+
+def _eth(wei):
+    return Decimal(wei) / _WEI_PER_ETH if wei is not None else None
+
+
+def _elapsed(start, end):
+    return round(end - start, 6) if start is not None and end is not None else None
+
+
+def _fee_wei(r):
+    gas_used = getattr(r, 'gas_used', None); effective_gas_price_wei = getattr(r, 'effective_gas_price_wei', None)
+    return gas_used * effective_gas_price_wei if gas_used is not None and effective_gas_price_wei is not None else None
+
+
+def stamp(stages, stage):
+    """Records perf_counter_ns() for a stage in a TxRecord or a plain dict (None: not timed)."""
+    if stages is not None:
+        stages[stage] = time.perf_counter_ns()
+
+
+def start_stages():
+    """Stage dict for a tx whose build starts now; pass it along and into the TxRecord (**stages)."""
+    return {'build_start_ns': time.perf_counter_ns()}
+
+
+def _stage_sec(r, start_stage, end_stage):
+    start = getattr(r, start_stage, None); end = getattr(r, end_stage, None)
+    return (end - start) / 1e9 if start is not None and end is not None else None
+
+
+def _inclusion_latency_sec(r):
+    # Submit time on the wall clock: block_seen_time minus the monotonic time from submit to block seen
+    block_timestamp = getattr(r, 'block_timestamp', None); block_seen_time = getattr(r, 'block_seen_time', None)
+    submit_to_seen = _stage_sec(r, 'submit_start_ns', 'block_seen_ns')
+    if block_timestamp is None or block_seen_time is None or submit_to_seen is None: return None
+    return round(block_timestamp - (block_seen_time - submit_to_seen), 6)
+
+
+def _confirmation_time_sec(r):
+    # Submit acknowledged -> block seen, the same span for every chain adapter and engine;
+    # the stored confirmation_time only for records without stage stamps
+    confirmation_time = _stage_sec(r, 'submit_ack_ns', 'block_seen_ns')
+    if confirmation_time is None:
+        confirmation_time = getattr(r, 'confirmation_time', None)
+    return round(confirmation_time, 6) if confirmation_time is not None else None
+
+
+# Result columns computed from raw fields at export time, in the units the
+# results file has always used (same rounding as the old per-tx conversion).
+# Unset slots read as None through getattr defaults.
+_EXPORT_COLUMNS = {
+    'configured_gas_price_gwei': lambda r: _gwei(getattr(r, 'gas_price_wei', None), 4),
+    'effective_gas_price_gwei': lambda r: _gwei(getattr(r, 'effective_gas_price_wei', None), 4),
+    'fee_paid_eth': lambda r: _eth(_fee_wei(r)),
+    'confirmation_time_sec': _confirmation_time_sec,
+    'l1_fee_eth': lambda r: _eth(getattr(r, 'l1_fee_wei', None)),
+    'l1_gas_price_gwei': lambda r: _gwei(getattr(r, 'l1_gas_price_wei', None)),
+    'send_lag_sec': lambda r: _elapsed(getattr(r, 'intended_send_time', None), getattr(r, 'actual_send_time', None)),
+    # Measured from when the tx *should* have gone out, so a backed-up sender cannot hide queueing delay
+    'latency_from_intended_sec': lambda r: _elapsed(getattr(r, 'intended_send_time', None), getattr(r, 'receipt_time', None)),
+    # Latency breakdown from the stage stamps
+    'build_sec': lambda r: _stage_sec(r, 'build_start_ns', 'sign_start_ns'),
+    'sign_sec': lambda r: _stage_sec(r, 'sign_start_ns', 'submit_start_ns'),
+    'submit_rtt_sec': lambda r: _stage_sec(r, 'submit_start_ns', 'submit_ack_ns'),
+    'inclusion_sec': lambda r: _stage_sec(r, 'submit_ack_ns', 'block_seen_ns'),
+    'receipt_lag_sec': lambda r: _stage_sec(r, 'block_seen_ns', 'receipt_fetched_ns'),
+    # Against the chain's block timestamp (whole seconds on most L2s, so small values can go negative):
+    # submit -> block timestamp is the sequencer's inclusion delay, block timestamp -> header first
+    # seen here is how long the block took to reach us, polling interval included
+    'inclusion_latency_sec': _inclusion_latency_sec,
+    'block_arrival_latency_sec': lambda r: _elapsed(getattr(r, 'block_timestamp', None), getattr(r, 'block_seen_time', None)),
+}
+
+
+class TxRecord:
+    """
+    Fixed-schema result record for one transaction. Fields live in slots (no
+    per-tx dict), amounts stay as raw integers and unit conversion (wei -> gwei/ETH,
+    rounding) is deferred until a result column is read, i.e. at export time.
+    Supports the dict-style access the runners and callbacks use (r['status'],
+    r.get(...), r[key] = value, update); keys outside the schema, such as
+    error_message, go to a small overflow dict that is only allocated when needed.
+    """
+    __slots__ = RAW_FIELDS + ('extra',)
+
+    def __init__(self, run_identifier=None, action=None, status=None, sender_address=None, nonce=None, tx_hash=None, **fields):
+        self.run_identifier = run_identifier
+        self.action = action
+        self.status = status
+        self.sender_address = sender_address
+        self.nonce = nonce
+        self.tx_hash = tx_hash
+        self.extra = None
+        for key, value in fields.items():
+            self[key] = value
+
+    # --- dict-style access ---
+    def get(self, key, default=None):
+        extra = self.extra
+        if extra is not None and key in extra:
+            return extra[key]
+        if key in _RAW_FIELD_SET:
+            value = getattr(self, key, None)
+        elif key in _EXPORT_COLUMNS:
+            value = _EXPORT_COLUMNS[key](self)
+        else:
+            return default
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            if key in _RAW_FIELD_SET or key in _EXPORT_COLUMNS:
+                return None
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in _RAW_FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def setdefault(self, key, default=None):
+        value = self.get(key)
+        if value is None:
+            self[key] = value = default
+        return value
+
+    def update(self, other=(), **fields):
+        for key, value in (other.items() if hasattr(other, 'items') else other):
+            self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    def to_dict(self, columns=None):
+        """Exported row: the given result columns (default: every set field and export column)."""
+        if columns is not None:
+            return {column: self.get(column) for column in columns}
+        row = {key: getattr(self, key, None) for key in RAW_FIELDS}
+        row.update((column, convert(self)) for column, convert in _EXPORT_COLUMNS.items())
+        row.update(self.extra or {})
+        return {key: value for key, value in row.items() if value is not None}
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return f"TxRecord({self.to_dict()!r})"
+
+
+_MISSING = object()
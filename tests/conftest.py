@@ -0,0 +1,34 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the runners import lib.* from the repo root
+
+from lib import block_cache, gas_oracle, nonce_manager
+from lib.mock_node import MockL2Node, start_mock_node, stop_mock_node
+
+# Funded on the mock like every other address (dev key, never used on a real chain)
+SENDER_PK = "0x4c0883a69102937d6231471b5dbb6204fe5129617082792ae468d01a3f362318"
+RECIPIENT_ADDRESS = "0xAb5801a7D398351b8bE11C439e05C5B3259aeC9B"
+
+
+@pytest.fixture
+def mock_rpc():
+    """Starts MockL2Node(**options) on an ephemeral port; returns (node, rpc_url). Stopped after the test."""
+    servers = []
+
+    def _start(**options):
+        node = MockL2Node(**{'block_time': 0.05, **options})
+        server = start_mock_node(node, port=0)
+        servers.append(server)
+        return node, f"http://127.0.0.1:{server.server_port}"
+
+    yield _start
+    for server in servers:
+        stop_mock_node(server)
+    # The registries are keyed by chain id, and every mock node serves the same chain id
+    nonce_manager._NONCE_MANAGERS.clear()
+    block_cache._BLOCK_CACHES.clear()
+    gas_oracle.stop_gas_price_oracles()
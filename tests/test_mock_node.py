@@ -0,0 +1,200 @@
+# tests/test_mock_node.py
+import asyncio
+
+import pytest
+
+from conftest import SENDER_PK, RECIPIENT_ADDRESS
+from lib.async_engine import PipelinedTxEngine, build_p2p_transfer_job, connect_to_l2_async, run_pipelined_jobs, run_sharded
+from lib.chain_adapters import get_chain_adapter
+from lib.latency_histogram import LiveLatencyRecorder
+from lib.load_profiles import run_load_profile_for_chain
+from lib.load_scheduler import run_open_loop_test
+from lib.load_workers import P2PJobFactory, run_multiprocess_open_loop
+from lib.metrics_server import render_metrics, start_metrics_server, stop_metrics_server
+from lib.mock_node import DEFAULT_CHAIN_ID, DEFAULT_GAS_PRICE_WEI, RpcError
+from lib.nonce_manager import get_nonce_manager
+from lib.receipt_tracker import block_receipt_tracking
+from lib.result_sink import BASELINE_COLUMNS, ResultSink, load_results
+from lib.transaction_utils import execute_p2p_transfer
+
+
+def _p2p_jobs(count, prefix="test"):
+    return [build_p2p_transfer_job(RECIPIENT_ADDRESS, 0.001, f"{prefix}_p2p_tx_{i + 1}") for i in range(count)]
+
+
+def _run_tracked(rpc_url, jobs):
+    """Runs jobs through one engine with block-driven receipts; returns (results, tracker)."""
+    async def _main():
+        async_w3 = await connect_to_l2_async(rpc_url, DEFAULT_CHAIN_ID)
+        try:
+            async with block_receipt_tracking(async_w3) as tracker:
+                engine = PipelinedTxEngine(async_w3, SENDER_PK, DEFAULT_GAS_PRICE_WEI, receipt_tracker=tracker)
+                return await run_sharded([engine], jobs), tracker
+        finally:
+            await async_w3.provider.disconnect()
+    return asyncio.run(_main())
+
+
+# --- Pipelined Engine + Nonce Manager ---
+def test_pipelined_engine_assigns_contiguous_nonces(mock_rpc):
+    node, rpc_url = mock_rpc()
+    results = run_pipelined_jobs(rpc_url, DEFAULT_CHAIN_ID, SENDER_PK, DEFAULT_GAS_PRICE_WEI, _p2p_jobs(20), max_in_flight=8)
+    assert [r['status'] for r in results] == ['Success'] * 20
+    assert sorted(r['nonce'] for r in results) == list(range(20))
+    assert node.stats['txs_mined'] == 20
+    assert all(r['block_number'] is not None and r['gas_used'] == 21000 for r in results)
+
+
+def test_pipelined_engine_resyncs_nonce_after_rejection(mock_rpc):
+    node, rpc_url = mock_rpc(reject_rate=0.3, seed=1)
+    results = run_pipelined_jobs(rpc_url, DEFAULT_CHAIN_ID, SENDER_PK, DEFAULT_GAS_PRICE_WEI, _p2p_jobs(20), max_in_flight=8)
+    succeeded = [r for r in results if r['status'] == 'Success']
+    assert node.stats['txs_rejected'] > 0
+    assert len(succeeded) == node.stats['txs_mined']
+    # A rejected nonce is handed out again, so the mined ones leave no gap
+    assert sorted(r['nonce'] for r in succeeded) == list(range(len(succeeded)))
+
+
+def test_pipelined_engine_reads_gas_price_per_job(mock_rpc):
+    node, rpc_url = mock_rpc()
+    gas_prices = iter(range(DEFAULT_GAS_PRICE_WEI, DEFAULT_GAS_PRICE_WEI + 5))
+    results = run_pipelined_jobs(rpc_url, DEFAULT_CHAIN_ID, SENDER_PK, lambda: next(gas_prices), _p2p_jobs(5), max_in_flight=1)
+    assert [r['status'] for r in results] == ['Success'] * 5
+    assert [r['gas_price_wei'] for r in results] == list(range(DEFAULT_GAS_PRICE_WEI, DEFAULT_GAS_PRICE_WEI + 5))
+
+
+def test_nonce_stream_shared_across_endpoints_of_one_chain(mock_rpc):
+    node, rpc_url = mock_rpc()
+    w3 = get_chain_adapter().connect(rpc_url, DEFAULT_CHAIN_ID)
+    assert execute_p2p_transfer(w3, SENDER_PK, RECIPIENT_ADDRESS, 0.001, DEFAULT_GAS_PRICE_WEI)['nonce'] == 0
+    # Another URL for the same node stands in for the run's WebSocket endpoint
+    results = run_pipelined_jobs(rpc_url.replace("127.0.0.1", "localhost"), DEFAULT_CHAIN_ID, SENDER_PK, DEFAULT_GAS_PRICE_WEI, _p2p_jobs(5))
+    assert sorted(r['nonce'] for r in results) == [1, 2, 3, 4, 5]
+    sender_address = w3.eth.account.from_key(SENDER_PK).address
+    assert get_nonce_manager(w3, sender_address).peek() == 6
+    assert node.stats['requests']['eth_getTransactionCount'] == 1 # one sync for both connections
+
+
+# --- Block-Driven Receipt Tracking ---
+@pytest.mark.parametrize("block_receipts_supported", [True, False])
+def test_block_tracker_resolves_receipts(mock_rpc, block_receipts_supported):
+    node, rpc_url = mock_rpc(unsupported_methods=() if block_receipts_supported else ("eth_getBlockReceipts",))
+    results, tracker = _run_tracked(rpc_url, _p2p_jobs(10))
+    assert [r['status'] for r in results] == ['Success'] * 10
+    assert all(r['block_seen_ns'] is not None for r in results)
+    assert tracker._block_receipts_supported is block_receipts_supported
+    requests = node.stats['requests']
+    if block_receipts_supported:
+        assert requests.get('eth_getBlockReceipts', 0) >= 1
+        assert requests.get('eth_getTransactionReceipt', 0) == 0
+    else:
+        assert requests.get('eth_getBlockReceipts', 0) == 1 # tried once, then the batched fallback
+        assert requests.get('eth_getTransactionReceipt', 0) >= 10
+
+
+def test_block_tracker_keeps_block_receipts_after_transient_error(mock_rpc):
+    node, rpc_url = mock_rpc()
+    failures = iter([True])
+    node_call = node.call
+    def flaky_call(method, params):
+        if method == 'eth_getBlockReceipts' and next(failures, False):
+            raise RpcError("mock: injected RPC error", -32603)
+        return node_call(method, params)
+    node.call = flaky_call
+    results, tracker = _run_tracked(rpc_url, _p2p_jobs(10))
+    assert [r['status'] for r in results] == ['Success'] * 10
+    assert tracker._block_receipts_supported is True
+    assert node.stats['requests']['eth_getBlockReceipts'] > 1
+
+
+# --- Open-Loop Scheduling ---
+def test_open_loop_offers_fixed_arrival_rate(mock_rpc):
+    node, rpc_url = mock_rpc()
+    results = []
+    summary = run_open_loop_test(rpc_url, DEFAULT_CHAIN_ID, [SENDER_PK], DEFAULT_GAS_PRICE_WEI,
+                                 lambda index: build_p2p_transfer_job(RECIPIENT_ADDRESS, 0.001, f"open_loop_tx_{index + 1}"),
+                                 target_tps=20, duration_seconds=1.0, on_result=results.append)
+    assert len(results) == 20 and summary['offered_txs'] == 20 and summary['confirmed_txs'] == 20
+    intended = sorted(r['intended_send_time'] for r in results) # streamed in completion order
+    assert all(abs((later - earlier) - 0.05) < 1e-6 for earlier, later in zip(intended, intended[1:]))
+    assert all(r['send_lag_sec'] >= 0 and r['latency_from_intended_sec'] > 0 for r in results)
+    assert summary['p50_latency_sec'] <= summary['p99_latency_sec']
+
+
+def test_live_latency_reported_during_soak(mock_rpc, tmp_path, capsys):
+    node, rpc_url = mock_rpc()
+    recorder = LiveLatencyRecorder("mock", report_interval=0.4).start()
+    with ResultSink(str(tmp_path / "benchmark_results_soak.csv"), "csv", observers=[recorder]) as sink:
+        run_open_loop_test(rpc_url, DEFAULT_CHAIN_ID, [SENDER_PK], DEFAULT_GAS_PRICE_WEI,
+                           lambda index: build_p2p_transfer_job(RECIPIENT_ADDRESS, 0.001, f"soak_tx_{index + 1}"),
+                           target_tps=10, duration_seconds=2.0, on_result=sink.append)
+        soak_output = capsys.readouterr().out
+    recorder.stop()
+    # Results reach the recorder as they complete, so rolling lines appear while the soak is still offering load
+    assert soak_output.count("⏱️ Latency, last") >= 3
+    assert recorder.snapshot()[("mock", "p2p_eth_transfer")].total_count == 20
+
+
+def test_load_profile_streams_tagged_results(mock_rpc, tmp_path):
+    node, rpc_url = mock_rpc()
+    results_path = str(tmp_path / "benchmark_results_profile.csv")
+    with ResultSink(results_path, "csv", columns=BASELINE_COLUMNS + ['load_step'], chunk_rows=1) as sink:
+        step_rows = run_load_profile_for_chain("mock", {'rpc_url': rpc_url, 'chain_id': DEFAULT_CHAIN_ID}, [SENDER_PK], DEFAULT_GAS_PRICE_WEI,
+                                               lambda step, index: build_p2p_transfer_job(RECIPIENT_ADDRESS, 0.001, f"profile_{step}_{index}"),
+                                               [10, 20], 0.5, on_result=sink.append)
+        assert len(sink) == sum(row['offered_txs'] for row in step_rows) == 15
+    df = load_results(results_path)
+    assert sorted(df['load_step'].value_counts().items()) == [(1, 5), (2, 10)]
+    assert [row['step'] for row in step_rows] == [1, 2] and all(row['confirmed_txs'] == row['offered_txs'] for row in step_rows)
+
+
+def test_worker_metrics_reach_serving_process(mock_rpc):
+    node, rpc_url = mock_rpc()
+    server = start_metrics_server(port=0, default_labels={'chain': 'mock'})
+    try:
+        summary = run_multiprocess_open_loop(rpc_url, DEFAULT_CHAIN_ID, [SENDER_PK], DEFAULT_GAS_PRICE_WEI,
+                                             P2PJobFactory(RECIPIENT_ADDRESS, 0.001, "worker_metrics"), 10, 1.0, num_workers=1)
+        metrics = render_metrics()
+    finally:
+        stop_metrics_server(server)
+    assert summary['confirmed_txs'] == 10
+    # Only the worker sent transactions, so these samples were shipped from its process
+    assert 'l2bench_rpc_request_seconds_count{chain="mock",method="eth_sendRawTransaction"} 10' in metrics
+    assert 'l2bench_txs_in_flight{chain="mock"} 0' in metrics
+
+
+def test_load_profile_resumes_at_interrupted_step(mock_rpc):
+    node, rpc_url = mock_rpc()
+    results, finished_steps = [], []
+    step_rows = run_load_profile_for_chain("mock", {'rpc_url': rpc_url, 'chain_id': DEFAULT_CHAIN_ID}, [SENDER_PK], DEFAULT_GAS_PRICE_WEI,
+                                           lambda step, index: build_p2p_transfer_job(RECIPIENT_ADDRESS, 0.001, f"resumed_{step}_{index}"),
+                                           [10, 20, 40], 0.5, on_result=results.append, start_step=2, on_step=finished_steps.append)
+    # Step 1 finished before the checkpoint; each later step is reported once it completes
+    assert [row['step'] for row in step_rows] == [2, 3] and finished_steps == step_rows
+    assert sorted(set(r['load_step'] for r in results)) == [2, 3] and len(results) == 30
+
+
+@pytest.mark.parametrize("target_tps, duration_seconds", [(0, 1.0), (5, 0)])
+def test_open_loop_rejects_empty_schedule(mock_rpc, target_tps, duration_seconds):
+    node, rpc_url = mock_rpc()
+    with pytest.raises(ValueError):
+        run_open_loop_test(rpc_url, DEFAULT_CHAIN_ID, [SENDER_PK], DEFAULT_GAS_PRICE_WEI,
+                           lambda index: build_p2p_transfer_job(RECIPIENT_ADDRESS, 0.001, f"tx_{index}"), target_tps, duration_seconds)
+
+
+# --- Result Sink ---
+def test_result_sink_csv_round_trip(mock_rpc, tmp_path):
+    node, rpc_url = mock_rpc(receipt_style="optimism")
+    results = run_pipelined_jobs(rpc_url, DEFAULT_CHAIN_ID, SENDER_PK, DEFAULT_GAS_PRICE_WEI, _p2p_jobs(5))
+    csv_path = str(tmp_path / "benchmark_results_test.csv")
+    with ResultSink(csv_path, "csv", chunk_rows=2) as sink:
+        sink.extend(results)
+    df = load_results(csv_path)
+    assert list(df.columns) == BASELINE_COLUMNS
+    assert len(df) == 5
+    for (_, row), result in zip(df.iterrows(), results):
+        assert row['run_identifier'] == result['run_identifier'] and row['status'] == 'Success'
+        assert row['tx_hash'] == result['tx_hash'] and row['nonce'] == result['nonce']
+        assert row['block_number'] == result['block_number'] and row['gas_used'] == 21000
+        assert row['fee_paid_eth'] == pytest.approx(21000 * DEFAULT_GAS_PRICE_WEI / 10**18)
+        assert row['l1_fee_eth'] == pytest.approx(float(result['l1_fee_eth'])) and row['l1_fee_eth'] > 0